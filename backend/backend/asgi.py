@@ -2,6 +2,8 @@
 ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP is served by Django; WebSocket connections (see */routing.py) are
+authenticated with a JWT access token (see backend/websocket.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +15,26 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
-application = get_asgi_application()
+# Initialize Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
+
+from backend.websocket import JWTAuthMiddleware
+from courses.catalog import warm_catalog
+from direct_messages.routing import websocket_urlpatterns as message_routes
+from notifications.routing import websocket_urlpatterns as notification_routes
+from search.autocomplete import warm_index
+
+# Load read-mostly data before the first request (see courses/catalog.py,
+# search/autocomplete.py)
+warm_catalog()
+warm_index()
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(
+        JWTAuthMiddleware(URLRouter(message_routes + notification_routes))
+    ),
+})
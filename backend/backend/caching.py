@@ -0,0 +1,253 @@
+"""
+Small process-local caches with hit/miss/eviction accounting.
+
+Used for caches that need stats or eviction policies Django's cache framework
+doesn't expose. Backends share the BaseCache interface so a deployment can
+swap in DjangoCache (any configured CACHES alias, e.g. Redis) instead.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class BaseCache:
+    def __init__(self, **options):
+        self.stats = CacheStats()
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def delete_many(self, keys):
+        for key in keys:
+            self.delete(key)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+    def get_stats(self):
+        stats = self.stats.as_dict()
+        stats['backend'] = f'{type(self).__module__}.{type(self).__name__}'
+        stats['entries'] = len(self)
+        return stats
+
+
+class LocalMemoryCache(BaseCache):
+    """
+    Thread-safe LRU bounded by entry count and, optionally, by total size.
+    `sizeof(value)` defines what counts towards `max_bytes`.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=None, sizeof=None, **options):
+        super().__init__(**options)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.stats.incr('misses')
+                return None
+            self._data.move_to_end(key)
+        self.stats.incr('hits')
+        return value
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self.total_bytes -= self.sizeof(self._data.pop(key))
+            self._data[key] = value
+            self.total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._data and (
+            len(self._data) > self.max_entries or
+            (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _, value = self._data.popitem(last=False)
+            self.total_bytes -= self.sizeof(value)
+            self.stats.incr('evictions')
+
+    def delete(self, key):
+        with self._lock:
+            value = self._data.pop(key, None)
+            if value is not None:
+                self.total_bytes -= self.sizeof(value)
+                self.stats.incr('invalidations')
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats['max_entries'] = self.max_entries
+        if self.max_bytes is not None:
+            stats['bytes'] = self.total_bytes
+            stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+class PopularityCache(BaseCache):
+    """
+    Thread-safe cache bounded by entry count that evicts the least frequently
+    used entry, and the least recently used one among equally popular entries
+    (LFU with LRU tie-breaking). A burst of one-off keys can't flush the
+    popular ones the way it would in a plain LRU. Entries expire after
+    `timeout` seconds, which also resets their popularity.
+    """
+
+    def __init__(self, max_entries=1000, timeout=60, **options):
+        super().__init__(**options)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._data = {}  # key -> [value, expires_at, uses]
+        self._buckets = defaultdict(OrderedDict)  # uses -> keys, least recently used first
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] <= time.monotonic():
+                self._discard(key)
+                item = None
+            if item is None:
+                self.stats.incr('misses')
+                return None
+            self._unlink(key, item[2])
+            item[2] += 1
+            self._buckets[item[2]][key] = None
+        self.stats.incr('hits')
+        return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._data:
+                self._discard(key)
+            while self._data and len(self._data) >= self.max_entries:
+                self._discard(next(iter(self._buckets[min(self._buckets)])))
+                self.stats.incr('evictions')
+            self._data[key] = [value, time.monotonic() + self.timeout, 1]
+            self._buckets[1][key] = None
+
+    def _unlink(self, key, uses):
+        bucket = self._buckets[uses]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[uses]
+
+    def _discard(self, key):
+        item = self._data.pop(key)
+        self._unlink(key, item[2])
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._discard(key)
+                self.stats.incr('invalidations')
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats['max_entries'] = self.max_entries
+        stats['timeout'] = self.timeout
+        return stats
+
+
+class DjangoCache(BaseCache):
+    """
+    Adapter for a Django CACHES alias. Evictions happen inside the cache server
+    and are not counted here.
+    """
+
+    def __init__(self, alias='default', key_prefix='', timeout=None, **options):
+        super().__init__(**options)
+        self.cache = caches[alias]
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+
+    def _key(self, key):
+        return f'{self.key_prefix}{key}'
+
+    def get(self, key):
+        value = self.cache.get(self._key(key))
+        self.stats.incr('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key, value):
+        self.cache.set(self._key(key), value, self.timeout)
+
+    def delete(self, key):
+        if self.cache.delete(self._key(key)):
+            self.stats.incr('invalidations')
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        self.cache.delete_many([self._key(key) for key in keys])
+        self.stats.incr('invalidations', len(keys))
+
+    def clear(self):
+        self.cache.clear()
+
+
+def build_cache(config):
+    """
+    Instantiates a cache from a {'BACKEND': dotted.path, 'OPTIONS': {...}} setting.
+    """
+    backend = import_string(config['BACKEND'])
+    return backend(**config.get('OPTIONS', {}))
@@ -0,0 +1,128 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Collapses "IN (%s, %s, %s)" so the same query with different list sizes
+# shares a fingerprint.
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+NUMBER_RE = re.compile(r'\b\d+\b')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    """
+    Normalizes SQL so repeated executions of the same statement (an N+1) group
+    together. Parameters are already %s placeholders at this level.
+    """
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return NUMBER_RE.sub('N', sql)
+
+
+class QueryStats:
+    """
+    Database execute wrapper that counts queries and time for one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def top_repeated(self, n=3):
+        return [(sql, count) for sql, count in self.fingerprints.most_common(n) if count > 1]
+
+
+def add_server_timing(request, name, duration_ms, description=None):
+    """
+    Adds a metric to the request's Server-Timing header (see
+    QueryBudgetMiddleware). Accepts DRF or plain Django requests.
+    """
+    http_request = getattr(request, '_request', request)
+    if not hasattr(http_request, 'server_timings'):
+        http_request.server_timings = []
+    http_request.server_timings.append((name, duration_ms, description))
+
+
+def _format_timing(name, duration_ms, description=None):
+    entry = f'{name};dur={duration_ms:.1f}'
+    if description:
+        entry += f';desc="{description}"'
+    return entry
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts SQL queries and database time for every request.
+
+    The budget for a request is looked up in settings.QUERY_BUDGETS by the URL
+    name it resolved to (e.g. 'club-list'). Going over budget is logged with
+    the most repeated statements; with QUERY_BUDGET_RAISE (for tests) it raises
+    QueryBudgetExceeded instead.
+
+    With SERVER_TIMING_HEADER on, responses carry a Server-Timing header with
+    the db and total time plus anything added through add_server_timing().
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        request.query_stats = stats
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(stats))
+            response = self.get_response(request)
+
+        total_ms = (time.perf_counter() - start) * 1000
+        self.check_budget(request, stats)
+
+        if settings.SERVER_TIMING_HEADER:
+            timings = [
+                _format_timing('db', stats.duration * 1000, f'{stats.count} queries'),
+                *(_format_timing(*timing) for timing in getattr(request, 'server_timings', [])),
+                _format_timing('total', total_ms),
+            ]
+            response['Server-Timing'] = ', '.join(timings)
+        return response
+
+    def check_budget(self, request, stats):
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match is None:
+            return
+        budget = settings.QUERY_BUDGETS.get(resolver_match.view_name)
+        if budget is None or stats.count <= budget:
+            return
+
+        repeated = '\n'.join(f'  {count}x {sql}' for sql, count in stats.top_repeated())
+        message = (
+            f'{request.method} {request.path} ({resolver_match.view_name}) ran '
+            f'{stats.count} queries, budget is {budget}.'
+        )
+        if repeated:
+            message += f'\nMost repeated:\n{repeated}'
+
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
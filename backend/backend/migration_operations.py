@@ -0,0 +1,76 @@
+"""
+Migration operations that build indexes without blocking writes.
+
+On PostgreSQL a plain CREATE INDEX holds a lock that blocks writes to the
+table for the whole build; CREATE INDEX CONCURRENTLY doesn't. These operations
+use the concurrent form there and behave like their django.db.migrations
+counterparts on other databases (SQLite in development).
+
+CONCURRENTLY can't run inside a transaction, so migrations using them must
+set `atomic = False`, and should contain nothing else that needs one.
+"""
+from django.db import migrations
+
+
+def _is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+def _ensure_not_in_transaction(schema_editor):
+    if schema_editor.connection.in_atomic_block:
+        raise NotImplementedError(
+            'Concurrent index operations need a non-atomic migration (atomic = False).'
+        )
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    def describe(self):
+        return f'Concurrently create index {self.index.name} on {self.model_name}'
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not _is_postgresql(schema_editor):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        _ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not _is_postgresql(schema_editor):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        _ensure_not_in_transaction(schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class AddUniqueConstraintConcurrently(migrations.AddConstraint):
+    """
+    For UniqueConstraints that PostgreSQL implements as a unique index (those
+    with a condition or expressions), builds that index concurrently.
+    """
+
+    def describe(self):
+        return f'Concurrently create constraint {self.constraint.name} on model {self.model_name}'
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not _is_postgresql(schema_editor):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        _ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        sql = str(self.constraint.create_sql(model, schema_editor))
+        if not sql.startswith('CREATE UNIQUE INDEX '):
+            raise ValueError(f'{self.constraint.name} is not backed by a unique index.')
+        schema_editor.execute(sql.replace('CREATE UNIQUE INDEX ', 'CREATE UNIQUE INDEX CONCURRENTLY ', 1))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not _is_postgresql(schema_editor):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        _ensure_not_in_transaction(schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.execute(
+                f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(self.constraint.name)}'
+            )
@@ -0,0 +1,148 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .params import bounded_int
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination keyed on a (value, id) ordering such as
+    (created_at, id). Every page is an indexed range read, so page 100 costs
+    the same as page 1.
+
+    The response body stays a plain list; the cursor for the next page is sent
+    in the `X-Next-Cursor` header (and a `Link: <...>; rel="next"` header).
+
+    Views choose the ordering with `keyset_ordering`, e.g. ('-created_at', '-id').
+    Views that list `ordering_fields` also accept `?ordering=<field>` or
+    `?ordering=-<field>` for one of them, paged on (field, id); a cursor is only
+    valid with the ordering it was issued for.
+    Set `keyset_reverse_page = True` to return each page in the opposite order
+    (chat history: walk backwards from the newest message, display oldest first).
+    """
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+    reverse_page = False
+
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def __init__(self, ordering=None, reverse_page=None):
+        if ordering is not None:
+            self.ordering = ordering
+        if reverse_page is not None:
+            self.reverse_page = reverse_page
+        self.next_position = None
+        self.request = None
+
+    # --- page size ---
+
+    def get_page_size(self, request):
+        return bounded_int(
+            request.query_params.get(self.page_size_query_param),
+            settings.API_PAGE_SIZE, 1, settings.API_MAX_PAGE_SIZE,
+        )
+
+    # --- cursor encoding ---
+
+    def encode_cursor(self, position):
+        value, pk = position
+        value = value.isoformat() if hasattr(value, 'isoformat') else value
+        raw = json.dumps([value, pk], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request, value_field):
+        """
+        Returns the (value, id) position encoded in the request's cursor, parsed
+        with `value_field`, or None for the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            value, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            return value_field.to_python(value), int(pk)
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # --- pagination ---
+
+    def _fields(self, view):
+        ordering = getattr(view, 'keyset_ordering', None) or self.ordering
+        value_key, id_key = ordering
+        requested = self.request.query_params.get(self.ordering_query_param, '') if self.request else ''
+        if requested.lstrip('-') in (getattr(view, 'ordering_fields', None) or ()):
+            prefix = '-' if requested.startswith('-') else ''
+            value_key, id_key = requested, prefix + id_key.lstrip('-')
+        descending = value_key.startswith('-')
+        return value_key.lstrip('-'), id_key.lstrip('-'), descending
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        if view is not None and getattr(view, 'keyset_reverse_page', False):
+            self.reverse_page = True
+        value_name, id_name, descending = self._fields(view)
+        value_field = queryset.model._meta.get_field(value_name)
+
+        def fetch(limit, position):
+            qs = queryset
+            if position is not None:
+                value, pk = position
+                op = 'lt' if descending else 'gt'
+                qs = qs.filter(
+                    Q(**{f'{value_name}__{op}': value}) |
+                    Q(**{value_name: value, f'{id_name}__{op}': pk})
+                )
+            prefix = '-' if descending else ''
+            return list(qs.order_by(f'{prefix}{value_name}', f'{prefix}{id_name}')[:limit])
+
+        page = self.paginate_keys(
+            fetch, request, value_field,
+            key=lambda obj: (getattr(obj, value_name), getattr(obj, id_name)),
+        )
+        if self.reverse_page:
+            page.reverse()
+        return page
+
+    def paginate_keys(self, fetch, request, value_field, key=None):
+        """
+        Lower-level entry point for sources that aren't a single queryset (e.g.
+        the home feed). `fetch(limit, position)` must return rows in cursor
+        order starting after `position`; `key(row)` gives a row's (value, id).
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, value_field)
+
+        rows = fetch(page_size + 1, position)
+        page = rows[:page_size]
+        if len(rows) > page_size:
+            last = page[-1]
+            self.next_position = key(last) if key else last
+        else:
+            self.next_position = None
+        return page
+
+    def get_next_cursor(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_paginated_response(self, data):
+        headers = {}
+        cursor = self.get_next_cursor()
+        if cursor:
+            url = replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+            headers['X-Next-Cursor'] = cursor
+            headers['Link'] = f'<{url}>; rel="next"'
+        return Response(data, headers=headers)
@@ -0,0 +1,10 @@
+def bounded_int(value, default, minimum, maximum):
+    """
+    Parses an integer query parameter, falling back to `default` when it is
+    missing or malformed and clamping the result to [minimum, maximum].
+    """
+    try:
+        value = int(value) if value else default
+    except (TypeError, ValueError):
+        value = default
+    return max(minimum, min(value, maximum))
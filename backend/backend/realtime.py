@@ -0,0 +1,26 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def push_to_group(group, event):
+    """
+    Sends `event` to a channel layer group once the current transaction
+    commits. Delivery is best effort: a layer outage is logged and never fails
+    the request that triggered it (clients can still fall back to the REST
+    endpoints).
+    """
+    def send():
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        try:
+            async_to_sync(layer.group_send)(group, event)
+        except Exception:
+            logger.exception("Failed to push %s to %s", event.get('type'), group)
+
+    transaction.on_commit(send)
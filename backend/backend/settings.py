@@ -53,10 +53,13 @@ INSTALLED_APPS = [
     'search',
     'posts',
     'courses',
+    'interests',
+    'loadtest',
 ]
 
 
 MIDDLEWARE = [
+    'backend.middleware.QueryBudgetMiddleware',  # query counts / Server-Timing, see QUERY_BUDGETS below
     'corsheaders.middleware.CorsMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # static file handling
     'django.middleware.security.SecurityMiddleware',
@@ -66,11 +69,28 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'users.middleware.RelationshipLookupHeaderMiddleware',
 ]
 
 
 ROOT_URLCONF = 'backend.urls'
 
+# WebSockets (see backend/asgi.py). The in-memory layer only reaches consumers
+# in the same process; set CHANNEL_REDIS_URL when running more than one worker.
+ASGI_APPLICATION = 'backend.asgi.application'
+
+if os.getenv('CHANNEL_REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [os.getenv('CHANNEL_REDIS_URL')]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+    }
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -100,13 +120,78 @@ REST_FRAMEWORK = {
     
     'EXCEPTION_HANDLER': 'backend.exceptions.custom_exception_handler', 
 }
+
+# Creates unmanaged tables such as class_info in test databases (see backend/test_runner.py)
+TEST_RUNNER = 'backend.test_runner.TestRunner'
+
+# Keyset pagination for list endpoints (see backend/pagination.py)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 100
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DATABASE_URL defaults to a local SQLite file. SSL is required for PostgreSQL
+# unless DATABASE_SSL_REQUIRE=False (e.g. a local server).
+DATABASE_URL = os.getenv('DATABASE_URL', f"sqlite:///{BASE_DIR / 'db.sqlite3'}")
 DATABASES = {
-    'default': dj_database_url.config(conn_max_age=600, ssl_require=True)
+    'default': dj_database_url.parse(
+        DATABASE_URL,
+        conn_max_age=600,
+        ssl_require=DATABASE_URL.startswith(('postgres://', 'postgresql://', 'pgsql://'))
+        and os.getenv('DATABASE_SSL_REQUIRE', 'True') == 'True',
+    )
 }
 
+# Per-endpoint SQL query budgets, keyed by URL name (see backend/middleware.py).
+# Requests over budget are logged with their most repeated statements;
+# QUERY_BUDGET_RAISE=True makes them raise instead, so test runs fail.
+QUERY_BUDGETS = {
+    # users
+    'me': 3,
+    'user-search': 6,
+    'user-profile': 6,
+    # friends
+    'friend-request-list': 4,
+    'friend-list': 6,
+    'friend-suggestions': 14,
+    'user_friends_count': 4,
+    # notifications
+    'notification-list': 4,
+    # clubs
+    'club-list': 5,
+    'club-detail': 8,
+    'my-clubs': 4,
+    'list-invites': 4,
+    'suggested-clubs': 8,
+    # events
+    'event-list': 5,
+    'club-event-list': 5,
+    'suggested-events': 6,
+    'event-detail': 10,
+    # messages
+    'thread-list': 4,
+    'thread-detail': 4,
+    'thread-sync': 5,
+    'thread-mark-read': 3,
+    'thread-unread-counts': 1,
+    'message-list': 4,
+    'get_or_create_class_thread': 6,
+    'join-class-threads': 8,
+    # posts
+    'list_posts': 8,
+    'list_user_posts': 6,
+    'get_post_detail': 6,
+    'list_post_replies': 5,
+    # courses
+    'course-catalog': 2,
+    'course-detail': 2,
+    # search
+    'global-search': 14,
+    'search-autocomplete': 1,  # Authentication only; the index is built at startup
+}
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', 'False') == 'True'  # Raise instead of logging; always on in tests (backend/test_runner.py)
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', str(DEBUG)) == 'True'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -150,9 +235,53 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
 
+# Home feed timelines (see posts/timeline.py)
+POST_TIMELINE_BACKEND = os.getenv('POST_TIMELINE_BACKEND', 'posts.timeline.DatabaseTimelineBackend')
+POST_FANOUT_LIMIT = int(os.getenv('POST_FANOUT_LIMIT', 5000))  # Larger audiences fall back to fan-out-on-read
+POST_FANOUT_ASYNC = os.getenv('POST_FANOUT_ASYNC', 'True') == 'True'  # Fan out on a background thread after commit
+POST_TIMELINE_BACKFILL = int(os.getenv('POST_TIMELINE_BACKFILL', 100))  # Posts backfilled when a friendship or membership changes
+
+# Notification delivery (see notifications/pipeline.py). Use
+# notifications.pipeline.DatabaseQueue with `manage.py process_notifications`
+# for durable delivery across processes.
+NOTIFICATION_QUEUE_BACKEND = os.getenv('NOTIFICATION_QUEUE_BACKEND', 'notifications.pipeline.ThreadQueue')
+NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', 500))
+NOTIFICATION_BATCH_WAIT_MS = int(os.getenv('NOTIFICATION_BATCH_WAIT_MS', 200))  # How long a burst is collected for coalescing
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', 5))  # Before a queued event is dead-lettered
+
+# Shared cache of viewer-independent post fragments (see posts/cache.py, backend/caching.py).
+# Per process by default; use backend.caching.DjangoCache to share it between workers.
+POST_FRAGMENT_CACHE = {
+    'BACKEND': 'backend.caching.LocalMemoryCache',
+    'OPTIONS': {'max_entries': 10000},
+}
+
+# Process-local cache of decrypted message bodies (see direct_messages/crypto.py)
+MESSAGE_DECRYPT_CACHE_ENTRIES = int(os.getenv('MESSAGE_DECRYPT_CACHE_ENTRIES', 100000))
+MESSAGE_DECRYPT_CACHE_BYTES = int(os.getenv('MESSAGE_DECRYPT_CACHE_BYTES', 32 * 1024 * 1024))
+
+# Shared cache of viewer-independent search results (see search/cache.py, backend/caching.py)
+SEARCH_RESULT_CACHE = {
+    'BACKEND': 'backend.caching.PopularityCache',
+    'OPTIONS': {'max_entries': 2000, 'timeout': int(os.getenv('SEARCH_RESULT_CACHE_TTL', 60))},
+}
+
+# How often each worker checks whether the course catalog was reloaded (see courses/catalog.py)
+COURSE_CATALOG_CHECK_SECONDS = int(os.getenv('COURSE_CATALOG_CHECK_SECONDS', 30))
+
+# How often each worker rebuilds its autocomplete index in the background; 0 turns it off (see search/autocomplete.py)
+AUTOCOMPLETE_REFRESH_SECONDS = int(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', 300))
+
+# Per-user friend suggestion cache lifetime in seconds (see friends/suggestions.py)
+FRIEND_SUGGESTIONS_CACHE_TTL = int(os.getenv('FRIEND_SUGGESTIONS_CACHE_TTL', 600))
+# Per-user club suggestion cache lifetime in seconds (see clubs/suggestions.py)
+CLUB_SUGGESTIONS_CACHE_TTL = int(os.getenv('CLUB_SUGGESTIONS_CACHE_TTL', 600))
+
 CORS_ALLOWED_ORIGINS = [
     "https://go4friends.vercel.app",
 ]
 
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'Link']
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -0,0 +1,46 @@
+from django.apps import apps
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Defaults for every test. Side effects that normally happen after the
+# response (timeline fan-out, notification delivery) run synchronously, when
+# the transaction commits, so tests can assert on them
+TEST_SETTINGS = {
+    'POST_FANOUT_ASYNC': False,
+    'NOTIFICATION_QUEUE_BACKEND': 'notifications.pipeline.SynchronousQueue',
+    # No background rebuilds; tests call search.autocomplete.rebuild_index()
+    'AUTOCOMPLETE_REFRESH_SECONDS': 0,
+    # Any request over its QUERY_BUDGETS entry fails the test
+    'QUERY_BUDGET_RAISE': True,
+}
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Applies TEST_SETTINGS, and also creates the tables of unmanaged models
+    (e.g. courses.ClassInfo, which is loaded from the registrar's data) in the
+    test databases, since migrations never do and other tables have foreign
+    keys to them.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**TEST_SETTINGS)
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
+
+    def setup_databases(self, **kwargs):
+        old_config = super().setup_databases(**kwargs)
+        unmanaged = [model for model in apps.get_models() if not model._meta.managed and not model._meta.proxy]
+        for alias in connections:
+            connection = connections[alias]
+            existing = set(connection.introspection.table_names())
+            with connection.schema_editor() as schema_editor:
+                for model in unmanaged:
+                    if model._meta.db_table not in existing:
+                        schema_editor.create_model(model)
+        return old_config
@@ -0,0 +1,38 @@
+"""
+Fixtures shared by the apps' tests.
+"""
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from backend.websocket import JWTAuthMiddleware
+from direct_messages.routing import websocket_urlpatterns as message_routes
+from notifications.routing import websocket_urlpatterns as notification_routes
+
+PASSWORD = 'pw-12345678'
+
+
+def make_user(username, **extra):
+    return get_user_model().objects.create_user(
+        username=username, email=f'{username}@campus.test', password=PASSWORD, **extra
+    )
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def websocket_communicator(path, user=None, token=None):
+    """
+    A channels WebsocketCommunicator for the websocket routes served by
+    asgi.py, authenticated as `user` or with a raw `token`.
+    """
+    if user is not None:
+        token = str(AccessToken.for_user(user))
+    if token is not None:
+        path = f'{path}?token={token}'
+    application = JWTAuthMiddleware(URLRouter(message_routes + notification_routes))
+    return WebsocketCommunicator(application, path)
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from backend.middleware import QueryBudgetExceeded, fingerprint
+from backend.realtime import push_to_group
+from backend.testing import client_for, make_user, websocket_communicator
+from notifications.consumers import UNAUTHORIZED, notification_group
+
+
+class QueryBudgetTests(TestCase):
+    url = '/api/messages/threads/unread/'  # thread-unread-counts, budget 1
+
+    def setUp(self):
+        self.client = client_for(make_user('alice'))
+
+    def test_within_budget(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={'thread-unread-counts': 0})
+    def test_over_budget_fails_under_tests(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'ran 1 queries, budget is 0'):
+            self.client.get(self.url)
+
+    @override_settings(QUERY_BUDGETS={'thread-unread-counts': 0}, QUERY_BUDGET_RAISE=False)
+    def test_over_budget_is_logged_otherwise(self):
+        with self.assertLogs('backend.middleware', 'WARNING') as logs:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertIn('(thread-unread-counts) ran 1 queries, budget is 0', logs.output[0])
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        timing = self.client.get(self.url).headers['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="1 queries", total;dur=[\d.]+$')
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_no_server_timing_header_when_off(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url).headers)
+
+    def test_fingerprint_groups_repeated_statements(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s) LIMIT 21'),
+        )
+
+
+# Websocket tests are TransactionTestCases: channels' database_sync_to_async
+# closes old connections, which would break TestCase's wrapping transaction
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class WebsocketAuthTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+
+    async def assert_rejected(self, **auth):
+        communicator = websocket_communicator('/ws/notifications/', **auth)
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, UNAUTHORIZED)
+
+    async def test_valid_token_connects(self):
+        communicator = websocket_communicator('/ws/notifications/', user=self.alice)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.send_json_to({'type': 'ping'})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'pong'})
+        await communicator.disconnect()
+
+    async def test_missing_token_is_rejected(self):
+        await self.assert_rejected()
+
+    async def test_invalid_token_is_rejected(self):
+        await self.assert_rejected(token='not-a-jwt')
+
+    async def test_expired_token_is_rejected(self):
+        token = AccessToken.for_user(self.alice)
+        token.set_exp(lifetime=-timedelta(seconds=1))
+        await self.assert_rejected(token=str(token))
+
+    async def test_token_of_inactive_user_is_rejected(self):
+        token = str(AccessToken.for_user(self.alice))
+        self.alice.is_active = False
+        await sync_to_async(self.alice.save)()
+        await self.assert_rejected(token=token)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class PushToGroupTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+
+    def push(self, text, commit=True):
+        with transaction.atomic():
+            push_to_group(notification_group(self.alice.id), {
+                'type': 'notification.created', 'notification': {'message': text},
+            })
+            if not commit:
+                transaction.set_rollback(True)
+
+    async def test_sends_only_after_commit(self):
+        communicator = websocket_communicator('/ws/notifications/', user=self.alice)
+        self.assertTrue((await communicator.connect())[0])
+
+        await sync_to_async(self.push)('rolled back', commit=False)
+        self.assertTrue(await communicator.receive_nothing())
+
+        await sync_to_async(self.push)('committed')
+        self.assertEqual(
+            await communicator.receive_json_from(),
+            {'type': 'notification', 'notification': {'message': 'committed'}},
+        )
+        await communicator.disconnect()
@@ -0,0 +1,43 @@
+"""
+WebSocket authentication.
+
+Browsers can't set an Authorization header on a WebSocket handshake, so the
+client passes its simplejwt access token in the query string:
+
+    wss://.../ws/notifications/?token=<access token>
+
+Invalid or missing tokens leave scope['user'] as AnonymousUser; consumers
+reject those connections.
+"""
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    try:
+        token = AccessToken(raw_token)
+    except TokenError:
+        return AnonymousUser()
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    try:
+        return User.objects.get(**{api_settings.USER_ID_FIELD: user_id}, is_active=True)
+    except User.DoesNotExist:
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        params = parse_qs(scope.get('query_string', b'').decode())
+        token = params.get('token', [None])[0]
+        scope['user'] = await get_user_for_token(token) if token else AnonymousUser()
+        return await super().__call__(scope, receive, send)
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Load read-mostly data before the first request (see courses/catalog.py,
+# search/autocomplete.py)
+from courses.catalog import warm_catalog
+from search.autocomplete import warm_index
+
+warm_catalog()
+warm_index()
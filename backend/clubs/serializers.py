@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Club, ClubMembership, ClubInvite
 from users.serializers import UserPublicSerializer
+from users.relationships import get_viewer_relationships
 from better_profanity import profanity
 
 profanity.load_censor_words()
@@ -29,7 +30,7 @@ class ClubSerializer(serializers.ModelSerializer):
         """
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.clubmembership_set.filter(user=request.user).exists()
+            return get_viewer_relationships(request).is_member(obj)
         return False
 
     def get_members(self, obj):
@@ -50,15 +51,29 @@ class ClubSerializer(serializers.ModelSerializer):
         """
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            members = obj.clubmembership_set.all()
-            return members.count() == 1 and members.first().user == request.user
+            # Works on prefetched memberships without extra queries
+            members = list(obj.clubmembership_set.all())
+            return len(members) == 1 and members[0].user_id == request.user.id
         return False
 
     def get_thread_id(self, obj):
         """
         Returns the associated thread ID if one exists.
         """
-        return obj.thread.id if obj.thread else None
+        return obj.thread_id
+
+
+class ClubSummarySerializer(serializers.ModelSerializer):
+    """
+    Compact club listing (e.g. suggestions): a member count instead of the
+    member list. Expects the queryset to be annotated with member_count.
+    """
+    member_count = serializers.IntegerField(read_only=True)
+    thread_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Club
+        fields = ['id', 'name', 'description', 'created_at', 'is_private', 'member_count', 'thread_id']
 
 
 class ClubMembershipSerializer(serializers.ModelSerializer):
@@ -77,7 +92,7 @@ class ClubMembershipSerializer(serializers.ModelSerializer):
         """
         Determines if the member is the owner of the club.
         """
-        return obj.user == obj.club.owner
+        return obj.user_id == obj.club.owner_id
 
 
 class ClubCreateSerializer(serializers.ModelSerializer):
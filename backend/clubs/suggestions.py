@@ -0,0 +1,91 @@
+"""
+Club suggestions.
+
+Friend-member counts come from one GROUP BY over my friends' memberships and
+interest matches from one GROUP BY over the interest index, each capped at the
+CANDIDATE_POOL_SIZE best clubs, so the cost doesn't grow with the number of
+clubs; shared interest names are then loaded for those candidates only. The
+ranked top MAX_SUGGESTIONS are cached per user for CLUB_SUGGESTIONS_CACHE_TTL
+seconds and filtered against the user's current memberships on every read.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from friends.models import Friendship
+from interests.models import ClubInterest
+from interests.utils import shared_interest_counts, shared_interest_names
+from .models import ClubMembership
+
+MAX_SUGGESTIONS = 50
+CANDIDATE_POOL_SIZE = 500
+
+WEIGHTS = {
+    'friend_member': 2,
+    'shared_interest': 1,
+}
+
+
+def _cache_key(user_id):
+    return f'club-suggestions:{user_id}'
+
+
+def compute_suggestions(user, limit=MAX_SUGGESTIONS):
+    """
+    Returns up to `limit` suggestions as (club_id, score, match_reasons)
+    tuples, best first.
+    """
+    joined = set(ClubMembership.objects.filter(user=user).values_list('club_id', flat=True))
+    friend_counts = dict(
+        ClubMembership.objects
+        .filter(user_id__in=Friendship.objects.filter(user=user).values('friend_id'))
+        .exclude(club_id__in=joined)
+        .values('club_id')
+        .annotate(n=Count('user_id'))
+        .order_by('-n', 'club_id')
+        .values_list('club_id', 'n')[:CANDIDATE_POOL_SIZE]
+    )
+    interest_club_ids = list(
+        shared_interest_counts(ClubInterest, 'club', user)
+        .exclude(club_id__in=joined)
+        .order_by('-shared', 'club_id')
+        .values_list('club_id', flat=True)[:CANDIDATE_POOL_SIZE]
+    )
+    matching_interests = shared_interest_names(ClubInterest, 'club', user, interest_club_ids)
+
+    suggestions = []
+    for club_id in set(friend_counts) | set(matching_interests):
+        score = 0
+        reasons = []
+
+        friend_count = friend_counts.get(club_id, 0)
+        if friend_count:
+            score += WEIGHTS['friend_member'] * friend_count
+            reasons.append(f"{friend_count} friend(s) are members")
+
+        interests = matching_interests.get(club_id)
+        if interests:
+            score += WEIGHTS['shared_interest'] * len(interests)
+            reasons.append(f"Related to your interests: {', '.join(interests)}")
+
+        suggestions.append((club_id, score, reasons))
+
+    suggestions.sort(key=lambda s: (-s[1], s[0]))
+    return suggestions[:limit]
+
+
+def get_suggestions(user, exclude=None):
+    """
+    Cached ranked suggestions for the user, minus any club ids in `exclude`
+    (clubs joined since the result was cached).
+    """
+    key = _cache_key(user.id)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = compute_suggestions(user)
+        cache.set(key, suggestions, settings.CLUB_SUGGESTIONS_CACHE_TTL)
+
+    if exclude:
+        suggestions = [s for s in suggestions if s[0] not in exclude]
+    return suggestions
+
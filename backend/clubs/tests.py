@@ -1,3 +1,43 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from friends.models import FriendRequest
+from backend.testing import client_for, make_user
+from .models import Club, ClubMembership
+from .suggestions import compute_suggestions
+
+class SuggestedClubsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user('alice', interests=['Chess'])
+        self.bob = make_user('bob')
+        self.carol = make_user('carol')
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.bob, status='accepted')
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.carol, status='accepted')
+
+        self.hiking = Club.objects.create(name='Hiking', owner=self.bob)
+        self.chess = Club.objects.create(name='Chess Club', description='Weekly chess', owner=self.carol)
+        self.joined = Club.objects.create(name='Running', owner=self.bob)
+        for user, club in ((self.bob, self.hiking), (self.carol, self.hiking), (self.carol, self.chess),
+                           (self.bob, self.joined), (self.alice, self.joined)):
+            ClubMembership.objects.create(user=user, club=club)
+
+        self.client = client_for(self.alice)
+
+    def test_ranked_summaries_without_member_lists(self):
+        response = self.client.get('/api/clubs/suggested/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([club['name'] for club in response.data], ['Hiking', 'Chess Club'])
+        hiking, chess = response.data
+        self.assertEqual(hiking['member_count'], 2)
+        self.assertEqual(hiking['match_reasons'], ['2 friend(s) are members'])
+        self.assertEqual(chess['match_reasons'], ['1 friend(s) are members', 'Related to your interests: chess'])
+        self.assertNotIn('members', hiking)
 
-# Create your tests here.
+    def test_candidate_pool_is_capped(self):
+        with mock.patch('clubs.suggestions.CANDIDATE_POOL_SIZE', 1):
+            suggestions = compute_suggestions(self.alice)
+        # Best friend-club (Hiking) and best interest club (Chess Club) only
+        self.assertEqual({club_id for club_id, _, _ in suggestions}, {self.hiking.id, self.chess.id})
+        self.assertEqual(dict((club_id, score) for club_id, score, _ in suggestions)[self.chess.id], 1)
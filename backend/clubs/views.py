@@ -1,8 +1,10 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from .models import Club, ClubMembership, ClubInvite
-from .serializers import ClubSerializer, ClubMembershipSerializer, ClubCreateSerializer, ClubInviteSerializer
-from django.db.models import Q
+from .serializers import (
+    ClubSerializer, ClubMembershipSerializer, ClubCreateSerializer, ClubInviteSerializer, ClubSummarySerializer,
+)
+from django.db.models import Count, IntegerField, Prefetch, Q
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
@@ -11,6 +13,9 @@ from django.contrib.auth import get_user_model
 from direct_messages.models import Thread, ThreadParticipant
 from .utils import add_user_to_club_chat
 from rest_framework.throttling import UserRateThrottle
+from backend.pagination import KeysetPagination
+from users.relationships import get_viewer_relationships
+from .suggestions import get_suggestions as get_club_suggestions
 
 User = get_user_model()
 
@@ -53,11 +58,15 @@ class ClubCreateAPIView(generics.GenericAPIView):
 class ClubListAPIView(generics.ListAPIView):
     serializer_class = ClubSerializer
     permission_classes = [permissions.IsAuthenticated] 
-    ordering_fields = ['name', 'created_at']
-    ordering = ['name']
+    filter_backends = []
+    pagination_class = KeysetPagination
+    keyset_ordering = ('name', 'id')  # Club names are unique, so this is already an index scan
+    ordering_fields = ['name', 'created_at']  # ?ordering= picks the cursor's field
 
     def get_queryset(self):
-        queryset = Club.objects.all()
+        queryset = Club.objects.prefetch_related(
+            Prefetch('clubmembership_set', queryset=ClubMembership.objects.select_related('user'))
+        )
         query = self.request.GET.get('q')
         if query:
             queryset = queryset.filter(
@@ -131,11 +140,17 @@ class ClubDetailAPIView(APIView):
 
     def get(self, request, club_name):
         try:
-            club = Club.objects.get(name=club_name)
+            # One membership fetch serves both the member list and ClubSerializer
+            club = Club.objects.prefetch_related(
+                Prefetch(
+                    'clubmembership_set',
+                    queryset=ClubMembership.objects.select_related('user', 'club').prefetch_related('user__clubs')
+                )
+            ).get(name=club_name)
         except Club.DoesNotExist:
             return Response({'error': 'Club not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        members = ClubMembership.objects.filter(club=club)
+        members = club.clubmembership_set.all()
         member_data = ClubMembershipSerializer(members, many=True, context={'request': request}).data
         
         return Response({
@@ -343,7 +358,7 @@ class ListClubInvitesAPIView(generics.ListAPIView):
     serializer_class = ClubInviteSerializer
 
     def get_queryset(self):
-        return ClubInvite.objects.filter(invitee=self.request.user, accepted=False)
+        return ClubInvite.objects.filter(invitee=self.request.user, accepted=False).select_related('club', 'invited_by')
 
 class RejectInviteAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -354,46 +369,40 @@ class RejectInviteAPIView(APIView):
         return Response({'message': 'Invite rejected.'}, status=200)
 
 class SuggestedClubsAPIView(APIView):
+    """
+    Ranked club suggestions, paginated with a (score, club id) cursor.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        me = request.user
-
-        # Clubs the user already joined
-        joined_club_ids = set(me.clubs.values_list('id', flat=True))
-
-        # User's interests
-        my_interests = set(map(str.lower, me.interests or [])) if me.interests else set()
-
-        # User's friends
-        friends = me.friends.all()
+        joined = get_viewer_relationships(request).club_ids
+        ranked = get_club_suggestions(request.user, exclude=joined)
+
+        def fetch(limit, position):
+            rows = ranked
+            if position is not None:
+                score, club_id = position
+                rows = [row for row in ranked if (-row[1], row[0]) > (-score, club_id)]
+            return rows[:limit]
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_keys(
+            fetch, request, IntegerField(), key=lambda row: (row[1], row[0])
+        )
 
-        # Get all clubs (except already joined ones)
-        clubs = Club.objects.exclude(id__in=joined_club_ids)
+        clubs = Club.objects.filter(id__in=[club_id for club_id, _, _ in page]).annotate(
+            member_count=Count('clubmembership')
+        )
+        clubs_by_id = {club.id: club for club in clubs}
 
         suggestions = []
-        for club in clubs:
-            reasons = []
-
-            # Check if any friends are members
-            friend_member_ids = ClubMembership.objects.filter(
-                club=club,
-                user__in=friends
-            ).values_list('user_id', flat=True)
-
-            if friend_member_ids.exists():
-                reasons.append(f"{len(friend_member_ids)} friend(s) are members")
-
-            # Check if club name matches any interests
-            club_name_lower = club.name.lower()
-            matching_interests = [interest for interest in my_interests if interest in club_name_lower]
-
-            if matching_interests:
-                reasons.append(f"Related to your interests: {', '.join(sorted(matching_interests))}")
-
-            if reasons:
-                data = ClubSerializer(club, context={'request': request}).data
-                data['match_reasons'] = reasons
-                suggestions.append(data)
-
-        return Response(suggestions)
+        for club_id, score, reasons in page:
+            club = clubs_by_id.get(club_id)
+            if club is None:
+                continue
+            data = ClubSummarySerializer(club).data
+            data['match_reasons'] = reasons
+            data['score'] = score
+            suggestions.append(data)
+
+        return paginator.get_paginated_response(suggestions)
@@ -0,0 +1,221 @@
+"""
+Read-only, in-memory course catalog.
+
+class_info is effectively static, so each worker loads it once into a compact
+column layout (parallel lists of ids, codes and titles plus array-backed
+posting lists) and answers id lookups, department listings and tokenized
+search from memory. Thousands of courses cost a few MB per worker.
+
+Server processes load it at startup (warm_catalog(), called from wsgi.py and
+asgi.py), so the first request doesn't pay for it; other processes, such as
+management commands, load it on first use.
+
+Reloading: reload_catalog() swaps in a fresh copy in the current process.
+The reload_course_catalog command and the admin reload endpoint also bump a
+version stamp in the default cache; workers compare it at most every
+COURSE_CATALOG_CHECK_SECONDS and reload when it changed. (This needs a shared
+CACHES backend to reach other workers; with the default local-memory cache,
+each worker picks up changes when it restarts.)
+"""
+import logging
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, connections
+
+from .models import ClassInfo
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'course-catalog:version'
+
+# "CS 101" and "cs101" both tokenize to ["cs", "101"]
+TOKEN_RE = re.compile(r'[a-z]+|\d+')
+DEPARTMENT_RE = re.compile(r'[A-Za-z]+')
+
+Course = namedtuple('Course', ['id', 'descr', 'full_name', 'department'])
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def compact(text):
+    return ''.join(tokenize(text))
+
+
+def department_of(descr):
+    match = DEPARTMENT_RE.match((descr or '').strip())
+    return match.group(0).upper() if match else ''
+
+
+class CourseCatalog:
+    def __init__(self, rows=()):
+        """
+        `rows` are (id, descr, full_name) tuples.
+        """
+        rows = sorted(rows)
+        self._ids = array('q', (row[0] for row in rows))
+        self._descrs = [sys.intern(row[1] or '') for row in rows]
+        self._titles = [row[2] or '' for row in rows]
+        self._departments = [sys.intern(department_of(descr)) for descr in self._descrs]
+
+        postings = {}
+        for position, (descr, title) in enumerate(zip(self._descrs, self._titles)):
+            for token in set(tokenize(descr) + tokenize(title)):
+                postings.setdefault(token, array('I')).append(position)
+        self._vocabulary = sorted(postings)
+        self._postings = [postings[token] for token in self._vocabulary]
+
+        by_department = {}
+        for position, department in enumerate(self._departments):
+            by_department.setdefault(department, array('I')).append(position)
+        self._by_department = by_department
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _course(self, position):
+        return Course(self._ids[position], self._descrs[position], self._titles[position], self._departments[position])
+
+    def get(self, course_id):
+        position = bisect_left(self._ids, course_id)
+        if position < len(self._ids) and self._ids[position] == course_id:
+            return self._course(position)
+        return None
+
+    def all(self):
+        return [self._course(position) for position in range(len(self._ids))]
+
+    def departments(self):
+        return sorted((department, len(positions)) for department, positions in self._by_department.items() if department)
+
+    def _matching(self, word):
+        positions = set()
+        i = bisect_left(self._vocabulary, word)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(word):
+            positions.update(self._postings[i])
+            i += 1
+        return positions
+
+    def search(self, query='', department=None, limit=20, offset=0):
+        """
+        Returns (courses, has_more). Every query token must prefix-match a
+        token of the course code or title. Exact code matches come first,
+        then codes starting with the query, then everything else by code.
+        """
+        words = tokenize(query)
+        if not words and not department:
+            return [], False
+
+        positions = None
+        for word in words:
+            matched = self._matching(word)
+            positions = matched if positions is None else positions & matched
+            if not positions:
+                return [], False
+
+        if department:
+            in_department = set(self._by_department.get(department.upper(), ()))
+            positions = in_department if positions is None else positions & in_department
+        if positions is None:
+            positions = range(len(self._ids))
+
+        code = compact(query)
+        descrs = self._descrs
+
+        def rank(position):
+            course_code = compact(descrs[position])
+            return (course_code != code, not course_code.startswith(code), descrs[position], self._ids[position])
+
+        ranked = sorted(positions, key=rank)
+        page = ranked[offset:offset + limit]
+        return [self._course(position) for position in page], len(ranked) > offset + limit
+
+    def get_stats(self):
+        strings = {id(text): sys.getsizeof(text) for text in self._descrs + self._titles + self._vocabulary}
+        approx_bytes = (
+            sum(strings.values()) +
+            sys.getsizeof(self._ids) +
+            sum(sys.getsizeof(column) for column in (self._descrs, self._titles, self._departments, self._vocabulary)) +
+            sum(sys.getsizeof(positions) for positions in self._postings) +
+            sum(sys.getsizeof(positions) for positions in self._by_department.values())
+        )
+        return {
+            'courses': len(self),
+            'departments': len(self._by_department),
+            'tokens': len(self._vocabulary),
+            'approx_bytes': approx_bytes,
+            'loaded_at': self.loaded_at,
+        }
+
+
+_catalog = None
+_version = None
+_checked_at = 0.0
+_table_exists = False
+_lock = threading.Lock()
+
+
+def _load_rows():
+    global _table_exists
+    # class_info is unmanaged and isn't present in every database. Once it has
+    # been found, later reloads skip the introspection query.
+    if not _table_exists:
+        _table_exists = ClassInfo._meta.db_table in connection.introspection.table_names()
+        if not _table_exists:
+            return []
+    return list(ClassInfo.objects.values_list('id', 'descr', 'full_name'))
+
+
+def reload_catalog():
+    """
+    Loads a fresh catalog into this process and returns it.
+    """
+    global _catalog, _version, _checked_at
+    catalog = CourseCatalog(_load_rows())
+    with _lock:
+        _catalog = catalog
+        _version = cache.get(VERSION_KEY)
+        _checked_at = time.monotonic()
+    return catalog
+
+
+def warm_catalog():
+    """
+    Loads the catalog ahead of the first request. Startup must not fail
+    because the database is unreachable; the first request retries then.
+    """
+    try:
+        reload_catalog()
+    except DatabaseError:
+        logger.exception("Could not preload the course catalog")
+    finally:
+        # Don't hand an open connection to forked worker processes
+        connections.close_all()
+
+
+def publish_reload():
+    """
+    Asks every worker sharing the default cache to reload its catalog.
+    """
+    cache.set(VERSION_KEY, time.time(), None)
+
+
+def get_catalog():
+    global _checked_at
+    if _catalog is None:
+        return reload_catalog()
+    if time.monotonic() - _checked_at > settings.COURSE_CATALOG_CHECK_SECONDS:
+        _checked_at = time.monotonic()
+        if cache.get(VERSION_KEY) != _version:
+            return reload_catalog()
+    return _catalog
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from courses.catalog import publish_reload, reload_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Tells running workers to reload the in-memory course catalog (within "
+        "COURSE_CATALOG_CHECK_SECONDS) and prints the new catalog's stats."
+    )
+
+    def handle(self, *args, **options):
+        publish_reload()
+        stats = reload_catalog().get_stats()
+        self.stdout.write(
+            f"{stats['courses']} courses, {stats['departments']} departments, "
+            f"{stats['tokens']} tokens, ~{stats['approx_bytes'] // 1024} KiB."
+        )
+        self.stdout.write(self.style.SUCCESS("Course catalog reload published."))
@@ -1,3 +1,35 @@
 from django.test import TestCase
+from backend.testing import client_for, make_user
+from . import catalog
+from .models import ClassInfo
 
-# Create your tests here.
+
+class CourseCatalogTests(TestCase):
+    def setUp(self):
+        ClassInfo.objects.bulk_create([
+            ClassInfo(id=1, descr='CS 101', full_name='Intro to Programming'),
+            ClassInfo(id=2, descr='CS 1010', full_name='Programming Lab'),
+            ClassInfo(id=3, descr='MATH 101', full_name='Calculus I'),
+        ])
+        catalog.reload_catalog()
+        self.client = client_for(make_user('alice'))
+
+    def tearDown(self):
+        # The catalog is per process; don't leave these courses to other tests
+        ClassInfo.objects.all().delete()
+        catalog.reload_catalog()
+
+    def test_search_ranks_exact_codes_first(self):
+        response = self.client.get('/api/courses/catalog/', {'q': 'cs101'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([course['descr'] for course in response.data['results']], ['CS 101', 'CS 1010'])
+
+    def test_requests_are_served_from_memory(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.get_catalog().get(3).department, 'MATH')
+            self.assertEqual(len(catalog.get_catalog().search('programming')[0]), 2)
+
+    def test_reload_checks_for_the_table_once(self):
+        # Only the SELECT; the table was found by the first load
+        with self.assertNumQueries(1):
+            catalog.reload_catalog()
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('catalog/', views.search_catalog, name='course-catalog'),
+    path('catalog/departments/', views.list_departments, name='course-departments'),
+    path('catalog/reload/', views.reload_course_catalog, name='course-catalog-reload'),
+    path('catalog/<int:course_id>/', views.get_course, name='course-detail'),
+]
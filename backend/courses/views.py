@@ -1,3 +1,66 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from backend.params import bounded_int
+from .catalog import get_catalog, publish_reload, reload_catalog
 
-# Create your views here.
+DEFAULT_RESULTS = 20
+MAX_RESULTS = 100
+
+
+def course_data(course):
+    return {
+        'id': course.id,
+        'descr': course.descr,
+        'full_name': course.full_name,
+        'department': course.department,
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_catalog(request):
+    """
+    GET /api/courses/catalog/?q=cs 10&dept=CS&limit=20&offset=0
+
+    Searches course codes and titles in the in-memory catalog (see
+    courses/catalog.py). Either `q` or `dept` is required.
+    """
+    query = request.query_params.get('q', '')
+    department = request.query_params.get('dept', '')
+    if not query.strip() and not department:
+        return Response({'error': 'q or dept is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    limit = bounded_int(request.query_params.get('limit'), DEFAULT_RESULTS, 1, MAX_RESULTS)
+    offset = bounded_int(request.query_params.get('offset'), 0, 0, 100000)
+    courses, has_more = get_catalog().search(query, department, limit, offset)
+    return Response({'results': [course_data(course) for course in courses], 'has_more': has_more})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_course(request, course_id):
+    course = get_catalog().get(course_id)
+    if course is None:
+        return Response({'error': 'Course not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(course_data(course))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def list_departments(request):
+    return Response([
+        {'department': department, 'courses': count}
+        for department, count in get_catalog().departments()
+    ])
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def reload_course_catalog(request):
+    """
+    Reloads this worker's catalog and tells the others to do the same.
+    """
+    publish_reload()
+    return Response(reload_catalog().get_stats())
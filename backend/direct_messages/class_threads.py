@@ -0,0 +1,60 @@
+"""
+Class group chats.
+
+There is one thread per class (Thread.class_info is unique), created either
+ahead of time by provision_class_threads or on first join. Threads and
+participants are written with bulk_create(ignore_conflicts=True), so
+concurrent joins at term start are idempotent and cost the same few queries
+for one class or a whole schedule.
+"""
+from django.utils import timezone
+
+from .models import Thread, ThreadParticipant
+
+
+def ensure_class_threads(courses, batch_size=1000):
+    """
+    Makes sure each course (courses.catalog.Course) has a thread. Returns
+    {class id: (thread id, last message id)}.
+    """
+    courses = {course.id: course for course in courses}
+    existing = _class_threads(courses)
+    missing = [course for course_id, course in courses.items() if course_id not in existing]
+    if missing:
+        Thread.objects.bulk_create(
+            [Thread(class_info_id=course.id, name=course.full_name, is_group=True) for course in missing],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        # ignore_conflicts doesn't return ids, and another request may have won the race
+        existing.update(_class_threads([course.id for course in missing]))
+    return existing
+
+
+def _class_threads(class_ids):
+    return {
+        class_id: (thread_id, last_message_id)
+        for class_id, thread_id, last_message_id in Thread.objects.filter(class_info_id__in=class_ids)
+        .values_list('class_info_id', 'id', 'last_message_id')
+    }
+
+
+def join_class_threads(user, courses):
+    """
+    Adds `user` to the thread of every course, creating threads as needed.
+    New participants start with the existing history marked read. Returns the
+    thread ids.
+    """
+    threads = ensure_class_threads(courses)
+    now = timezone.now()
+    ThreadParticipant.objects.bulk_create(
+        [
+            ThreadParticipant(
+                thread_id=thread_id, user=user,
+                last_read_message_id=last_message_id, last_read_at=now,
+            )
+            for thread_id, last_message_id in threads.values()
+        ],
+        ignore_conflicts=True,
+    )
+    return [thread_id for thread_id, _ in threads.values()]
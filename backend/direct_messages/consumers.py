@@ -0,0 +1,48 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from .models import ThreadParticipant
+
+UNAUTHORIZED = 4401
+FORBIDDEN = 4403
+
+
+def thread_group(thread_id):
+    return f'thread_{thread_id}'
+
+
+class ThreadConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Streams new messages of one thread to its participants.
+    Events sent: {"type": "message", "message": <MessageSerializer data>}
+    """
+
+    async def connect(self):
+        user = self.scope['user']
+        if not user.is_authenticated:
+            await self.close(code=UNAUTHORIZED)
+            return
+
+        self.thread_id = self.scope['url_route']['kwargs']['thread_id']
+        if not await self.is_participant(user):
+            await self.close(code=FORBIDDEN)
+            return
+
+        self.group_name = thread_group(self.thread_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Sending goes through the REST endpoint; only keepalives are accepted here
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def message_created(self, event):
+        await self.send_json({'type': 'message', 'message': event['message']})
+
+    @database_sync_to_async
+    def is_participant(self, user):
+        return ThreadParticipant.objects.filter(thread_id=self.thread_id, user=user).exists()
@@ -0,0 +1,93 @@
+"""
+Cached decryption of message bodies.
+
+Message.message is an EncryptedTextField, which decrypts in from_db_value on
+every load. Views that serialize many messages load the raw ciphertext instead
+(with_ciphertext / inbox_queryset) and decrypt the whole page at once through a
+process-local LRU keyed by (message id, sha256 of the ciphertext), so a body
+that is re-encrypted (key rotation) never matches a stale entry.
+
+Plaintext only ever lives in this process's memory: the cache is deliberately
+not pluggable, so it can't be pointed at a shared or persistent backend. Its
+size is capped by MESSAGE_DECRYPT_CACHE_BYTES.
+"""
+import hashlib
+import sys
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from django.dispatch import receiver
+
+from backend.caching import LocalMemoryCache
+from backend.middleware import add_server_timing
+from .models import Message
+
+
+@lru_cache(maxsize=None)
+def get_decrypt_cache():
+    return LocalMemoryCache(
+        max_entries=settings.MESSAGE_DECRYPT_CACHE_ENTRIES,
+        max_bytes=settings.MESSAGE_DECRYPT_CACHE_BYTES,
+        sizeof=sys.getsizeof,
+    )
+
+
+@receiver(setting_changed)
+def reset_decrypt_cache(setting, **kwargs):
+    if setting in ('MESSAGE_DECRYPT_CACHE_ENTRIES', 'MESSAGE_DECRYPT_CACHE_BYTES', 'FIELD_ENCRYPTION_KEY'):
+        get_decrypt_cache.cache_clear()
+
+
+def ciphertext(field='message'):
+    """
+    The raw column behind an encrypted field, without from_db_value decrypting it.
+    """
+    return Cast(field, output_field=TextField())
+
+
+def with_ciphertext(queryset):
+    """
+    Loads Messages with their body left encrypted, as `ciphertext`. Pass the
+    results through decrypt_messages() before touching `message`.
+    """
+    return queryset.defer('message').annotate(ciphertext=ciphertext())
+
+
+def decrypt_messages(pairs, request=None):
+    """
+    Sets `message` on each Message from its ciphertext, for an iterable of
+    (message, ciphertext) pairs, using the cache where possible. With a
+    request, the time spent is reported in its Server-Timing header.
+    """
+    cache = get_decrypt_cache()
+    field = Message._meta.get_field('message')
+    start = time.perf_counter()
+    count = hits = 0
+
+    for message, raw in pairs:
+        if raw is None:
+            continue
+        count += 1
+        key = (message.pk, hashlib.sha256(raw.encode('utf-8')).digest())
+        plaintext = cache.get(key)
+        if plaintext is None:
+            plaintext = field.to_python(raw)
+            cache.set(key, plaintext)
+        else:
+            hits += 1
+        message.message = plaintext
+
+    if request is not None and count:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        add_server_timing(request, 'decrypt', elapsed_ms, f'{count} messages, {hits} cached')
+
+
+def decrypt_page(messages, request=None):
+    """
+    decrypt_messages() for Messages loaded through with_ciphertext().
+    """
+    decrypt_messages(((message, message.ciphertext) for message in messages), request)
@@ -0,0 +1,130 @@
+"""
+Denormalized inbox state.
+
+Each Thread keeps its last message and last activity time, and each
+ThreadParticipant keeps a read watermark (the last message they have read and
+when) plus an unread counter. They are updated when a message is sent or read,
+so listing the inbox never has to look at the messages table. Reading is an
+explicit write (POST threads/<id>/read/, mark_read_up_to); listing a thread's
+messages never changes read state.
+"""
+from django.db import transaction
+from django.db.models import Count, Exists, F, FilteredRelation, IntegerField, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .crypto import ciphertext, decrypt_messages
+from .models import Message, Thread, ThreadParticipant
+
+
+def inbox_queryset(user):
+    """
+    The user's threads, newest activity first, with everything ThreadSerializer
+    needs loaded up front: one query for the threads (joined to the user's own
+    participant row, the last message and its sender, the club and the class)
+    and one for all participants. The last message's body is left encrypted;
+    run the page through decrypt_last_messages().
+    """
+    return (
+        Thread.objects
+        .annotate(viewer=FilteredRelation('participants', condition=Q(participants__user=user)))
+        .filter(viewer__user=user)
+        .annotate(
+            unread_count=F('viewer__unread_count'),
+            last_read_message_id=F('viewer__last_read_message_id'),
+        )
+        .select_related('last_message__sender', 'class_info', 'club')
+        .defer('last_message__message')
+        .annotate(last_message_ciphertext=ciphertext('last_message__message'))
+        .prefetch_related(
+            Prefetch('participants', queryset=ThreadParticipant.objects.select_related('user'))
+        )
+    )
+
+
+def decrypt_last_messages(threads, request=None):
+    """
+    Decrypts the last message of threads loaded through inbox_queryset().
+    """
+    decrypt_messages(
+        ((thread.last_message, thread.last_message_ciphertext) for thread in threads if thread.last_message),
+        request,
+    )
+
+
+def record_message(message):
+    """
+    Updates the thread summary and the participants' unread counters for a
+    newly created message. The sender has implicitly read their own message.
+
+    Concurrent sends can commit out of order, so the summary and the sender's
+    watermark only ever move forward: each UPDATE is conditional on the stored
+    message being older than this one.
+    """
+    with transaction.atomic():
+        Thread.objects.filter(
+            Q(last_message__isnull=True) | Q(last_message_id__lt=message.id),
+            pk=message.thread_id,
+        ).update(
+            last_message=message,
+            last_activity_at=message.timestamp,
+        )
+        participants = ThreadParticipant.objects.filter(thread_id=message.thread_id)
+        participants.exclude(user_id=message.sender_id).update(unread_count=F('unread_count') + 1)
+        participants.filter(
+            Q(last_read_message__isnull=True) | Q(last_read_message_id__lt=message.id),
+            user_id=message.sender_id,
+        ).update(
+            last_read_message=message,
+            last_read_at=message.timestamp,
+            unread_count=0,
+        )
+
+
+def mark_read_up_to(thread_id, user, message_id):
+    """
+    Moves the user's read watermark forward to `message_id` and recounts what
+    is still unread after it, in a single UPDATE. The watermark never moves
+    backwards and ids from other threads are ignored. Returns whether it moved.
+    """
+    unread_after = (
+        Message.objects
+        .filter(thread_id=thread_id, id__gt=message_id)
+        .exclude(sender=user)
+        .order_by().values('thread').annotate(n=Count('id')).values('n')
+    )
+    updated = ThreadParticipant.objects.filter(
+        Exists(Message.objects.filter(id=message_id, thread_id=thread_id)),
+        Q(last_read_message__isnull=True) | Q(last_read_message_id__lt=message_id),
+        thread_id=thread_id,
+        user=user,
+    ).update(
+        last_read_message_id=message_id,
+        last_read_at=timezone.now(),
+        unread_count=Coalesce(Subquery(unread_after, output_field=IntegerField()), 0),
+    )
+    return updated > 0
+
+
+def refresh_thread_summaries(threads=None):
+    """
+    Recomputes the denormalized fields from the messages table, for rows that
+    were written without going through record_message (bulk inserts, repairs).
+    Unread counts are recounted from each participant's read position.
+    """
+    threads = Thread.objects.all() if threads is None else threads
+    latest = Message.objects.filter(thread=OuterRef('pk')).order_by('-timestamp', '-id')
+    threads.update(
+        last_message_id=Subquery(latest.values('id')[:1]),
+        last_activity_at=Coalesce(Subquery(latest.values('timestamp')[:1]), F('created_at')),
+    )
+
+    unread = (
+        Message.objects
+        .filter(thread=OuterRef('thread_id'), id__gt=Coalesce(OuterRef('last_read_message_id'), 0))
+        .exclude(sender=OuterRef('user_id'))
+        .order_by().values('thread').annotate(n=Count('id')).values('n')
+    )
+    ThreadParticipant.objects.filter(thread__in=threads).update(
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0)
+    )
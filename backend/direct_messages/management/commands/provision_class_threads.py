@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from courses.catalog import reload_catalog
+from direct_messages.class_threads import ensure_class_threads
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the group chat for every class in the course catalog that doesn't "
+        "have one yet, so term start doesn't create them on the request path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        courses = reload_catalog().all()
+        for start in range(0, len(courses), batch_size):
+            batch = courses[start:start + batch_size]
+            ensure_class_threads(batch, batch_size)
+            self.stdout.write(f"Provisioned {start + len(batch)}/{len(courses)} classes.")
+
+        self.stdout.write(self.style.SUCCESS("Class threads provisioned."))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 13:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY on PostgreSQL, which can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('direct_messages', '0003_thread_class_info'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['thread', '-timestamp', '-id'], name='message_thread_cursor_idx'),
+        ),
+    ]
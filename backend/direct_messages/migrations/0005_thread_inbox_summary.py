@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 13:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_summaries(apps, schema_editor):
+    Thread = apps.get_model('direct_messages', 'Thread')
+    ThreadParticipant = apps.get_model('direct_messages', 'ThreadParticipant')
+    Message = apps.get_model('direct_messages', 'Message')
+
+    latest = Message.objects.filter(thread=OuterRef('pk')).order_by('-timestamp', '-id')
+    Thread.objects.update(
+        last_message_id=Subquery(latest.values('id')[:1]),
+        last_activity_at=Coalesce(Subquery(latest.values('timestamp')[:1]), F('created_at')),
+    )
+    # There was no read tracking before; start everyone at "all read"
+    ThreadParticipant.objects.update(
+        last_read_message_id=Subquery(
+            Thread.objects.filter(pk=OuterRef('thread_id')).values('last_message_id')[:1]
+        ),
+        unread_count=0,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('direct_messages', '0004_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thread',
+            name='last_activity_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='thread',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='direct_messages.message'),
+        ),
+        migrations.AddField(
+            model_name='threadparticipant',
+            name='last_read_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='direct_messages.message'),
+        ),
+        migrations.AddField(
+            model_name='threadparticipant',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 13:57
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+def copy_timestamps(apps, schema_editor):
+    Message = apps.get_model('direct_messages', 'Message')
+    Message.objects.update(updated_at=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY on PostgreSQL, which can't run in a
+    # transaction; the backfill still runs in one
+    atomic = False
+
+    dependencies = [
+        ('direct_messages', '0005_thread_inbox_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_timestamps, migrations.RunPython.noop, atomic=True),
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['thread', 'id'], name='message_thread_sync_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='message',
+            index=models.Index(fields=['thread', 'updated_at'], name='message_thread_updated_idx'),
+        ),
+    ]
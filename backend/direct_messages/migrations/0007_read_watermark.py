@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 13:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+def backfill_read_at(apps, schema_editor):
+    Message = apps.get_model('direct_messages', 'Message')
+    ThreadParticipant = apps.get_model('direct_messages', 'ThreadParticipant')
+    read_message = Message.objects.filter(id=OuterRef('last_read_message_id')).values('timestamp')[:1]
+    ThreadParticipant.objects.filter(last_read_message__isnull=False).update(last_read_at=Subquery(read_message))
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY on PostgreSQL, which can't run in a
+    # transaction; the backfill still runs in one
+    atomic = False
+
+    dependencies = [
+        ('direct_messages', '0006_message_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='threadparticipant',
+            name='last_read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_read_at, migrations.RunPython.noop, atomic=True),
+        AddIndexConcurrently(
+            model_name='threadparticipant',
+            index=models.Index(condition=models.Q(('unread_count__gt', 0)), fields=['user', 'thread'], name='participant_unread_idx'),
+        ),
+    ]
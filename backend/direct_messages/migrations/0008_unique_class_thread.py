@@ -0,0 +1,71 @@
+# Generated by Django 5.2 on 2026-10-18 14:09
+
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def merge_duplicate_class_threads(apps, schema_editor):
+    """
+    Folds every class's duplicate threads (from racing joins) into its oldest
+    one: participants and messages move over, then the summaries and unread
+    counts of the kept threads are recomputed.
+    """
+    Thread = apps.get_model('direct_messages', 'Thread')
+    ThreadParticipant = apps.get_model('direct_messages', 'ThreadParticipant')
+    Message = apps.get_model('direct_messages', 'Message')
+
+    duplicated = (
+        Thread.objects.filter(class_info__isnull=False)
+        .values('class_info_id').annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1)
+    )
+    kept_ids = []
+    for row in duplicated:
+        keep = row['keep']
+        extras = Thread.objects.filter(class_info_id=row['class_info_id']).exclude(id=keep)
+        members = ThreadParticipant.objects.filter(thread_id=keep).values('user_id')
+        ThreadParticipant.objects.filter(thread__in=extras, user_id__in=members).delete()
+        # A user in several duplicates keeps one row
+        seen = set()
+        for participant in ThreadParticipant.objects.filter(thread__in=extras).order_by('id'):
+            if participant.user_id in seen:
+                participant.delete()
+            else:
+                seen.add(participant.user_id)
+        ThreadParticipant.objects.filter(thread__in=extras).update(thread_id=keep)
+        Message.objects.filter(thread__in=extras).update(thread_id=keep)
+        extras.delete()
+        kept_ids.append(keep)
+
+    if not kept_ids:
+        return
+    latest = Message.objects.filter(thread=OuterRef('pk')).order_by('-timestamp', '-id')
+    Thread.objects.filter(id__in=kept_ids).update(
+        last_message_id=Subquery(latest.values('id')[:1]),
+        last_activity_at=Coalesce(Subquery(latest.values('timestamp')[:1]), F('created_at')),
+    )
+    unread = (
+        Message.objects
+        .filter(thread=OuterRef('thread_id'), id__gt=Coalesce(OuterRef('last_read_message_id'), 0))
+        .exclude(sender=OuterRef('user_id'))
+        .order_by().values('thread').annotate(n=Count('id')).values('n')
+    )
+    ThreadParticipant.objects.filter(thread_id__in=kept_ids).update(
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0001_initial'),
+        ('direct_messages', '0007_read_watermark'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_class_threads, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='thread',
+            constraint=models.UniqueConstraint(condition=models.Q(('class_info__isnull', False)), fields=('class_info',), name='thread_unique_class'),
+        ),
+    ]
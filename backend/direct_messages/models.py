@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from encrypted_model_fields.fields import EncryptedTextField
 
@@ -9,6 +11,17 @@ class Thread(models.Model):
     is_group = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     class_info = models.ForeignKey('courses.ClassInfo', null=True, blank=True, on_delete=models.SET_NULL, related_name='threads')
+    # Denormalized inbox summary, maintained when messages are sent (see inbox.py)
+    last_message = models.ForeignKey('Message', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    last_activity_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            # One chat per class, so concurrent joins can't create duplicates (see class_threads.py)
+            models.UniqueConstraint(
+                fields=['class_info'], condition=Q(class_info__isnull=False), name='thread_unique_class'
+            ),
+        ]
 
     def __str__(self):
         return self.name or f"Thread {self.id}"
@@ -17,9 +30,18 @@ class ThreadParticipant(models.Model):
     thread = models.ForeignKey(Thread, related_name='participants', on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     joined_at = models.DateTimeField(auto_now_add=True)
+    last_read_message = models.ForeignKey('Message', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('thread', 'user')
+        indexes = [
+            # Unread badge: only the rows with something unread
+            models.Index(
+                fields=['user', 'thread'], condition=Q(unread_count__gt=0), name='participant_unread_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} in {self.thread}"
@@ -31,9 +53,16 @@ class Message(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
     pinned = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)  # Bumped by edits such as pinning; drives thread sync
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['thread', '-timestamp', '-id'], name='message_thread_cursor_idx'),
+            # Thread sync: new messages by id, changed messages by updated_at
+            models.Index(fields=['thread', 'id'], name='message_thread_sync_idx'),
+            models.Index(fields=['thread', 'updated_at'], name='message_thread_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender.username}: {self.message[:30]}"
@@ -34,21 +34,36 @@ class ThreadSerializer(serializers.ModelSerializer):
     club_name = serializers.SerializerMethodField() 
     class_info = ClassInfoSerializer(read_only=True)
     is_group = serializers.BooleanField(read_only=True)
+    unread_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Thread
-        fields = ['id', 'name', 'is_group', 'participants', 'last_message', 'created_at', 'club_name', 'class_info']
+        fields = [
+            'id', 'name', 'is_group', 'participants', 'last_message', 'created_at',
+            'last_activity_at', 'unread_count', 'club_name', 'class_info'
+        ]
 
     def get_participants(self, obj):
-        participants = ThreadParticipant.objects.filter(thread=obj).select_related('user')
-        return ThreadParticipantSerializer(participants, many=True).data
+        # Prefetched by inbox_queryset()
+        return ThreadParticipantSerializer(obj.participants.all(), many=True).data
 
     def get_last_message(self, obj):
-        last_msg = obj.messages.order_by('-timestamp').first()
-        if last_msg:
-            return MessageSerializer(last_msg).data
+        if obj.last_message_id:
+            return MessageSerializer(obj.last_message).data
         return None
 
+    def get_unread_count(self, obj):
+        # Annotated by inbox_queryset(); otherwise read from the viewer's participant row
+        if hasattr(obj, 'unread_count'):
+            return obj.unread_count
+        request = self.context.get('request')
+        if request is None:
+            return 0
+        for participant in obj.participants.all():
+            if participant.user_id == request.user.id:
+                return participant.unread_count
+        return 0
+
     def get_club_name(self, obj):
         if hasattr(obj, 'club') and obj.club:
             return obj.club.name
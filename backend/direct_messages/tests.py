@@ -1,3 +1,314 @@
-from django.test import TestCase
+import hashlib
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from asgiref.sync import sync_to_async
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from courses import catalog
+from courses.models import ClassInfo
+from friends.models import FriendRequest
+from backend.testing import client_for, make_user, websocket_communicator
+from .consumers import FORBIDDEN, UNAUTHORIZED
+from .crypto import ciphertext, get_decrypt_cache
+from .inbox import record_message
+from .models import Message, Thread, ThreadParticipant
+
+
+class ThreadTestCase(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.bob, status='accepted')
+        self.thread = Thread.objects.create(is_group=False)
+        for user in (self.alice, self.bob):
+            ThreadParticipant.objects.create(thread=self.thread, user=user)
+
+    def send(self, user, text):
+        response = client_for(user).post(f'/api/messages/threads/{self.thread.id}/send/', {'message': text}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def participant(self, user):
+        return ThreadParticipant.objects.get(thread=self.thread, user=user)
+
+
+class MessageListTests(ThreadTestCase):
+    @override_settings(API_PAGE_SIZE=2)
+    def test_history_pages_walk_back_from_newest(self):
+        for i in range(5):
+            self.send(self.alice, f'm{i}')
+        url = f'/api/messages/threads/{self.thread.id}/messages/'
+        pages, cursor = [], None
+        while True:
+            response = client_for(self.bob).get(url, {'cursor': cursor} if cursor else {})
+            self.assertEqual(response.status_code, 200)
+            pages.append([message['message'] for message in response.data])
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+        self.assertEqual(pages, [['m3', 'm4'], ['m1', 'm2'], ['m0']])
+
+    def test_listing_messages_does_not_mark_read(self):
+        self.send(self.alice, 'hi')
+        self.send(self.alice, 'there')
+        client_for(self.bob).get(f'/api/messages/threads/{self.thread.id}/messages/')
+        self.assertEqual(self.participant(self.bob).unread_count, 2)
+
+
+class ReadWatermarkTests(ThreadTestCase):
+    def read(self, user, **data):
+        return client_for(user).post(f'/api/messages/threads/{self.thread.id}/read/', data, format='json')
+
+    def test_watermark_moves_forward_only(self):
+        ids = [self.send(self.alice, f'm{i}') for i in range(4)]
+        self.assertEqual(self.participant(self.bob).unread_count, 4)
+
+        response = self.read(self.bob, message_id=ids[1])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['last_read_message_id'], response.data['unread_count']), (ids[1], 2))
+
+        response = self.read(self.bob, message_id=ids[0])
+        self.assertEqual((response.data['last_read_message_id'], response.data['unread_count']), (ids[1], 2))
+
+        response = self.read(self.bob)
+        self.assertEqual((response.data['last_read_message_id'], response.data['unread_count']), (ids[3], 0))
+
+    def test_own_messages_are_not_unread(self):
+        self.send(self.bob, 'hello')
+        self.send(self.alice, 'hi')
+        self.send(self.bob, 'how are you?')
+        self.assertEqual(self.participant(self.bob).unread_count, 0)
+        # Sending 'hi' caught Alice up; only the last message is unread
+        self.assertEqual(self.participant(self.alice).unread_count, 1)
+
+    def test_message_from_another_thread_is_ignored(self):
+        other = Thread.objects.create(is_group=False)
+        ThreadParticipant.objects.create(thread=other, user=self.alice)
+        foreign = Message.objects.create(thread=other, sender=self.alice, message='elsewhere')
+        self.send(self.alice, 'hi')
+        response = self.read(self.bob, message_id=foreign.id)
+        self.assertEqual(response.data['unread_count'], 1)
+
+    def test_unread_counts_endpoint(self):
+        self.send(self.alice, 'hi')
+        response = client_for(self.bob).get('/api/messages/threads/unread/')
+        self.assertEqual(response.data, {'total': 1, 'threads': {self.thread.id: 1}})
+
+
+class InboxSummaryTests(ThreadTestCase):
+    def test_summary_never_moves_back_to_an_older_message(self):
+        first = Message.objects.create(thread=self.thread, sender=self.alice, message='first')
+        second = Message.objects.create(thread=self.thread, sender=self.alice, message='second')
+        # Commits landing out of order
+        record_message(second)
+        record_message(first)
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.last_message_id, second.id)
+        self.assertEqual(self.participant(self.alice).last_read_message_id, second.id)
+        self.assertEqual(self.participant(self.bob).unread_count, 2)
+
+    def test_inbox_lists_last_message_and_unread_count(self):
+        self.send(self.alice, 'hi')
+        self.send(self.alice, 'latest')
+        response = client_for(self.bob).get('/api/messages/threads/')
+        self.assertEqual(response.status_code, 200)
+        thread = response.data[0]
+        self.assertEqual(thread['unread_count'], 2)
+        self.assertEqual(thread['last_message']['message'], 'latest')
+
+
+class ThreadSyncTests(ThreadTestCase):
+    def sync(self, user=None, since=None, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return client_for(user or self.bob).get(
+            f'/api/messages/threads/{self.thread.id}/sync/', {'since': since} if since else {}, **headers
+        )
+
+    def test_returns_only_messages_after_the_cursor(self):
+        self.send(self.alice, 'old')
+        cursor = self.sync().data['cursor']
+        self.send(self.alice, 'new')
+
+        response = self.sync(since=cursor)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([message['message'] for message in response.data['messages']], ['new'])
+
+        response = self.sync(since=response.data['cursor'])
+        self.assertEqual(response.data['messages'], [])
+
+    def test_edited_messages_are_resent(self):
+        first = self.send(self.alice, 'first')
+        Message.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        cursor = self.sync().data['cursor']
+
+        message = Message.objects.get(id=first)
+        message.pinned = True
+        message.save(update_fields=['pinned', 'updated_at'])
+
+        response = self.sync(since=cursor)
+        self.assertEqual(response.data['messages'], [])
+        self.assertEqual([(m['id'], m['pinned']) for m in response.data['updated']], [(first, True)])
+
+    def test_matching_etag_is_not_modified(self):
+        self.send(self.alice, 'hi')
+        etag = self.sync().headers['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.sync(etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self.send(self.alice, 'again')
+        response = self.sync(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_reading_changes_the_etag(self):
+        self.send(self.alice, 'hi')
+        etag = self.sync(self.alice).headers['ETag']
+        client_for(self.bob).post(f'/api/messages/threads/{self.thread.id}/read/', {}, format='json')
+        self.assertEqual(self.sync(self.alice, etag=etag).status_code, 200)
+
+    def test_non_participants_get_404(self):
+        self.assertEqual(self.sync(make_user('mallory')).status_code, 404)
+
+
+class DecryptCacheTests(ThreadTestCase):
+    def setUp(self):
+        super().setUp()
+        get_decrypt_cache.cache_clear()
+        self.ids = [self.send(self.alice, f'm{i}') for i in range(3)]
+        self.url = f'/api/messages/threads/{self.thread.id}/messages/'
+
+    def listed(self):
+        response = client_for(self.bob).get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_views_decrypt_each_body_once(self):
+        self.listed()
+        self.assertEqual(get_decrypt_cache().get_stats()['misses'], 3)
+        with override_settings(SERVER_TIMING_HEADER=True):
+            response = self.listed()
+        self.assertEqual([message['message'] for message in response.data], ['m0', 'm1', 'm2'])
+        self.assertEqual(get_decrypt_cache().get_stats()['misses'], 3)
+        self.assertIn('decrypt;dur=', response.headers['Server-Timing'])
+        self.assertIn('desc="3 messages, 3 cached"', response.headers['Server-Timing'])
+
+    def test_key_includes_the_ciphertext_hash(self):
+        self.listed()
+        raw = Message.objects.annotate(raw=ciphertext()).values_list('raw', flat=True).get(id=self.ids[0])
+        key = (self.ids[0], hashlib.sha256(raw.encode('utf-8')).digest())
+        self.assertEqual(get_decrypt_cache().get(key), 'm0')
+
+    def test_edited_message_misses_the_cache(self):
+        self.listed()
+        message = Message.objects.get(id=self.ids[0])
+        message.message = 'edited'
+        message.save()
+
+        self.assertEqual([message['message'] for message in self.listed().data], ['edited', 'm1', 'm2'])
+        self.assertEqual(get_decrypt_cache().get_stats()['misses'], 4)
+
+
+class ClassThreadTests(TestCase):
+    def setUp(self):
+        ClassInfo.objects.bulk_create([
+            ClassInfo(id=1, descr='CS 101', full_name='Intro to Programming'),
+            ClassInfo(id=2, descr='MATH 101', full_name='Calculus I'),
+        ])
+        catalog.reload_catalog()
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+
+    def tearDown(self):
+        # The catalog is per process; don't leave these courses to other tests
+        ClassInfo.objects.all().delete()
+        catalog.reload_catalog()
+
+    def join(self, user, class_ids):
+        response = client_for(user).post('/api/messages/class-threads/join/', {'class_ids': class_ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_bulk_join_keeps_order_and_reports_missing_classes(self):
+        data = self.join(self.alice, [2, 99, 1])
+        self.assertEqual([thread['class_info']['id'] for thread in data['threads']], [2, 1])
+        self.assertEqual(data['missing'], [99])
+
+    def test_joins_are_idempotent_and_share_one_thread(self):
+        self.join(self.alice, [1])
+        self.join(self.alice, [1, 2])
+        self.join(self.bob, [1])
+        response = client_for(self.bob).post('/api/messages/class-thread/', {'class_id': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        thread = Thread.objects.get(class_info_id=1)
+        self.assertEqual(Thread.objects.filter(class_info__isnull=False).count(), 2)
+        self.assertEqual(response.data['id'], thread.id)
+        self.assertEqual(sorted(thread.participants.values_list('user__username', flat=True)), ['alice', 'bob'])
+
+    def test_database_rejects_a_second_thread_for_a_class(self):
+        Thread.objects.create(class_info_id=1, is_group=True)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Thread.objects.create(class_info_id=1, is_group=True)
+
+    def test_new_members_start_with_history_read(self):
+        self.join(self.alice, [1])
+        thread = Thread.objects.get(class_info_id=1)
+        response = client_for(self.alice).post(f'/api/messages/threads/{thread.id}/send/', {'message': 'welcome'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        self.join(self.bob, [1])
+        participant = ThreadParticipant.objects.get(thread=thread, user=self.bob)
+        self.assertEqual(participant.unread_count, 0)
+        self.assertEqual(participant.last_read_message_id, response.data['id'])
+
+    def test_provisioning_creates_missing_threads_once(self):
+        self.join(self.alice, [1])
+        for _ in range(2):
+            call_command('provision_class_threads', stdout=StringIO())
+        self.assertEqual(
+            sorted(Thread.objects.filter(class_info__isnull=False).values_list('class_info_id', flat=True)), [1, 2]
+        )
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class ThreadConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.bob, status='accepted')
+        self.thread, self.other = Thread.objects.create(), Thread.objects.create()
+        for thread in (self.thread, self.other):
+            for user in (self.alice, self.bob):
+                ThreadParticipant.objects.create(thread=thread, user=user)
+
+    async def connect(self, user=None, thread=None):
+        communicator = websocket_communicator(f'/ws/messages/threads/{(thread or self.thread).id}/', user=user)
+        return communicator, await communicator.connect()
+
+    async def test_only_participants_can_connect(self):
+        _, (connected, code) = await self.connect()
+        self.assertEqual((connected, code), (False, UNAUTHORIZED))
+        mallory = await sync_to_async(make_user)('mallory')
+        _, (connected, code) = await self.connect(mallory)
+        self.assertEqual((connected, code), (False, FORBIDDEN))
+
+    async def test_streams_messages_of_its_thread_only(self):
+        communicator, (connected, _) = await self.connect(self.bob)
+        self.assertTrue(connected)
+
+        send = sync_to_async(client_for(self.alice).post)
+        await send(f'/api/messages/threads/{self.other.id}/send/', {'message': 'elsewhere'}, format='json')
+        self.assertTrue(await communicator.receive_nothing())
+
+        response = await send(f'/api/messages/threads/{self.thread.id}/send/', {'message': 'hi bob'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['type'], 'message')
+        self.assertEqual((event['message']['id'], event['message']['message']), (response.data['id'], 'hi bob'))
+        await communicator.disconnect()
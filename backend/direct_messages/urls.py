@@ -3,18 +3,26 @@ from .views import (
     ThreadListAPIView,
     ThreadDetailAPIView,
     MessageListAPIView,
+    ThreadSyncAPIView,
+    MarkThreadReadAPIView,
+    UnreadCountsAPIView,
     SendMessageAPIView,
     StartPrivateThreadAPIView,
     TogglePinMessageAPIView,
-    get_or_create_class_thread
+    get_or_create_class_thread,
+    join_class_threads_view,
 )
 
 urlpatterns = [
     path('threads/', ThreadListAPIView.as_view(), name='thread-list'),                    # List all threads
+    path('threads/unread/', UnreadCountsAPIView.as_view(), name='thread-unread-counts'),     # Unread badge counts
     path('threads/<int:pk>/', ThreadDetailAPIView.as_view(), name='thread-detail'),       # Thread details
     path('threads/<int:thread_id>/messages/', MessageListAPIView.as_view(), name='message-list'),  # Messages in a thread
+    path('threads/<int:thread_id>/sync/', ThreadSyncAPIView.as_view(), name='thread-sync'),         # Changes since a cursor
+    path('threads/<int:thread_id>/read/', MarkThreadReadAPIView.as_view(), name='thread-mark-read'), # Read up to a message
     path('threads/<int:thread_id>/send/', SendMessageAPIView.as_view(), name='send-message'),       # Send message to thread
     path('threads/start-private/', StartPrivateThreadAPIView.as_view(), name='start-private-thread'), # Start private DM
     path('messages/<int:pk>/pin/', TogglePinMessageAPIView.as_view(), name='toggle-pin-message'),
     path('class-thread/', get_or_create_class_thread, name='get_or_create_class_thread'),
+    path('class-threads/join/', join_class_threads_view, name='join-class-threads'),
 ]
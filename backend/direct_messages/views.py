@@ -1,3 +1,6 @@
+import hashlib
+from datetime import timedelta
+
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
@@ -7,14 +10,23 @@ from .models import Thread, ThreadParticipant, Message
 from .serializers import MessageSerializer, ThreadSerializer
 from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
-from django.db.models import Count
+from django.db.models import Count, Max, OuterRef, Subquery
 from rest_framework.views import APIView
-from friends.models import FriendRequest 
+from friends.utils import are_friends
 from rest_framework.throttling import UserRateThrottle
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from courses.models import ClassInfo
+from courses.catalog import get_catalog
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from backend.pagination import KeysetPagination
+from backend.realtime import push_to_group
+from .consumers import thread_group
+from .class_threads import join_class_threads
+from .crypto import decrypt_page, with_ciphertext
+from .inbox import decrypt_last_messages, inbox_queryset, mark_read_up_to, record_message
 
 User = get_user_model()
 
@@ -27,19 +39,19 @@ class StartThreadThrottle(UserRateThrottle):
 class TogglePinThrottle(UserRateThrottle):
     rate = '30/min'
 
-def are_friends(user1, user2):
-    """Helper function to check if two users are friends"""
-    return FriendRequest.objects.filter(
-        Q(from_user=user1, to_user=user2) | Q(from_user=user2, to_user=user1),
-        status='accepted'
-    ).exists()
-
 class ThreadListAPIView(generics.ListAPIView):
     serializer_class = ThreadSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-last_activity_at', '-id')
 
     def get_queryset(self):
-        return Thread.objects.filter(participants__user=self.request.user).select_related('club').distinct()
+        return inbox_queryset(self.request.user)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        decrypt_last_messages(page, self.request)
+        return page
 
 
 class ThreadDetailAPIView(generics.RetrieveAPIView):
@@ -48,22 +60,170 @@ class ThreadDetailAPIView(generics.RetrieveAPIView):
 
     def get_object(self):
         thread_id = self.kwargs.get('pk')
-        thread = get_object_or_404(Thread, id=thread_id, participants__user=self.request.user)
+        thread = get_object_or_404(inbox_queryset(self.request.user), id=thread_id)
+        decrypt_last_messages([thread], self.request)
         return thread
 
 
 class MessageListAPIView(generics.ListAPIView):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    # Newest page first, each page returned oldest -> newest; the cursor walks back in time
+    keyset_ordering = ('-timestamp', '-id')
+    keyset_reverse_page = True
 
     def get_queryset(self):
         thread_id = self.kwargs.get('thread_id')
-        return Message.objects.filter(
+        return with_ciphertext(Message.objects.filter(
             thread_id=thread_id,
             thread__participants__user=self.request.user
+        ).select_related('sender'))
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        decrypt_page(page, self.request)
+        return page
+
+
+class ThreadSyncAPIView(APIView):
+    """
+    Incremental sync for a thread the client already has loaded.
+
+    GET threads/<id>/sync/?since=<cursor> returns only messages created after the
+    cursor, older messages edited since (e.g. pinned), and the participants'
+    read positions, plus the cursor for the next call. Without `since` it just
+    returns a cursor for the thread's current head.
+
+    Every response carries an ETag derived from the thread's state; a GET or
+    HEAD with a matching If-None-Match gets an empty 304 without any messages
+    being read or decrypted.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    # Edits are re-sent for this long after the cursor, so a change committed
+    # slightly out of order isn't missed. Clients upsert messages by id.
+    change_overlap = timedelta(seconds=2)
+
+    def get(self, request, thread_id):
+        state = self.get_state(thread_id, request.user)
+        if state is None:
+            return Response({'error': 'Thread not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = quote_etag(hashlib.md5(
+            f"{state['last_message_id']}:{state['last_change']}:{state['read_version']}".encode()
+        ).hexdigest())
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        paginator = KeysetPagination()
+        paginator.cursor_query_param = 'since'
+        since = paginator.decode_cursor(request, Message._meta.get_field('updated_at'))
+
+        messages, updated, has_more = [], [], False
+        if since is None:
+            position = (state['last_change'] or timezone.now(), state['last_message_id'] or 0)
+        else:
+            since_at, since_id = since
+            thread_messages = with_ciphertext(Message.objects.filter(thread_id=thread_id).select_related('sender'))
+            limit = paginator.get_page_size(request)
+
+            messages = list(thread_messages.filter(id__gt=since_id).order_by('id')[:limit + 1])
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+            updated = list(
+                thread_messages
+                .filter(id__lte=since_id, updated_at__gt=since_at - self.change_overlap)
+                .order_by('id')
+            )
+            decrypt_page(messages + updated, request)
+
+            last_change = max([since_at] + [m.updated_at for m in messages + updated])
+            position = (last_change, messages[-1].id if messages else since_id)
+
+        read_state = list(
+            ThreadParticipant.objects.filter(thread_id=thread_id)
+            .values('user_id', 'last_read_message_id', 'last_read_at')
+        )
+        return Response({
+            'messages': MessageSerializer(messages, many=True).data,
+            'updated': MessageSerializer(updated, many=True).data,
+            'read_state': read_state,
+            'cursor': paginator.encode_cursor(position),
+            'has_more': has_more,
+        }, headers={'ETag': etag})
+
+    def get_state(self, thread_id, user):
+        """
+        One query for everything the ETag depends on.
+        """
+        latest_change = (
+            Message.objects.filter(thread=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
+        )
+        # Changes whenever anyone reads
+        read_version = (
+            ThreadParticipant.objects.filter(thread=OuterRef('pk'))
+            .order_by().values('thread').annotate(latest=Max('last_read_at')).values('latest')
+        )
+        return (
+            Thread.objects.filter(id=thread_id, participants__user=user)
+            .annotate(last_change=Subquery(latest_change), read_version=Subquery(read_version))
+            .values('last_message_id', 'last_change', 'read_version')
+            .first()
         )
 
 
+class MarkThreadReadAPIView(APIView):
+    """
+    POST threads/<id>/read/ {"message_id": 123}
+
+    Moves the caller's read watermark up to the given message (default: the
+    thread's latest message). Per-participant watermarks replace per-message
+    read flags, so this is one UPDATE however many messages or participants
+    the thread has. Returns the caller's read state.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, thread_id):
+        message_id = request.data.get('message_id')
+        if message_id is None:
+            message_id = Thread.objects.filter(id=thread_id).values_list('last_message_id', flat=True).first()
+        else:
+            try:
+                message_id = int(message_id)
+            except (TypeError, ValueError):
+                return Response({'error': 'message_id must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if message_id is not None:
+            mark_read_up_to(thread_id, request.user, message_id)
+
+        read_state = (
+            ThreadParticipant.objects.filter(thread_id=thread_id, user=request.user)
+            .values('last_read_message_id', 'last_read_at', 'unread_count')
+            .first()
+        )
+        if read_state is None:
+            return Response({'error': 'Thread not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(read_state, status=status.HTTP_200_OK)
+
+
+class UnreadCountsAPIView(APIView):
+    """
+    GET threads/unread/ -> {"total": 7, "threads": {"12": 5, "40": 2}}
+
+    Unread counts for all of the caller's threads, from the denormalized
+    counters in one query. Threads with nothing unread are left out.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        counts = dict(
+            ThreadParticipant.objects
+            .filter(user=request.user, unread_count__gt=0)
+            .values_list('thread_id', 'unread_count')
+        )
+        return Response({'total': sum(counts.values()), 'threads': counts})
+
+
 class SendMessageAPIView(generics.CreateAPIView):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -91,11 +251,17 @@ class SendMessageAPIView(generics.CreateAPIView):
         if not message:
             return Response({'error': 'Message cannot be empty.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        msg = Message.objects.create(
-            thread=thread,
-            sender=request.user,
-            message=message
-        )
+        with transaction.atomic():
+            msg = Message.objects.create(
+                thread=thread,
+                sender=request.user,
+                message=message
+            )
+            record_message(msg)
+            push_to_group(thread_group(thread.id), {
+                'type': 'message.created',
+                'message': MessageSerializer(msg).data,
+            })
 
         return Response(MessageSerializer(msg).data, status=status.HTTP_201_CREATED)
 
@@ -165,17 +331,52 @@ def get_or_create_class_thread(request):
     class_id = request.data.get('class_id')
     if not class_id:
         return Response({'error': 'class_id is required'}, status=400)
+    try:
+        course = get_catalog().get(int(class_id))
+    except (TypeError, ValueError):
+        return Response({'error': 'class_id must be an integer'}, status=400)
+    if course is None:
+        return Response({'error': 'Class not found.'}, status=404)
+
+    thread_ids = join_class_threads(request.user, [course])
+    thread = get_object_or_404(inbox_queryset(request.user), id=thread_ids[0])
+    decrypt_last_messages([thread], request)
+    serializer = ThreadSerializer(thread, context={'request': request})
+    return Response(serializer.data)
 
-    class_obj = get_object_or_404(ClassInfo, id=class_id)
 
-    thread = Thread.objects.filter(class_info=class_obj).first()
-    if not thread:
-        thread = Thread.objects.create(class_info=class_obj, name=class_obj.full_name, is_group=True)
-        ThreadParticipant.objects.create(thread=thread, user=request.user)
-    else:
-        # If thread exists, ensure user is participant
-        if not ThreadParticipant.objects.filter(thread=thread, user=request.user).exists():
-            ThreadParticipant.objects.create(thread=thread, user=request.user)
+MAX_CLASS_JOIN = 20
 
-    serializer = ThreadSerializer(thread, context={'request': request})
-    return Response(serializer.data)
\ No newline at end of file
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def join_class_threads_view(request):
+    """
+    POST class-threads/join/ {"class_ids": [12, 40, 41]}
+
+    Joins the chats of several classes at once (e.g. a whole schedule),
+    creating any that don't exist yet. Returns the joined threads and the
+    ids that aren't in the course catalog.
+    """
+    class_ids = request.data.get('class_ids')
+    if not isinstance(class_ids, list) or not class_ids:
+        return Response({'error': 'class_ids must be a non-empty list'}, status=400)
+    if len(class_ids) > MAX_CLASS_JOIN:
+        return Response({'error': f'At most {MAX_CLASS_JOIN} classes at a time'}, status=400)
+    try:
+        class_ids = list(dict.fromkeys(int(class_id) for class_id in class_ids))
+    except (TypeError, ValueError):
+        return Response({'error': 'class_ids must be integers'}, status=400)
+
+    catalog = get_catalog()
+    courses = [course for course in map(catalog.get, class_ids) if course is not None]
+    found = {course.id for course in courses}
+    thread_ids = join_class_threads(request.user, courses) if courses else []
+
+    threads = list(inbox_queryset(request.user).filter(id__in=thread_ids))
+    threads.sort(key=lambda thread: class_ids.index(thread.class_info_id))
+    decrypt_last_messages(threads, request)
+    return Response({
+        'threads': ThreadSerializer(threads, many=True, context={'request': request}).data,
+        'missing': [class_id for class_id in class_ids if class_id not in found],
+    })
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 13:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY on PostgreSQL, which can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('clubs', '0009_club_thread'),
+        ('events', '0004_alter_event_image'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(fields=['date', 'id'], name='event_date_cursor_idx'),
+        ),
+    ]
@@ -15,6 +15,13 @@ class Event(models.Model):
     image = models.URLField(null=True, blank=True)
     attendees = models.ManyToManyField(User, related_name='attending_events', blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='event_date_cursor_idx'),
+            # A club's events by date (club pages, event suggestions)
+            models.Index(fields=['club', 'date', 'id'], name='event_club_date_idx'),
+        ]
+
     def __str__(self):
         if self.club:
             return f"{self.title} (Club: {self.club.name})"
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Event
 from better_profanity import profanity
+from users.relationships import get_viewer_relationships
 
 
 profanity.load_censor_words()
@@ -24,10 +25,13 @@ class EventSerializer(serializers.ModelSerializer):
     def get_is_going(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return obj.attendees.filter(id=request.user.id).exists()
+            return get_viewer_relationships(request).is_going(obj)
         return False
 
     def get_attendee_count(self, obj):
+        # List views annotate num_attendees to avoid a COUNT per event
+        if hasattr(obj, 'num_attendees'):
+            return obj.num_attendees
         return obj.attendees.count()
 
     def validate_title(self, value):
@@ -0,0 +1,90 @@
+"""
+Event suggestions.
+
+Only upcoming events inside a bounded window are considered. Candidates come
+from three indexed lookups: events hosted by my clubs, events sharing interest
+terms with me (interests.EventInterest) and one aggregate over the attendees
+table for friend RSVPs. Only the candidates are then loaded, with their club.
+"""
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from clubs.models import ClubMembership
+from friends.models import Friendship
+from interests.models import EventInterest
+from interests.utils import shared_interest_counts
+from .models import Event
+
+DEFAULT_WINDOW_DAYS = 30
+MAX_WINDOW_DAYS = 180
+DEFAULT_SUGGESTIONS = 20
+MAX_SUGGESTIONS = 50
+
+WEIGHTS = {
+    'my_club': 3,
+    'friend_attending': 2,
+    'shared_interest': 1,
+}
+
+
+def compute_suggestions(user, days=DEFAULT_WINDOW_DAYS, limit=DEFAULT_SUGGESTIONS):
+    """
+    Returns up to `limit` (event, score, match_reasons) tuples for club events
+    in the next `days` days, best first.
+    """
+    now = timezone.now()
+    window = {'date__gte': now, 'date__lt': now + timedelta(days=days)}
+    event_window = {f'event__{lookup}': value for lookup, value in window.items()}
+
+    my_club_ids = ClubMembership.objects.filter(user=user).values('club_id')
+    hosted_ids = set(
+        Event.objects.filter(**window, club_id__in=my_club_ids).values_list('id', flat=True)
+    )
+
+    interest_counts = dict(
+        shared_interest_counts(EventInterest, 'event', user)
+        .filter(**event_window)
+        .values_list('event_id', 'shared')
+    )
+
+    friend_ids = Friendship.objects.filter(user=user).values('friend_id')
+    Attendance = Event.attendees.through
+    friend_counts = dict(
+        Attendance.objects
+        .filter(user_id__in=friend_ids, **event_window)
+        .values('event_id')
+        .annotate(n=Count('user_id'))
+        .values_list('event_id', 'n')
+    )
+
+    candidate_ids = hosted_ids | set(interest_counts) | set(friend_counts)
+    if not candidate_ids:
+        return []
+
+    events = Event.objects.filter(id__in=candidate_ids, club__isnull=False).select_related('club')
+
+    suggestions = []
+    for event in events:
+        score = 0
+        reasons = []
+
+        if event.id in hosted_ids:
+            score += WEIGHTS['my_club']
+            reasons.append('Event hosted by your club')
+
+        if event.id in interest_counts:
+            score += WEIGHTS['shared_interest'] * interest_counts[event.id]
+            reasons.append('Matches your interests')
+
+        friend_count = friend_counts.get(event.id, 0)
+        if friend_count:
+            score += WEIGHTS['friend_attending'] * friend_count
+            reasons.append(f'{friend_count} friend(s) attending')
+
+        suggestions.append((event, score, reasons))
+
+    # Best first; sooner events win ties
+    suggestions.sort(key=lambda s: (-s[1], s[0].date, s[0].id))
+    return suggestions[:limit]
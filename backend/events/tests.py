@@ -1,3 +1,47 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from backend.testing import client_for, make_user
+from .models import Event
+
+
+@override_settings(API_PAGE_SIZE=2)
+class EventListPaginationTests(TestCase):
+    def setUp(self):
+        self.client = client_for(make_user('alice'))
+        start = timezone.now() + timedelta(days=1)
+        # Two events share a date so the id tie-breaker is exercised
+        self.events = [
+            Event.objects.create(title=title, date=start + timedelta(hours=hours))
+            for title, hours in (('delta', 0), ('alpha', 1), ('charlie', 1), ('bravo', 2), ('echo', 3))
+        ]
+
+    def walk(self, **params):
+        pages, cursor = [], None
+        while True:
+            response = self.client.get('/api/events/', {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            pages.append([event['title'] for event in response.data])
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                return pages
+
+    def test_cursor_walks_every_event_once(self):
+        self.assertEqual(self.walk(), [['delta', 'alpha'], ['charlie', 'bravo'], ['echo']])
+
+    def test_ordering_param_picks_cursor_field(self):
+        self.assertEqual(self.walk(ordering='title'), [['alpha', 'bravo'], ['charlie', 'delta'], ['echo']])
+        self.assertEqual(self.walk(ordering='-date'), [['echo', 'bravo'], ['charlie', 'alpha'], ['delta']])
+
+    def test_unknown_ordering_falls_back_to_date(self):
+        self.assertEqual(self.walk(ordering='location')[0], ['delta', 'alpha'])
+
+    def test_page_size_is_capped(self):
+        with self.settings(API_MAX_PAGE_SIZE=3):
+            response = self.client.get('/api/events/', {'page_size': 50})
+        self.assertEqual(len(response.data), 3)
+        self.assertIn('rel="next"', response.headers['Link'])
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get('/api/events/', {'cursor': 'not-a-cursor'}).status_code, 404)
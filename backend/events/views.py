@@ -7,7 +7,7 @@ from .serializers import EventSerializer
 from clubs.models import Club
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from django.db.models import Count, Q
 from rest_framework.views import APIView
 from clubs.models import ClubMembership
 from users.serializers import UserPublicSerializer
@@ -16,6 +16,12 @@ from storage3.exceptions import StorageApiError
 import os
 from rest_framework.throttling import UserRateThrottle
 from rest_framework.decorators import throttle_classes
+from backend.pagination import KeysetPagination
+from backend.params import bounded_int
+from .suggestions import (
+    DEFAULT_SUGGESTIONS, DEFAULT_WINDOW_DAYS, MAX_SUGGESTIONS, MAX_WINDOW_DAYS,
+    compute_suggestions as compute_event_suggestions,
+)
 
 class CreateEventThrottle(UserRateThrottle):
     rate = '5/hour'
@@ -89,13 +95,14 @@ class EventCreateAPIView(generics.GenericAPIView):
 class EventListAPIView(generics.ListAPIView):
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.OrderingFilter]
-    ordering_fields = ['date', 'title']
-    ordering = ['date']
+    filter_backends = []
+    pagination_class = KeysetPagination
+    keyset_ordering = ('date', 'id')
+    ordering_fields = ['date', 'title']  # ?ordering= picks the cursor's field
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Event.objects.all()
+        queryset = Event.objects.select_related('club').annotate(num_attendees=Count('attendees'))
         query = self.request.GET.get('q')
         upcoming = self.request.GET.get('upcoming')
         club_name = self.request.GET.get('club')
@@ -136,7 +143,9 @@ class ClubEventListAPIView(generics.ListAPIView):
 
     def get_queryset(self):
         club_name = self.kwargs['club_name']
-        queryset = Event.objects.filter(club__name=club_name)
+        queryset = Event.objects.filter(club__name=club_name).select_related('club').annotate(
+            num_attendees=Count('attendees')
+        )
 
         query = self.request.GET.get('q')
         upcoming = self.request.GET.get('upcoming')
@@ -218,45 +227,20 @@ class SuggestedEventsAPIView(APIView):
     #throttle_classes = [SuggestedEventsThrottle]
 
     def get(self, request):
-        me = request.user
-
-        my_club_ids = list(me.clubs.values_list('id', flat=True))
-        my_interests = set(map(str.lower, me.interests or [])) if me.interests else set()
-        my_friends = me.friends.all()
-
-        # Start with all upcoming events
-        events = Event.objects.filter(date__gte=timezone.now()).exclude(club__isnull=True) # assuming event has a 'date' and optional 'club'
-
-        suggestions = []
-        for event in events:
-            reasons = []
-
-            # If event is tied to a club I'm in
-            if event.club and event.club.id in my_club_ids:
-                reasons.append('Event hosted by your club')
-
-            # If event matches interests by event title/description
-            if my_interests:
-                combined_text = (event.title + ' ' + (event.description or '')).lower()
-                if any(interest in combined_text for interest in my_interests):
-                    reasons.append('Matches your interests')
-
-            # If my friends RSVP’d to the event (optional)
-            friend_ids = my_friends.values_list('id', flat=True)
-            friend_attendees = event.attendees.filter(id__in=friend_ids).count()
-            if friend_attendees > 0:
-                reasons.append(f'{friend_attendees} friend(s) attending')
-
-            if reasons:
-                event_data = {
-                    'id': event.id,
-                    'title': event.title,
-                    'date': event.date,
-                    'club': event.club.name if event.club else None,
-                    'match_reasons': reasons,
-                }
-                suggestions.append(event_data)
-
+        days = bounded_int(request.query_params.get('days'), DEFAULT_WINDOW_DAYS, 1, MAX_WINDOW_DAYS)
+        limit = bounded_int(request.query_params.get('limit'), DEFAULT_SUGGESTIONS, 1, MAX_SUGGESTIONS)
+
+        suggestions = [
+            {
+                'id': event.id,
+                'title': event.title,
+                'date': event.date,
+                'club': event.club.name if event.club else None,
+                'match_reasons': reasons,
+                'score': score,
+            }
+            for event, score, reasons in compute_event_suggestions(request.user, days, limit)
+        ]
         return Response(suggestions)
 
 class EventDetailAPIView(APIView):
@@ -269,7 +253,7 @@ class EventDetailAPIView(APIView):
         except Event.DoesNotExist:
             return Response({'error': 'Event not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        attendees = event.attendees.all()
+        attendees = event.attendees.prefetch_related('clubs')
         attendee_data = UserPublicSerializer(attendees, many=True, context={'request': request}).data
         
         return Response({
@@ -1,8 +1,13 @@
 from django.contrib import admin
-from .models import FriendRequest
+from .models import FriendRequest, Friendship
 
 # Register your models here.
 
 @admin.register(FriendRequest)
 class FriendRequestAdmin(admin.ModelAdmin):
-    list_display = ('id', 'from_user', 'to_user', 'status', 'created_at')
\ No newline at end of file
+    list_display = ('id', 'from_user', 'to_user', 'status', 'created_at')
+
+@admin.register(Friendship)
+class FriendshipAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'friend', 'created_at')
+    raw_id_fields = ('user', 'friend')
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from friends.models import FriendRequest, Friendship
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the Friendship edge table from accepted FriendRequests."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--prune', action='store_true',
+            help="Also delete edges that no longer have an accepted FriendRequest behind them."
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        accepted = (
+            FriendRequest.objects.filter(status='accepted')
+            .values_list('from_user_id', 'to_user_id')
+            .order_by('id')
+        )
+
+        created = 0
+        batch = []
+        for from_id, to_id in accepted.iterator(chunk_size=batch_size):
+            batch.append(Friendship(user_id=from_id, friend_id=to_id))
+            batch.append(Friendship(user_id=to_id, friend_id=from_id))
+            if len(batch) >= batch_size:
+                created += self._flush(batch)
+                batch = []
+        if batch:
+            created += self._flush(batch)
+
+        self.stdout.write(f"Wrote {created} friendship edges.")
+
+        if options['prune']:
+            pairs = set()
+            for from_id, to_id in accepted.iterator(chunk_size=batch_size):
+                pairs.add((from_id, to_id))
+                pairs.add((to_id, from_id))
+
+            stale_ids = [
+                edge_id
+                for edge_id, user_id, friend_id in Friendship.objects.values_list('id', 'user_id', 'friend_id').iterator(chunk_size=batch_size)
+                if (user_id, friend_id) not in pairs
+            ]
+            for i in range(0, len(stale_ids), batch_size):
+                Friendship.objects.filter(id__in=stale_ids[i:i + batch_size]).delete()
+            self.stdout.write(f"Pruned {len(stale_ids)} stale friendship edges.")
+
+        self.stdout.write(self.style.SUCCESS("Friendship backfill complete."))
+
+    def _flush(self, batch):
+        with transaction.atomic():
+            Friendship.objects.bulk_create(batch, ignore_conflicts=True)
+        return len(batch)
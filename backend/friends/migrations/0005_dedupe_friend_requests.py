@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 14:14
+
+from django.db import migrations
+from django.db.models import Count, Q
+from django.db.models.functions import Greatest, Least
+
+LIVE = ['pending', 'accepted']
+
+
+def delete_duplicate_requests(apps, schema_editor):
+    """
+    Leaves one live (pending or accepted) request per pair of users before
+    friend_request_unique_pair is added: the oldest accepted one if the pair
+    are friends, otherwise the oldest pending one.
+    """
+    FriendRequest = apps.get_model('friends', 'FriendRequest')
+    live = FriendRequest.objects.filter(status__in=LIVE).annotate(
+        low=Least('from_user_id', 'to_user_id'), high=Greatest('from_user_id', 'to_user_id'),
+    )
+    duplicated = live.values('low', 'high').annotate(n=Count('id')).filter(n__gt=1).order_by()
+    for row in duplicated:
+        pair = live.filter(
+            Q(from_user_id=row['low'], to_user_id=row['high']) | Q(from_user_id=row['high'], to_user_id=row['low'])
+        )
+        # 'accepted' sorts before 'pending'
+        keep = pair.order_by('status', 'created_at', 'id').values_list('id', flat=True)[0]
+        pair.exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0004_friendship'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_requests, migrations.RunPython.noop),
+    ]
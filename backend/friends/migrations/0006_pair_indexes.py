@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 14:14
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently, AddUniqueConstraintConcurrently
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY on PostgreSQL, which can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('friends', '0005_dedupe_friend_requests'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='friendrequest',
+            index=models.Index(fields=['from_user', 'to_user', 'status'], name='friend_request_pair_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['to_user', 'from_user'], name='friend_request_incoming_idx'),
+        ),
+        AddUniqueConstraintConcurrently(
+            model_name='friendrequest',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Least('from_user', 'to_user'), django.db.models.functions.comparison.Greatest('from_user', 'to_user'), condition=models.Q(('status__in', ['pending', 'accepted'])), name='friend_request_unique_pair'),
+        ),
+    ]
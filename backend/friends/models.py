@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Greatest, Least
 from django.conf import settings
 
 class FriendRequest(models.Model):
@@ -15,5 +16,47 @@ class FriendRequest(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Lookups of one direction of a pair (accept/cancel/remove) and of a user's sent requests
+            models.Index(fields=['from_user', 'to_user', 'status'], name='friend_request_pair_idx'),
+            # Incoming requests; only pending ones are ever listed
+            models.Index(
+                fields=['to_user', 'from_user'],
+                condition=models.Q(status='pending'),
+                name='friend_request_incoming_idx',
+            ),
+        ]
+        constraints = [
+            # At most one live request per pair of users, whichever way it was sent
+            models.UniqueConstraint(
+                Least('from_user', 'to_user'),
+                Greatest('from_user', 'to_user'),
+                condition=models.Q(status__in=['pending', 'accepted']),
+                name='friend_request_unique_pair',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.from_user.username} ➔ {self.to_user.username} ({self.status})"
+
+
+class Friendship(models.Model):
+    """
+    Materialized friendship edge. Every accepted FriendRequest is stored as two
+    rows (user -> friend and friend -> user) so lookups only ever filter on `user`.
+    Kept in sync with FriendRequest by friends.signals.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name='friendships', on_delete=models.CASCADE
+    )
+    friend = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name='friend_of', on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'friend')  # also serves as the (user, friend) lookup index
+
+    def __str__(self):
+        return f"{self.user_id} ↔ {self.friend_id}"
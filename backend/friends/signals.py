@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import FriendRequest
+from .utils import add_friendship, remove_friendship
+
+
+@receiver(post_save, sender=FriendRequest)
+def sync_friendship_on_save(sender, instance, created, **kwargs):
+    if instance.status == 'accepted':
+        add_friendship(instance.from_user_id, instance.to_user_id)
+    elif not created:
+        # Request moved away from 'accepted' (or was never accepted)
+        remove_friendship(instance.from_user_id, instance.to_user_id)
+
+
+@receiver(post_delete, sender=FriendRequest)
+def sync_friendship_on_delete(sender, instance, **kwargs):
+    if instance.status == 'accepted':
+        remove_friendship(instance.from_user_id, instance.to_user_id)
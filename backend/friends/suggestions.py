@@ -0,0 +1,178 @@
+"""
+Friend suggestions.
+
+Candidates are drawn from indexed sources instead of scanning every user:
+friends of friends (Friendship edges), members of the user's clubs
+(ClubMembership), users sharing interest terms (interests.UserInterest) and
+users with the same graduation year. Each source is an aggregate capped at
+CANDIDATE_POOL_SIZE rows, so the work per call depends on the size of the
+user's neighbourhood, not on the size of the user table.
+
+The candidates are then scored (mutual friends, shared clubs, shared interests,
+same year, similar major) and the top MAX_SUGGESTIONS are cached per user for
+FRIEND_SUGGESTIONS_CACHE_TTL seconds. Cached results are filtered against the
+user's current friends and pending requests on every read.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from clubs.models import ClubMembership
+from interests.models import UserInterest
+from interests.utils import shared_interest_counts, shared_interest_names
+from users.models import User
+from users.relationships import ViewerRelationships
+from .models import Friendship
+
+DEFAULT_SUGGESTIONS = 20
+MAX_SUGGESTIONS = 50
+CANDIDATE_POOL_SIZE = 500
+
+WEIGHTS = {
+    'mutual_friend': 3,
+    'shared_club': 2,
+    'shared_interest': 1,
+    'same_year': 1,
+    'similar_major': 1,
+}
+
+
+def _cache_key(user_id):
+    return f'friend-suggestions:{user_id}'
+
+
+def excluded_user_ids(relationships):
+    """
+    The user, their friends and everyone they have a pending request with,
+    from a ViewerRelationships (a request's one is shared with its serializers).
+    """
+    return (
+        {relationships.user.id} | relationships.friend_ids |
+        relationships.pending_sent_ids | relationships.pending_received_ids
+    )
+
+
+def _candidate_counts(user, excluded):
+    """
+    Returns ({user_id: mutual friends}, {user_id: shared clubs},
+    {user_id: shared interest terms}, same-year ids).
+    """
+    my_friend_ids = Friendship.objects.filter(user=user).values('friend_id')
+    mutual = dict(
+        Friendship.objects
+        .filter(user_id__in=my_friend_ids)
+        .exclude(friend_id__in=excluded)
+        .values('friend_id')
+        .annotate(n=Count('id'))
+        .order_by('-n', 'friend_id')
+        .values_list('friend_id', 'n')[:CANDIDATE_POOL_SIZE]
+    )
+
+    my_club_ids = ClubMembership.objects.filter(user=user).values('club_id')
+    shared_clubs = dict(
+        ClubMembership.objects
+        .filter(club_id__in=my_club_ids)
+        .exclude(user_id__in=excluded)
+        .values('user_id')
+        .annotate(n=Count('club_id'))
+        .order_by('-n', 'user_id')
+        .values_list('user_id', 'n')[:CANDIDATE_POOL_SIZE]
+    )
+
+    shared_interests = dict(
+        shared_interest_counts(UserInterest, 'user', user)
+        .exclude(user_id__in=excluded)
+        .order_by('-shared', 'user_id')
+        .values_list('user_id', 'shared')[:CANDIDATE_POOL_SIZE]
+    )
+
+    same_year = set()
+    if user.graduation_year:
+        same_year = set(
+            User.objects
+            .filter(graduation_year=user.graduation_year, is_active=True)
+            .exclude(id__in=excluded)
+            .order_by('id')
+            .values_list('id', flat=True)[:CANDIDATE_POOL_SIZE]
+        )
+
+    return mutual, shared_clubs, shared_interests, same_year
+
+
+def _normalize_major(major):
+    return major.strip().lower() if major else None
+
+
+def compute_suggestions(user, limit=MAX_SUGGESTIONS, relationships=None):
+    """
+    Returns up to `limit` suggestions as (user_id, score, match_reasons)
+    tuples, best first.
+    """
+    excluded = excluded_user_ids(relationships or ViewerRelationships(user))
+    mutual, shared_clubs, shared_interests, same_year = _candidate_counts(user, excluded)
+
+    candidate_ids = set(mutual) | set(shared_clubs) | set(shared_interests) | same_year
+    if not candidate_ids:
+        return []
+
+    my_major = _normalize_major(user.major)
+    interest_names = shared_interest_names(UserInterest, 'user', user, candidate_ids)
+
+    candidates = User.objects.filter(id__in=candidate_ids).values('id', 'major')
+
+    suggestions = []
+    for candidate in candidates:
+        user_id = candidate['id']
+        score = 0
+        reasons = []
+
+        mutual_count = mutual.get(user_id, 0)
+        if mutual_count:
+            score += WEIGHTS['mutual_friend'] * mutual_count
+            reasons.append(f"{mutual_count} mutual friend{'s' if mutual_count != 1 else ''}")
+
+        if user_id in same_year:
+            score += WEIGHTS['same_year']
+            reasons.append("Same graduation year")
+
+        club_count = shared_clubs.get(user_id, 0)
+        if club_count:
+            score += WEIGHTS['shared_club'] * club_count
+            reasons.append("Same club")
+
+        their_major = _normalize_major(candidate['major'])
+        if my_major and their_major and (my_major in their_major or their_major in my_major):
+            score += WEIGHTS['similar_major']
+            reasons.append("Similar major")
+
+        shared = interest_names.get(user_id)
+        if shared:
+            score += WEIGHTS['shared_interest'] * len(shared)
+            reasons.append(f"Shared interests: {', '.join(shared)}")
+
+        if reasons:
+            suggestions.append((user_id, score, reasons))
+
+    suggestions.sort(key=lambda s: (-s[1], s[0]))
+    return suggestions[:limit]
+
+
+def get_suggestions(user, limit=DEFAULT_SUGGESTIONS, relationships=None):
+    """
+    Cached top-`limit` suggestions for the user, without current friends and
+    pending requests. Pass the request's ViewerRelationships to reuse the
+    sets it has already loaded.
+    """
+    relationships = relationships or ViewerRelationships(user)
+    key = _cache_key(user.id)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = compute_suggestions(user, MAX_SUGGESTIONS, relationships)
+        cache.set(key, suggestions, settings.FRIEND_SUGGESTIONS_CACHE_TTL)
+
+    excluded = excluded_user_ids(relationships)
+    return [s for s in suggestions if s[0] not in excluded][:limit]
+
+
+def invalidate_suggestions(*user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
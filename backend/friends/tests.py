@@ -1,3 +1,78 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from backend.testing import client_for, make_user
+from .models import FriendRequest, Friendship
+from .utils import are_friends
 
-# Create your tests here.
+
+class FriendSuggestionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice, self.bob, self.carol, self.dave = map(make_user, ('alice', 'bob', 'carol', 'dave'))
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.bob, status='accepted')
+        FriendRequest.objects.create(from_user=self.bob, to_user=self.carol, status='accepted')
+        FriendRequest.objects.create(from_user=self.bob, to_user=self.dave, status='accepted')
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.dave, status='pending')
+        self.client = client_for(self.alice)
+
+    def test_friends_of_friends_without_pending_requests(self):
+        response = self.client.get('/api/friends/suggestions/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user['username'] for user in response.data], ['carol'])
+        self.assertEqual(response.data[0]['match_reasons'], ['1 mutual friend'])
+
+    def test_relationships_are_loaded_once_per_request(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get('/api/friends/suggestions/')
+        pending = [query for query in captured if "'pending'" in query['sql'] and 'friends_friendrequest' in query['sql']]
+        # One query for sent and one for received requests, shared by the
+        # candidate search, the cached-result filter and the serializer
+        self.assertEqual(len(pending), 2)
+
+
+class FriendshipSyncTests(TestCase):
+    def setUp(self):
+        self.alice, self.bob = make_user('alice'), make_user('bob')
+
+    def edges(self):
+        return sorted(Friendship.objects.values_list('user__username', 'friend__username'))
+
+    def befriend(self):
+        response = client_for(self.alice).post('/api/friends/send/', {'to_username': 'bob'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.edges(), [])
+        response = client_for(self.bob).post('/api/friends/accept/', {'from_username': 'alice'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_accepting_creates_both_edges(self):
+        self.befriend()
+        self.assertEqual(self.edges(), [('alice', 'bob'), ('bob', 'alice')])
+        self.assertTrue(are_friends(self.bob, self.alice))
+        response = client_for(self.alice).get('/api/friends/friends/')
+        self.assertEqual([user['username'] for user in response.data], ['bob'])
+
+    def test_rejecting_creates_no_edges(self):
+        client_for(self.alice).post('/api/friends/send/', {'to_username': 'bob'}, format='json')
+        client_for(self.bob).post('/api/friends/reject/', {'from_username': 'alice'}, format='json')
+        self.assertEqual(self.edges(), [])
+
+    def test_unfriending_removes_both_edges(self):
+        self.befriend()
+        response = client_for(self.bob).post('/api/friends/remove/', {'username': 'alice'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.edges(), [])
+        self.assertFalse(are_friends(self.alice, self.bob))
+
+    def test_status_change_and_delete_remove_edges(self):
+        request = FriendRequest.objects.create(from_user=self.alice, to_user=self.bob, status='accepted')
+        self.assertEqual(len(self.edges()), 2)
+        request.status = 'rejected'
+        request.save()
+        self.assertEqual(self.edges(), [])
+
+        request.status = 'accepted'
+        request.save()
+        request.delete()
+        self.assertEqual(self.edges(), [])
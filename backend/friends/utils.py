@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import Q
+from .models import FriendRequest, Friendship
+from .suggestions import invalidate_suggestions
+
+
+def are_friends(user1, user2):
+    """
+    Single (user, friend) index lookup against the Friendship edge table.
+    """
+    return Friendship.objects.filter(user=user1, friend=user2).exists()
+
+
+def add_friendship(user1_id, user2_id):
+    """
+    Creates both directions of the friendship edge. Safe to call repeatedly.
+    """
+    with transaction.atomic():
+        Friendship.objects.bulk_create([
+            Friendship(user_id=user1_id, friend_id=user2_id),
+            Friendship(user_id=user2_id, friend_id=user1_id),
+        ], ignore_conflicts=True)
+    invalidate_suggestions(user1_id, user2_id)
+
+
+def remove_friendship(user1_id, user2_id):
+    """
+    Removes both directions of the friendship edge, unless another accepted
+    FriendRequest between the two users still exists.
+    """
+    with transaction.atomic():
+        still_friends = FriendRequest.objects.filter(
+            Q(from_user_id=user1_id, to_user_id=user2_id) | Q(from_user_id=user2_id, to_user_id=user1_id),
+            status='accepted'
+        ).exists()
+        if still_friends:
+            return
+        Friendship.objects.filter(
+            Q(user_id=user1_id, friend_id=user2_id) | Q(user_id=user2_id, friend_id=user1_id)
+        ).delete()
+    invalidate_suggestions(user1_id, user2_id)
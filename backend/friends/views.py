@@ -3,9 +3,13 @@ from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 from rest_framework.decorators import api_view, permission_classes
-from .models import FriendRequest
+from django.db import IntegrityError, transaction
+from .models import FriendRequest, Friendship
 from .serializers import FriendRequestSerializer
 from users.serializers import UserPublicSerializer
+from users.relationships import get_viewer_relationships
+from backend.params import bounded_int
+from .suggestions import DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS, get_suggestions
 from rest_framework.permissions import IsAuthenticated
 from clubs.models import Club
 from rest_framework.throttling import UserRateThrottle
@@ -50,10 +54,21 @@ class FriendRequestCreateAPIView(generics.GenericAPIView):
         except User.DoesNotExist:
             return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        if FriendRequest.objects.filter(from_user=request.user, to_user=to_user, status__in=['pending', 'accepted']).exists():
+        existing = FriendRequest.objects.filter(
+            Q(from_user=request.user, to_user=to_user) | Q(from_user=to_user, to_user=request.user),
+            status__in=['pending', 'accepted']
+        ).values_list('from_user_id', 'status').first()
+        if existing == (to_user.id, 'pending'):
+            return Response({'error': f'{to_user.username} already sent you a friend request.'}, status=status.HTTP_400_BAD_REQUEST)
+        if existing:
             return Response({'error': 'Friend request already sent or already friends.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        FriendRequest.objects.create(from_user=request.user, to_user=to_user)
+        # friend_request_unique_pair rejects a request racing in from either side
+        try:
+            with transaction.atomic():
+                FriendRequest.objects.create(from_user=request.user, to_user=to_user)
+        except IntegrityError:
+            return Response({'error': 'Friend request already sent or already friends.'}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({'message': 'Friend request sent.'}, status=status.HTTP_201_CREATED)
 
@@ -62,7 +77,7 @@ class FriendRequestListAPIView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return FriendRequest.objects.filter(to_user=self.request.user, status='pending')
+        return FriendRequest.objects.filter(to_user=self.request.user, status='pending').select_related('from_user', 'to_user')
 
 class AcceptFriendRequestAPIView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -83,8 +98,10 @@ class AcceptFriendRequestAPIView(generics.GenericAPIView):
             return Response({'error': 'Friend request not found or already handled.'}, status=status.HTTP_404_NOT_FOUND)
 
         if action == "accept":
-            friend_request.status = 'accepted'
-            friend_request.save()
+            # Friendship edges are written by the post_save signal in the same transaction
+            with transaction.atomic():
+                friend_request.status = 'accepted'
+                friend_request.save()
 
             return Response({'message': 'Friend request accepted.'})
 
@@ -123,20 +140,7 @@ class FriendListAPIView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        friends = FriendRequest.objects.filter(
-            Q(from_user=user) | Q(to_user=user),
-            status='accepted'
-        )
-
-        friend_users = []
-        for friend_request in friends:
-            if friend_request.from_user == user:
-                friend_users.append(friend_request.to_user)
-            else:
-                friend_users.append(friend_request.from_user)
-
-        return friend_users
+        return self.request.user.friends.prefetch_related('clubs')
 
 class RemoveFriendAPIView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -157,7 +161,8 @@ class RemoveFriendAPIView(generics.GenericAPIView):
         except (User.DoesNotExist, FriendRequest.DoesNotExist):
             return Response({'error': 'Friend not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        friend_request.delete()
+        with transaction.atomic():
+            friend_request.delete()
         return Response({'message': 'Friend removed successfully.'}, status=status.HTTP_200_OK)
 
 
@@ -168,46 +173,22 @@ class RemoveFriendAPIView(generics.GenericAPIView):
 def friend_suggestions(request):
     me = request.user
 
-    friends = me.friends.all()
-
-    # Only exclude users with PENDING friend requests
-    pending_sent = FriendRequest.objects.filter(from_user=me, status='pending').values_list('to_user', flat=True)
-    pending_received = FriendRequest.objects.filter(to_user=me, status='pending').values_list('from_user', flat=True)
+    limit = bounded_int(request.query_params.get('limit'), DEFAULT_SUGGESTIONS, 1, MAX_SUGGESTIONS)
 
-    excluded_ids = set(friends.values_list('id', flat=True)) | set(pending_sent) | set(pending_received) | {me.id}
+    ranked = get_suggestions(me, limit, get_viewer_relationships(request))
 
-    my_club_ids = list(me.clubs.values_list('id', flat=True))
-    my_grad_year = me.graduation_year
-    my_major = me.major.strip().lower() if me.major else None
-    my_interests = set(map(str.lower, me.interests or []))
-
-    candidates = User.objects.exclude(id__in=excluded_ids).prefetch_related('clubs')
+    users = User.objects.filter(id__in=[user_id for user_id, _, _ in ranked]).prefetch_related('clubs')
+    users_by_id = {user.id: user for user in users}
 
     suggestions = []
-    for user in candidates:
-        reasons = []
-
-        if my_grad_year and user.graduation_year == my_grad_year:
-            reasons.append("Same graduation year")
-
-        user_club_ids = {club.id for club in user.clubs.all()}
-        if user_club_ids & set(my_club_ids):
-            reasons.append("Same club")
-
-        if my_major and user.major:
-            user_major = user.major.strip().lower()
-            if my_major in user_major or user_major in my_major:
-                reasons.append("Similar major")
-
-        user_interests = set(map(str.lower, user.interests or []))
-        shared_interests = my_interests & user_interests
-        if shared_interests:
-            reasons.append(f"Shared interests: {', '.join(sorted(shared_interests))}")
-
-        if reasons:
-            data = UserPublicSerializer(user, context={'request': request}).data
-            data['match_reasons'] = reasons
-            suggestions.append(data)
+    for user_id, score, reasons in ranked:
+        user = users_by_id.get(user_id)
+        if user is None:
+            continue
+        data = UserPublicSerializer(user, context={'request': request}).data
+        data['match_reasons'] = reasons
+        data['score'] = score
+        suggestions.append(data)
 
     return Response(suggestions)
 
@@ -221,9 +202,5 @@ class UserFriendsCountAPIView(generics.GenericAPIView):
         except User.DoesNotExist:
             return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        friends = FriendRequest.objects.filter(
-            Q(from_user=user) | Q(to_user=user),
-            status='accepted'
-        )
-        count = friends.count()
+        count = Friendship.objects.filter(user=user).count()
         return Response({'friends_count': count})
\ No newline at end of file
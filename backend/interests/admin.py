@@ -0,0 +1,26 @@
+from django.contrib import admin
+from .models import Interest, UserInterest, ClubInterest, EventInterest
+
+
+@admin.register(Interest)
+class InterestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name')
+    search_fields = ('name',)
+
+
+@admin.register(UserInterest)
+class UserInterestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'interest')
+    raw_id_fields = ('user', 'interest')
+
+
+@admin.register(ClubInterest)
+class ClubInterestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'club', 'interest')
+    raw_id_fields = ('club', 'interest')
+
+
+@admin.register(EventInterest)
+class EventInterestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event', 'interest')
+    raw_id_fields = ('event', 'interest')
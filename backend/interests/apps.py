@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class InterestsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'interests'
+
+    def ready(self):
+        import interests.signals
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from clubs.models import Club
+from events.models import Event
+from interests.models import UserInterest, ClubInterest, EventInterest
+from interests.utils import rebuild_links, user_terms, club_terms, event_terms
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the interest index for users, clubs and events."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--only', choices=['users', 'clubs', 'events'],
+            help="Only rebuild one kind of object."
+        )
+
+    def handle(self, *args, **options):
+        sources = [
+            ('users', User.objects.only('id', 'interests'), UserInterest, 'user', user_terms),
+            ('clubs', Club.objects.only('id', 'name', 'description'), ClubInterest, 'club', club_terms),
+            ('events', Event.objects.only('id', 'title', 'description'), EventInterest, 'event', event_terms),
+        ]
+        for label, queryset, link_model, owner_field, terms_for in sources:
+            if options['only'] and options['only'] != label:
+                continue
+            linked = self._rebuild(queryset, link_model, owner_field, terms_for, options['batch_size'])
+            self.stdout.write(f"Indexed {label}: {linked} links.")
+
+        self.stdout.write(self.style.SUCCESS("Interest backfill complete."))
+
+    def _rebuild(self, queryset, link_model, owner_field, terms_for, batch_size):
+        linked = 0
+        batch = {}
+        for obj in queryset.order_by('id').iterator(chunk_size=batch_size):
+            batch[obj.id] = terms_for(obj)
+            if len(batch) >= batch_size:
+                linked += rebuild_links(link_model, owner_field, batch, batch_size)
+                batch = {}
+        if batch:
+            linked += rebuild_links(link_model, owner_field, batch, batch_size)
+        return linked
@@ -0,0 +1,62 @@
+# Generated by Django 5.2 on 2026-10-18 13:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('clubs', '0009_club_thread'),
+        ('events', '0005_cursor_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Interest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EventInterest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interest_links', to='events.event')),
+                ('interest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_links', to='interests.interest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['interest', 'event'], name='eventinterest_interest_idx')],
+                'unique_together': {('event', 'interest')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ClubInterest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interest_links', to='clubs.club')),
+                ('interest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='club_links', to='interests.interest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['interest', 'club'], name='clubinterest_interest_idx')],
+                'unique_together': {('club', 'interest')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserInterest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_links', to='interests.interest')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interest_links', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['interest', 'user'], name='userinterest_interest_idx')],
+                'unique_together': {('user', 'interest')},
+            },
+        ),
+    ]
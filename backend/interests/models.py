@@ -0,0 +1,60 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+from clubs.models import Club
+from events.models import Event
+
+User = get_user_model()
+
+
+class Interest(models.Model):
+    """
+    A normalized interest term (a lowercased word or phrase, see interests/utils.py).
+    Users, clubs and events are linked to terms through the join tables below,
+    so "everything sharing an interest with me" is an indexed join.
+    """
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class UserInterest(models.Model):
+    """
+    Derived from User.interests, which stays the source of truth.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interest_links')
+    interest = models.ForeignKey(Interest, on_delete=models.CASCADE, related_name='user_links')
+
+    class Meta:
+        unique_together = ('user', 'interest')
+        indexes = [
+            models.Index(fields=['interest', 'user'], name='userinterest_interest_idx'),
+        ]
+
+
+class ClubInterest(models.Model):
+    """
+    Derived from the club's name and description.
+    """
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='interest_links')
+    interest = models.ForeignKey(Interest, on_delete=models.CASCADE, related_name='club_links')
+
+    class Meta:
+        unique_together = ('club', 'interest')
+        indexes = [
+            models.Index(fields=['interest', 'club'], name='clubinterest_interest_idx'),
+        ]
+
+
+class EventInterest(models.Model):
+    """
+    Derived from the event's title and description.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='interest_links')
+    interest = models.ForeignKey(Interest, on_delete=models.CASCADE, related_name='event_links')
+
+    class Meta:
+        unique_together = ('event', 'interest')
+        indexes = [
+            models.Index(fields=['interest', 'event'], name='eventinterest_interest_idx'),
+        ]
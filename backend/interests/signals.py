@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from clubs.models import Club
+from events.models import Event
+from .utils import sync_user_interests, sync_club_interests, sync_event_interests
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def index_user_interests(sender, instance, update_fields=None, **kwargs):
+    # Saves such as last_login updates don't touch interests
+    if update_fields is not None and 'interests' not in update_fields:
+        return
+    sync_user_interests(instance)
+
+
+@receiver(post_save, sender=Club)
+def index_club_interests(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'name', 'description'} & set(update_fields):
+        return
+    sync_club_interests(instance)
+
+
+@receiver(post_save, sender=Event)
+def index_event_interests(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    sync_event_interests(instance)
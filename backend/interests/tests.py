@@ -0,0 +1,53 @@
+from django.test import TestCase
+from clubs.models import Club
+from backend.testing import make_user
+from .models import ClubInterest, UserInterest
+from .utils import interest_terms, normalize_phrase, shared_interest_names, tokenize
+
+class TokenizeTests(TestCase):
+    def test_interests_are_whole_phrases(self):
+        self.assertEqual(normalize_phrase('  Machine   Learning '), 'machine learning')
+        self.assertEqual(normalize_phrase('C'), 'c')
+        self.assertEqual(normalize_phrase('C++'), 'c++')
+        self.assertIsNone(normalize_phrase('Club'))
+        self.assertIsNone(normalize_phrase(''))
+
+    def test_free_text_keeps_short_words_and_bigrams(self):
+        terms = tokenize('R and C for Machine Learning club')
+        self.assertTrue({'r', 'c', 'machine', 'learning', 'machine learning'} <= terms)
+        # Phrases may not start or end with a stopword
+        self.assertFalse({'and', 'r and', 'learning club', 'club'} & terms)
+
+    def test_long_interests_become_phrases_free_text_can_match(self):
+        self.assertEqual(interest_terms('Machine Learning Research'), {'machine learning', 'learning research'})
+        self.assertEqual(interest_terms('Ultimate Frisbee Club'), {'ultimate frisbee'})
+        self.assertEqual(interest_terms('The Art of War'), {'art', 'war'})
+        self.assertEqual(interest_terms('Machine Learning'), {'machine learning'})
+
+
+class SharedInterestTests(TestCase):
+    def setUp(self):
+        self.user = make_user('alice', interests=['Machine Learning', 'R'])
+
+    def test_phrase_matches_phrase_not_its_words(self):
+        ml = Club.objects.create(name='ML Society', description='Machine learning reading group', owner=self.user)
+        learning = Club.objects.create(name='Learning Lab', description='Study skills', owner=self.user)
+        stats = Club.objects.create(name='Stats', description='Data analysis in R', owner=self.user)
+
+        self.assertEqual(
+            set(UserInterest.objects.filter(user=self.user).values_list('interest__name', flat=True)),
+            {'machine learning', 'r'},
+        )
+        names = shared_interest_names(ClubInterest, 'club', self.user)
+        self.assertEqual(names.get(ml.id), ['machine learning'])
+        self.assertNotIn(learning.id, names)
+        self.assertEqual(names.get(stats.id), ['r'])
+
+    def test_multi_word_interest_matches_clubs(self):
+        user = make_user('bob', interests=['Ultimate Frisbee Club', 'Machine Learning Research'])
+        frisbee = Club.objects.create(name='Ultimate', description='Ultimate frisbee on the quad', owner=user)
+        ml = Club.objects.create(name='ML Society', description='Machine learning reading group', owner=user)
+
+        names = shared_interest_names(ClubInterest, 'club', user)
+        self.assertEqual(names.get(frisbee.id), ['ultimate frisbee'])
+        self.assertEqual(names.get(ml.id), ['machine learning'])
@@ -0,0 +1,198 @@
+import re
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Interest, UserInterest, ClubInterest, EventInterest
+
+MAX_TERM_LENGTH = 50
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Words that are too common (or too generic on a campus) to say anything about
+# what someone is interested in.
+STOPWORDS = {
+    'a', 'about', 'all', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for',
+    'from', 'get', 'has', 'have', 'how', 'if', 'in', 'into', 'is', 'it', 'its',
+    'join', 'me', 'more', 'my', 'new', 'not', 'of', 'on', 'or', 'our', 'out', 'so',
+    'that', 'the', 'their', 'them', 'this', 'to', 'up', 'us', 'was', 'we', 'what',
+    'when', 'where', 'who', 'will', 'with', 'you', 'your',
+    'club', 'clubs', 'event', 'events', 'meeting', 'meetings', 'society', 'team',
+    'group', 'students', 'student', 'campus', 'night', 'welcome', 'everyone',
+}
+
+
+# Longest phrase taken from free text; "machine learning" is kept as one term
+# so it only matches users interested in machine learning, not in "learning".
+# Longer interests are stored as phrases of this length so they can match too.
+MAX_PHRASE_WORDS = 2
+
+
+def _words(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def normalize_phrase(text):
+    """
+    Normalizes one interest as a whole phrase: lowercased words joined by
+    single spaces ("Machine  Learning" -> "machine learning", "C" -> "c").
+    Returns None for empty phrases and lone stopwords.
+    """
+    words = _words(text)
+    if not words or (len(words) == 1 and words[0] in STOPWORDS):
+        return None
+    return ' '.join(words)[:MAX_TERM_LENGTH]
+
+
+def _phrases(words, size):
+    terms = set()
+    for i in range(len(words) - size + 1):
+        phrase = words[i:i + size]
+        if phrase[0] not in STOPWORDS and phrase[-1] not in STOPWORDS:
+            terms.add(' '.join(phrase)[:MAX_TERM_LENGTH])
+    return terms
+
+
+def tokenize(text):
+    """
+    Splits free text (club and event names and descriptions) into interest
+    terms: every phrase of up to MAX_PHRASE_WORDS words that neither starts nor
+    ends with a stopword.
+    """
+    words = _words(text)
+    terms = set()
+    for size in range(1, MAX_PHRASE_WORDS + 1):
+        terms |= _phrases(words, size)
+    return terms
+
+
+def interest_terms(text):
+    """
+    Terms for one of a user's interests. Short ones are kept whole (see
+    normalize_phrase()); longer ones, which free text never yields, become
+    their MAX_PHRASE_WORDS-word phrases ("machine learning research" ->
+    "machine learning", "learning research"), or their words if every such
+    phrase starts or ends with a stopword.
+    """
+    words = _words(text)
+    if len(words) <= MAX_PHRASE_WORDS:
+        phrase = normalize_phrase(text)
+        return {phrase} if phrase else set()
+    return _phrases(words, MAX_PHRASE_WORDS) or _phrases(words, 1)
+
+
+def user_terms(user):
+    terms = set()
+    for interest in user.interests or []:
+        if isinstance(interest, str):
+            terms |= interest_terms(interest)
+    return terms
+
+
+def club_terms(club):
+    return tokenize(f"{club.name} {club.description or ''}")
+
+
+def event_terms(event):
+    return tokenize(f"{event.title} {event.description or ''}")
+
+
+def _interest_ids(terms):
+    """
+    Returns {term: interest_id}, creating missing vocabulary rows.
+    """
+    if not terms:
+        return {}
+    Interest.objects.bulk_create([Interest(name=term) for term in terms], ignore_conflicts=True)
+    return dict(Interest.objects.filter(name__in=terms).values_list('name', 'id'))
+
+
+def _sync_links(link_model, owner_field, owner_id, terms):
+    """
+    Makes the owner's links in `link_model` match `terms`, only writing the
+    difference.
+    """
+    owner_filter = {f'{owner_field}_id': owner_id}
+    current = dict(
+        link_model.objects.filter(**owner_filter).values_list('interest__name', 'interest_id')
+    )
+    removed = [interest_id for term, interest_id in current.items() if term not in terms]
+    added = terms - set(current)
+    if not removed and not added:
+        return
+
+    with transaction.atomic():
+        if removed:
+            link_model.objects.filter(**owner_filter, interest_id__in=removed).delete()
+        if added:
+            link_model.objects.bulk_create([
+                link_model(**owner_filter, interest_id=interest_id)
+                for interest_id in _interest_ids(added).values()
+            ], ignore_conflicts=True)
+
+
+def rebuild_links(link_model, owner_field, terms_by_owner, batch_size=1000):
+    """
+    Replaces the links of every owner in `terms_by_owner` ({owner_id: terms}).
+    Used by the backfill command.
+    """
+    all_terms = set().union(*terms_by_owner.values()) if terms_by_owner else set()
+    interest_ids = _interest_ids(all_terms)
+    links = [
+        link_model(**{f'{owner_field}_id': owner_id}, interest_id=interest_ids[term])
+        for owner_id, terms in terms_by_owner.items()
+        for term in terms
+    ]
+    with transaction.atomic():
+        link_model.objects.filter(**{f'{owner_field}_id__in': list(terms_by_owner)}).delete()
+        link_model.objects.bulk_create(links, batch_size=batch_size, ignore_conflicts=True)
+    return len(links)
+
+
+def sync_user_interests(user):
+    _sync_links(UserInterest, 'user', user.pk, user_terms(user))
+
+
+def sync_club_interests(club):
+    _sync_links(ClubInterest, 'club', club.pk, club_terms(club))
+
+
+def sync_event_interests(event):
+    _sync_links(EventInterest, 'event', event.pk, event_terms(event))
+
+
+def my_interest_ids(user):
+    """
+    Subquery of the user's interest ids, for use in `interest_id__in=`.
+    """
+    return UserInterest.objects.filter(user=user).values('interest_id')
+
+
+def shared_interest_counts(link_model, owner_field, user):
+    """
+    Rows of {owner_field: id, 'shared': n} for every user/club/event sharing at
+    least one interest term with `user`, via the (interest, owner) index.
+    """
+    return (
+        link_model.objects
+        .filter(interest_id__in=my_interest_ids(user))
+        .values(f'{owner_field}_id')
+        .annotate(shared=Count('interest_id'))
+    )
+
+
+def shared_interest_names(link_model, owner_field, user, owner_ids=None):
+    """
+    Returns {owner_id: sorted shared terms}, for the given owners or for every
+    owner sharing a term with `user`.
+    """
+    names = {}
+    rows = link_model.objects.filter(interest_id__in=my_interest_ids(user))
+    if owner_ids is not None:
+        rows = rows.filter(**{f'{owner_field}_id__in': owner_ids})
+    rows = rows.values_list(f'{owner_field}_id', 'interest__name')
+    for owner_id, name in rows:
+        names.setdefault(owner_id, []).append(name)
+    for terms in names.values():
+        terms.sort()
+    return names
@@ -0,0 +1,167 @@
+import json
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from clubs.models import Club, ClubMembership
+from direct_messages.models import Thread
+
+User = get_user_model()
+
+
+def endpoints(user):
+    """
+    Returns {name: url} for the benchmarked endpoints, using the seeded user's
+    own data where a URL needs an id.
+    """
+    club = Club.objects.filter(id__in=ClubMembership.objects.filter(user=user).values('club_id')).first()
+    thread = Thread.objects.filter(participants__user=user).order_by('id').first()
+    urls = {
+        'feed': reverse('list_posts'),
+        'user-posts': reverse('list_user_posts', args=[user.username]),
+        'friend-suggestions': reverse('friend-suggestions'),
+        'friend-list': reverse('friend-list'),
+        'club-suggestions': reverse('suggested-clubs'),
+        'event-suggestions': reverse('suggested-events'),
+        'search': reverse('global-search') + '?q=chess',
+        'user-search': reverse('user-search') + '?q=lt',
+        'thread-list': reverse('thread-list'),
+        'club-list': reverse('club-list'),
+        'event-list': reverse('event-list') + '?upcoming=true',
+        'notification-list': reverse('notification-list'),
+    }
+    if club is not None:
+        urls['club-detail'] = reverse('club-detail', args=[club.name])
+    if thread is not None:
+        urls['message-list'] = reverse('message-list', args=[thread.id])
+    return urls
+
+
+def seeded_user(options):
+    """
+    The --username user, or else the first seeded user with --prefix.
+    """
+    if options['username']:
+        user = User.objects.filter(username=options['username']).first()
+    else:
+        user = User.objects.filter(username__startswith=options['prefix']).order_by('id').first()
+    if user is None:
+        raise CommandError("No user to request as; run seed_campus first or pass --username.")
+    return user
+
+
+@contextmanager
+def test_environment():
+    """
+    Allows the 'testserver' host and instruments template rendering, unless
+    that's already done (under the test runner).
+    """
+    try:
+        setup_test_environment()
+    except RuntimeError:
+        yield
+        return
+    try:
+        yield
+    finally:
+        teardown_test_environment()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the API views through the test client as a seeded user and reports "
+        "latency percentiles and query counts per endpoint as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="User to authenticate as (default: first user with --prefix).")
+        parser.add_argument('--prefix', default='lt_')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2, help="Untimed requests per endpoint first.")
+        parser.add_argument('--endpoint', action='append', dest='only', help="Only run this endpoint (repeatable).")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        user = seeded_user(options)
+        urls = endpoints(user)
+        if options['only']:
+            unknown = set(options['only']) - set(urls)
+            if unknown:
+                raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+            urls = {name: url for name, url in urls.items() if name in options['only']}
+
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with test_environment():
+            results = {
+                name: self.bench(client, url, options['iterations'], options['warmup'])
+                for name, url in urls.items()
+            }
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'user': user.username,
+            'iterations': options['iterations'],
+            'dataset': {
+                'users': User.objects.count(),
+                'clubs': Club.objects.count(),
+                'threads': Thread.objects.count(),
+            },
+            'endpoints': results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def bench(self, client, url, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url)
+
+        timings = []
+        queries = []
+        statuses = set()
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+
+        timings.sort()
+        return {
+            'url': url,
+            'status': sorted(statuses),
+            'ms': {
+                'p50': round(percentile(timings, 50), 2),
+                'p90': round(percentile(timings, 90), 2),
+                'p99': round(percentile(timings, 99), 2),
+                'mean': round(statistics.mean(timings), 2),
+                'max': round(timings[-1], 2),
+            },
+            'queries': {'min': min(queries), 'max': max(queries)},
+        }
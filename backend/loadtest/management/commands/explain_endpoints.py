@@ -0,0 +1,148 @@
+import json
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .bench_endpoints import endpoints, seeded_user, test_environment
+
+# SQLite query plan details, e.g. "SEARCH p USING INDEX post_author_cursor_idx (author_id=?)"
+SQLITE_INDEX_RE = re.compile(r'USING (?:COVERING )?INDEX (\w+)|USING (INTEGER PRIMARY KEY)')
+SQLITE_FULL_SCAN_RE = re.compile(r'^SCAN (\w+)$')
+
+
+def explain_sqlite(cursor, sql):
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+    details = [row[-1] for row in cursor.fetchall()]
+    indexes, full_scans = set(), set()
+    for detail in details:
+        for match in SQLITE_INDEX_RE.finditer(detail):
+            indexes.add(match.group(1) or 'rowid')
+        match = SQLITE_FULL_SCAN_RE.match(detail)
+        if match:
+            full_scans.add(match.group(1))
+    return details, indexes, full_scans
+
+
+def explain_postgresql(cursor, sql):
+    cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    plan = plan[0]['Plan']
+    indexes, full_scans = set(), set()
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        if 'Index Name' in node:
+            indexes.add(node['Index Name'])
+        if node['Node Type'] == 'Seq Scan':
+            full_scans.add(node['Relation Name'])
+        nodes.extend(node.get('Plans', []))
+    return plan, indexes, full_scans
+
+
+EXPLAINERS = {
+    'sqlite': explain_sqlite,
+    'postgresql': explain_postgresql,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests each benchmarked endpoint as a seeded user, runs EXPLAIN on the "
+        "SELECTs it issued and reports which indexes they use and which tables "
+        "they scan in full."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="User to authenticate as (default: first user with --prefix).")
+        parser.add_argument('--prefix', default='lt_')
+        parser.add_argument('--endpoint', action='append', dest='only', help="Only explain this endpoint (repeatable).")
+        parser.add_argument('--json', action='store_true', help="Print the report, including query plans, as JSON.")
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout.")
+
+    def handle(self, *args, **options):
+        explain = EXPLAINERS.get(connection.vendor)
+        if explain is None:
+            raise CommandError(f"EXPLAIN isn't supported for {connection.vendor}.")
+
+        user = seeded_user(options)
+        urls = endpoints(user)
+        if options['only']:
+            unknown = set(options['only']) - set(urls)
+            if unknown:
+                raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+            urls = {name: url for name, url in urls.items() if name in options['only']}
+
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with test_environment():
+            results = {name: self.explain(client, url, explain) for name, url in urls.items()}
+
+        if options['json'] or options['output']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'user': user.username,
+                'endpoints': results,
+            }
+            output = json.dumps(report, indent=2)
+            if options['output']:
+                with open(options['output'], 'w') as f:
+                    f.write(output + '\n')
+                self.stderr.write(f"Wrote {options['output']}")
+            else:
+                self.stdout.write(output)
+            return
+
+        for name, result in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name}  {result['url']}  ({result['queries']} queries)"))
+            self.stdout.write(f"  indexes:    {', '.join(result['indexes']) or '-'}")
+            if result['full_scans']:
+                self.stdout.write(self.style.WARNING(f"  full scans: {', '.join(result['full_scans'])}"))
+            for error in result['errors']:
+                self.stdout.write(self.style.ERROR(f"  could not explain: {error}"))
+
+    def explain(self, client, url, explain):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+
+        # Repeated statements (e.g. per-row lookups) are explained once
+        statements = {}
+        for query in captured.captured_queries:
+            sql = query['sql']
+            if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                statements[sql] = statements.get(sql, 0) + 1
+
+        plans, indexes, full_scans, errors = [], set(), set(), []
+        with connection.cursor() as cursor:
+            for sql, count in statements.items():
+                try:
+                    plan, used, scanned = explain(cursor, sql)
+                except DatabaseError as e:
+                    errors.append(str(e))
+                    continue
+                indexes |= used
+                full_scans |= scanned
+                plans.append({
+                    'sql': sql,
+                    'executions': count,
+                    'indexes': sorted(used),
+                    'full_scans': sorted(scanned),
+                    'plan': plan,
+                })
+
+        return {
+            'url': url,
+            'status': response.status_code,
+            'queries': len(captured),
+            'indexes': sorted(indexes),
+            'full_scans': sorted(full_scans),
+            'errors': errors,
+            'statements': plans,
+        }
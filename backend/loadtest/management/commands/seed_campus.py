@@ -0,0 +1,260 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from clubs.models import Club, ClubMembership
+from courses.models import ClassInfo
+from direct_messages.inbox import refresh_thread_summaries
+from direct_messages.models import Message, Thread, ThreadParticipant
+from events.models import Event
+from friends.models import FriendRequest, Friendship
+from posts.models import Like, Post, Repost
+
+User = get_user_model()
+
+PASSWORD = 'loadtest-password'
+
+INTERESTS = [
+    'chess', 'hiking', 'soccer', 'basketball', 'photography', 'music', 'guitar',
+    'painting', 'coding', 'robotics', 'gaming', 'cooking', 'film', 'theatre',
+    'running', 'climbing', 'poetry', 'debate', 'volunteering', 'dance', 'anime',
+    'startups', 'investing', 'astronomy', 'gardening', 'yoga', 'tennis', 'jazz',
+]
+MAJORS = [
+    'Computer Science', 'Mathematics', 'Biology', 'Chemistry', 'Physics',
+    'Economics', 'History', 'Psychology', 'English', 'Mechanical Engineering',
+    'Electrical Engineering', 'Political Science', 'Art', 'Music',
+]
+CLUB_KINDS = ['Club', 'Society', 'Association', 'Collective', 'Circle']
+WORDS = [
+    'anyone', 'going', 'tonight', 'study', 'library', 'exam', 'coffee', 'weekend',
+    'practice', 'meetup', 'project', 'lecture', 'notes', 'party', 'trip', 'game',
+    'free', 'pizza', 'quad', 'dorm', 'professor', 'homework', 'deadline', 'fun',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a reproducible synthetic campus (users, friendships, clubs, events, "
+        "posts, threads, messages) with bulk inserts, for benchmarking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--friends-per-user', type=int, default=20)
+        parser.add_argument('--clubs', type=int, default=50)
+        parser.add_argument('--clubs-per-user', type=int, default=3)
+        parser.add_argument('--events', type=int, default=200)
+        parser.add_argument('--rsvps-per-user', type=int, default=4)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--likes-per-post', type=int, default=3)
+        parser.add_argument('--threads', type=int, default=300, help="Private threads between friends.")
+        parser.add_argument('--messages-per-thread', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='lt_', help="Username / club name prefix for seeded rows.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--clear', action='store_true', help="Delete previously seeded rows with this prefix first.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+
+        if options['clear']:
+            self.clear(prefix)
+        elif User.objects.filter(username__startswith=prefix).exists():
+            self.stderr.write(f"Users prefixed '{prefix}' already exist; use --clear to reseed.")
+            return
+
+        self.ensure_class_info()
+        with transaction.atomic():
+            users = self.seed_users(prefix, options['users'])
+            self.seed_friendships(users, options['friends_per_user'])
+            clubs = self.seed_clubs(prefix, users, options['clubs'], options['clubs_per_user'])
+            self.seed_events(clubs, users, options['events'], options['rsvps_per_user'])
+            self.seed_posts(users, clubs, options['posts'], options['likes_per_post'])
+            self.seed_threads(users, options['threads'], options['messages_per_thread'])
+
+        # Derived tables the bulk inserts bypassed (signals don't fire)
+        call_command('reconcile_post_counters', stdout=self.stdout)
+        call_command('backfill_interests', stdout=self.stdout)
+        call_command('rebuild_timelines', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded campus '{prefix}' (seed {options['seed']})."))
+
+    def clear(self, prefix):
+        # Clubs cascade to memberships, events and club posts; users to most of the rest
+        club_threads = Club.objects.filter(name__startswith=prefix).values('thread_id')
+        Thread.objects.filter(id__in=club_threads).delete()
+        Club.objects.filter(name__startswith=prefix).delete()
+        user_ids = User.objects.filter(username__startswith=prefix).values('id')
+        Thread.objects.filter(participants__user_id__in=user_ids, is_group=False).delete()
+        Post.objects.filter(author_id__in=user_ids).delete()  # author is SET_NULL, not CASCADE
+        User.objects.filter(username__startswith=prefix).delete()
+        self.stdout.write(f"Cleared campus '{prefix}'.")
+
+    def ensure_class_info(self):
+        # class_info is unmanaged (loaded from the registrar's data), so a fresh
+        # database doesn't have it; threads reference it, so create it empty
+        if ClassInfo._meta.db_table not in connection.introspection.table_names():
+            with connection.schema_editor() as schema_editor:
+                schema_editor.create_model(ClassInfo)
+            self.stdout.write("Created an empty class_info table.")
+
+    def bulk(self, model, objs):
+        return model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+    def seed_users(self, prefix, count):
+        rng = self.rng
+        password = make_password(PASSWORD)  # Hashing once; it's deliberately slow
+        year = timezone.now().year
+        users = [
+            User(
+                username=f'{prefix}{i}',
+                email=f'{prefix}{i}@campus.test',
+                password=password,
+                full_name=f'Student {i}',
+                major=rng.choice(MAJORS),
+                graduation_year=year + rng.randint(0, 4),
+                interests=rng.sample(INTERESTS, rng.randint(1, 5)),
+                is_private=rng.random() < 0.1,
+            )
+            for i in range(count)
+        ]
+        users = self.bulk(User, users)
+        self.stdout.write(f"Users: {len(users)}")
+        return users
+
+    def seed_friendships(self, users, per_user):
+        rng = self.rng
+        pairs = set()
+        for user in users:
+            for _ in range(per_user // 2):
+                other = users[rng.randrange(len(users))]
+                if other.id != user.id:
+                    pairs.add((min(user.id, other.id), max(user.id, other.id)))
+
+        requests = [FriendRequest(from_user_id=a, to_user_id=b, status='accepted') for a, b in pairs]
+        edges = [Friendship(user_id=a, friend_id=b) for a, b in pairs]
+        edges += [Friendship(user_id=b, friend_id=a) for a, b in pairs]
+        self.bulk(FriendRequest, requests)
+        self.bulk(Friendship, edges)
+        self.friend_pairs = sorted(pairs)
+        self.stdout.write(f"Friendships: {len(pairs)}")
+
+    def seed_clubs(self, prefix, users, count, per_user):
+        rng = self.rng
+        threads = self.bulk(Thread, [Thread(is_group=True) for _ in range(count)])
+        clubs = []
+        for i in range(count):
+            topic = INTERESTS[i % len(INTERESTS)]
+            clubs.append(Club(
+                name=f'{prefix}{topic.title()} {rng.choice(CLUB_KINDS)} {i}',
+                description=f'A place for {topic} and {rng.choice(INTERESTS)} fans.',
+                owner=rng.choice(users),
+                is_private=rng.random() < 0.1,
+                thread=threads[i],
+            ))
+        clubs = self.bulk(Club, clubs)
+
+        memberships = {}
+        for club in clubs:
+            memberships[(club.owner_id, club.id)] = 'admin'
+        for user in users:
+            for club in rng.sample(clubs, min(per_user, len(clubs))):
+                memberships.setdefault((user.id, club.id), 'member')
+
+        self.bulk(ClubMembership, [
+            ClubMembership(user_id=user_id, club_id=club_id, role=role)
+            for (user_id, club_id), role in memberships.items()
+        ])
+        thread_ids = {club.id: club.thread_id for club in clubs}
+        self.bulk(ThreadParticipant, [
+            ThreadParticipant(thread_id=thread_ids[club_id], user_id=user_id)
+            for user_id, club_id in memberships
+        ])
+        self.stdout.write(f"Clubs: {len(clubs)}, memberships: {len(memberships)}")
+        return clubs
+
+    def seed_events(self, clubs, users, count, rsvps_per_user):
+        rng = self.rng
+        now = timezone.now()
+        events = self.bulk(Event, [
+            Event(
+                club=rng.choice(clubs) if clubs else None,
+                title=f'{rng.choice(INTERESTS).title()} {rng.choice(["meetup", "workshop", "social", "tournament"])}',
+                description=' '.join(rng.sample(WORDS, 6)),
+                location=f'Hall {rng.randint(1, 30)}',
+                date=now + timedelta(days=rng.randint(-30, 120), hours=rng.randint(8, 21)),
+            )
+            for _ in range(count)
+        ])
+
+        Attendance = Event.attendees.through
+        rsvps = {
+            (event.id, user.id)
+            for user in users
+            for event in rng.sample(events, min(rsvps_per_user, len(events)))
+        }
+        self.bulk(Attendance, [Attendance(event_id=e, user_id=u) for e, u in rsvps])
+        self.stdout.write(f"Events: {len(events)}, RSVPs: {len(rsvps)}")
+
+    def seed_posts(self, users, clubs, count, likes_per_post):
+        rng = self.rng
+        top_level = count * 3 // 4
+        posts = self.bulk(Post, [
+            Post(
+                author=rng.choice(users),
+                club=rng.choice(clubs) if clubs and rng.random() < 0.2 else None,
+                content=' '.join(rng.choices(WORDS, k=rng.randint(4, 20))),
+                is_anonymous=rng.random() < 0.05,
+            )
+            for _ in range(top_level)
+        ])
+        replies = self.bulk(Post, [
+            Post(
+                author=rng.choice(users),
+                parent=parent,
+                club_id=parent.club_id,
+                content=' '.join(rng.choices(WORDS, k=rng.randint(2, 10))),
+            )
+            for parent in rng.choices(posts, k=count - top_level)
+        ] if posts else [])
+
+        likes, reposts = set(), set()
+        for post in posts:
+            for user in rng.sample(users, min(rng.randint(0, likes_per_post * 2), len(users))):
+                likes.add((user.id, post.id))
+            if rng.random() < 0.1:
+                reposts.add((rng.choice(users).id, post.id))
+        self.bulk(Like, [Like(user_id=u, post_id=p) for u, p in likes])
+        self.bulk(Repost, [Repost(user_id=u, post_id=p) for u, p in reposts])
+        self.stdout.write(f"Posts: {len(posts)}, replies: {len(replies)}, likes: {len(likes)}, reposts: {len(reposts)}")
+
+    def seed_threads(self, users, count, messages_per_thread):
+        rng = self.rng
+        pairs = rng.sample(self.friend_pairs, min(count, len(self.friend_pairs)))
+        threads = self.bulk(Thread, [Thread(is_group=False) for _ in pairs])
+        self.bulk(ThreadParticipant, [
+            ThreadParticipant(thread=thread, user_id=user_id)
+            for thread, pair in zip(threads, pairs)
+            for user_id in pair
+        ])
+        messages = self.bulk(Message, [
+            Message(
+                thread=thread,
+                sender_id=rng.choice(pair),
+                message=' '.join(rng.choices(WORDS, k=rng.randint(2, 15))),
+                is_read=rng.random() < 0.8,
+            )
+            for thread, pair in zip(threads, pairs)
+            for _ in range(messages_per_thread)
+        ])
+        refresh_thread_summaries()
+        self.stdout.write(f"Threads: {len(threads)}, messages: {len(messages)}")
@@ -0,0 +1,44 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from friends.models import Friendship
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SeedCampusTests(TransactionTestCase):
+    def seed(self, **options):
+        options = {'users': 30, 'clubs': 3, 'events': 5, 'posts': 40, 'threads': 4, 'messages_per_thread': 3, **options}
+        call_command('seed_campus', stdout=StringIO(), **options)
+
+    def test_seeds_a_fresh_database(self):
+        # The test database has no class_info table, like a fresh local one
+        self.seed()
+        self.assertEqual(User.objects.filter(username__startswith='lt_').count(), 30)
+        self.assertTrue(Friendship.objects.exists())
+        self.assertEqual(Post.objects.filter(like_count__gt=0).count(), Post.objects.filter(likes__isnull=False).distinct().count())
+
+    def test_clear_reseeds(self):
+        self.seed()
+        self.seed(clear=True, users=10)
+        self.assertEqual(User.objects.filter(username__startswith='lt_').count(), 10)
+
+    def test_bench_endpoints_reports_every_endpoint(self):
+        self.seed()
+        out = StringIO()
+        call_command('bench_endpoints', iterations=1, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+        for name, result in report['endpoints'].items():
+            self.assertEqual(result['status'], [200], name)
+
+    def test_explain_endpoints_reports_indexes(self):
+        self.seed()
+        out = StringIO()
+        call_command('explain_endpoints', json=True, endpoint=['notification-list'], stdout=out)
+        result = json.loads(out.getvalue())['endpoints']['notification-list']
+        self.assertIn('notification_user_cursor_idx', result['indexes'])
+        self.assertEqual(result['errors'], [])
@@ -0,0 +1,40 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+UNAUTHORIZED = 4401
+
+
+def notification_group(user_id):
+    return f'notifications_{user_id}'
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Streams the connected user's new notifications.
+    Events sent: {"type": "notification", "notification": <NotificationSerializer data>}
+    and {"type": "notification_updated", ...} when new activity was coalesced
+    into an existing unread notification.
+    """
+
+    async def connect(self):
+        user = self.scope['user']
+        if not user.is_authenticated:
+            await self.close(code=UNAUTHORIZED)
+            return
+
+        self.group_name = notification_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def notification_created(self, event):
+        await self.send_json({'type': 'notification', 'notification': event['notification']})
+
+    async def notification_updated(self, event):
+        await self.send_json({'type': 'notification_updated', 'notification': event['notification']})
@@ -0,0 +1,42 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from notifications.pipeline import process_queued
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delivers notification events queued by the DatabaseQueue backend "
+        "(NOTIFICATION_QUEUE_BACKEND), in batches. Runs until interrupted unless --once is given; "
+        "several workers can run side by side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--sleep', type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        delivered = 0
+        while True:
+            try:
+                count = process_queued(options['batch_size'])
+            except Exception:
+                # Failing events stay queued (process_queued); this is e.g. a lost database connection
+                logger.exception("Failed to deliver queued notifications")
+                if options['once']:
+                    raise
+                count = 0
+            delivered += count
+            if count:
+                continue
+            if options['once']:
+                break
+            close_old_connections()
+            time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"Delivered {delivered} notification events."))
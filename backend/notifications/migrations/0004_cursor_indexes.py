@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 13:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY on PostgreSQL, which can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('notifications', '0003_alter_notification_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notification_user_cursor_idx'),
+        ),
+    ]
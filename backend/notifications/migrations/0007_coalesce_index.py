@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 14:18
+
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY on PostgreSQL, which can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('notifications', '0006_pipeline'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False), models.Q(('group_key', ''), _negated=True)), fields=['user', 'group_key'], name='notification_coalesce_idx'),
+        ),
+    ]
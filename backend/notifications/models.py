@@ -8,6 +8,9 @@ class Notification(models.Model):
         ('friend_request', 'Friend Request'),
         ('club_invite', 'Club Invite'),
         ('message', 'Message'),
+        ('like', 'Like'),
+        ('reply', 'Reply'),
+        ('event', 'Event'),
     ]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -16,6 +19,39 @@ class Notification(models.Model):
     related_id = models.PositiveIntegerField(null=True, blank=True)  # ID of related object (optional)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Coalescing (see notifications/pipeline.py): unread notifications with the same
+    # group_key are folded into one, e.g. "alex and 12 others liked your post"
+    group_key = models.CharField(max_length=64, blank=True, default='')
+    actor_count = models.PositiveIntegerField(default=1)
+    last_actor = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    actor_ids = models.JSONField(default=list, blank=True)  # Distinct actors folded in so far, oldest first
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_cursor_idx'),
+            models.Index(fields=['user'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+            models.Index(
+                fields=['user', 'group_key'],
+                condition=models.Q(is_read=False) & ~models.Q(group_key=''),
+                name='notification_coalesce_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.type}: {self.message}"
+
+
+class QueuedNotification(models.Model):
+    """
+    A notification event waiting for the worker (process_notifications), used
+    by the DatabaseQueue backend. Written in the transaction that caused it.
+    """
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Failed deliveries; after NOTIFICATION_MAX_ATTEMPTS the row is left in
+    # place for inspection and no longer picked up
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
 
     def __str__(self):
-        return f"{self.user.username} - {self.type}: {self.message}"
\ No newline at end of file
+        return f"{self.payload.get('kind')} #{self.id}"
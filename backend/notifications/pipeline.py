@@ -0,0 +1,344 @@
+"""
+Notification pipeline.
+
+Producers (notifications.signals) call notify(), which only records an event;
+recipients are resolved, texts rendered and rows written later, in batches, by
+deliver(). A club-wide event is one queued event no matter how many members
+the club has, so the request that caused it never waits for the fan-out.
+
+Within a batch and against the recipient's existing unread notifications,
+events with the same group key (e.g. likes on one post) are coalesced into a
+single notification: "alex and 12 others liked your post". The notification
+keeps the ids of the actors folded into it, so someone who likes, unlikes and
+likes again is only counted once. New notifications are written with
+bulk_create, coalesced ones with bulk_update, and both are pushed to the
+recipients' websockets.
+
+A batch that fails is retried one event at a time (deliver_each()), so a bad
+event only costs itself. DatabaseQueue rows that keep failing are kept, with
+their error, after NOTIFICATION_MAX_ATTEMPTS tries and no longer picked up.
+
+How events reach deliver() is pluggable through NOTIFICATION_QUEUE_BACKEND:
+
+- ThreadQueue: an in-process worker thread, fed after the transaction commits.
+  The default; fine for development and single-process deployments, but
+  events still queued when the process exits are lost.
+- DatabaseQueue: events are written to QueuedNotification in the producer's
+  transaction and delivered by the process_notifications command.
+- SynchronousQueue: delivers as soon as the transaction commits, in the
+  producer's thread. For tests.
+"""
+import logging
+import queue
+import threading
+import time
+import traceback
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from backend.realtime import push_to_group
+from clubs.models import ClubMembership
+from direct_messages.models import ThreadParticipant
+from .consumers import notification_group
+from .models import Notification, QueuedNotification
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# kind -> (Notification.type, text, coalesced text or None if never coalesced)
+KINDS = {
+    'friend_request': ('friend_request', "{actor} sent you a friend request!", None),
+    'friend_accepted': ('message', "{actor} accepted your friend request!", None),
+    'club_invite': ('club_invite', "You've been invited to join {club_name}!", None),
+    'like': ('like', "{actor} liked your post", "{actor} and {others} liked your post"),
+    'reply': ('reply', "{actor} replied to your post", "{actor} and {others} replied to your post"),
+    'message': ('message', "{actor} sent you a message", "{actor} and {others} sent you messages"),
+    'event': ('event', "{club_name} posted a new event: {title}", None),
+}
+
+ANONYMOUS = 'Someone'
+
+
+def notify(kind, users=(), club=None, thread=None, actor_id=None, related_id=None, **context):
+    """
+    Queues a `kind` notification for `users` (ids), the members of `club` or
+    the participants of `thread` (ids), leaving out the actor. `context` fills
+    the text's other placeholders.
+    """
+    audience = [['users', list(users)]]
+    if club is not None:
+        audience.append(['club', club])
+    if thread is not None:
+        audience.append(['thread', thread])
+    event = {
+        'kind': kind,
+        'audience': audience,
+        'actor_id': actor_id,
+        'related_id': related_id,
+        'group_key': f'{kind}:{related_id}' if KINDS[kind][2] else '',
+        'context': context,
+    }
+    get_queue().enqueue(event)
+
+
+def _others(count):
+    return f"{count} other" if count == 1 else f"{count} others"
+
+
+def render(event, actor_name, actor_count=1):
+    _, text, coalesced_text = KINDS[event['kind']]
+    if actor_count > 1 and coalesced_text:
+        text = coalesced_text
+    message = text.format(actor=actor_name, others=_others(actor_count - 1), **event['context'])
+    return message[:Notification._meta.get_field('message').max_length]
+
+
+def _recipients(events):
+    """
+    Returns {event index: [user ids]}, resolving club and thread audiences
+    with one query each for the whole batch.
+    """
+    club_ids = {target for event in events for scope, target in event['audience'] if scope == 'club'}
+    thread_ids = {target for event in events for scope, target in event['audience'] if scope == 'thread'}
+    members = {}
+    if club_ids:
+        for club_id, user_id in ClubMembership.objects.filter(club_id__in=club_ids).values_list('club_id', 'user_id'):
+            members.setdefault(('club', club_id), []).append(user_id)
+    if thread_ids:
+        # Club and class chats are only reflected in the inbox's unread counts
+        participants = ThreadParticipant.objects.filter(
+            thread_id__in=thread_ids, thread__class_info__isnull=True, thread__club__isnull=True,
+        ).values_list('thread_id', 'user_id')
+        for thread_id, user_id in participants:
+            members.setdefault(('thread', thread_id), []).append(user_id)
+
+    recipients = {}
+    for i, event in enumerate(events):
+        user_ids = []
+        for scope, target in event['audience']:
+            user_ids.extend(target if scope == 'users' else members.get((scope, target), ()))
+        recipients[i] = [user_id for user_id in dict.fromkeys(user_ids) if user_id != event['actor_id']]
+    return recipients
+
+
+def deliver(events):
+    """
+    Writes and pushes the notifications for a batch of queued events.
+    """
+    if not events:
+        return
+    recipients = _recipients(events)
+    actor_ids = {event['actor_id'] for event in events if event['actor_id'] is not None}
+    names = dict(User.objects.filter(id__in=actor_ids).values_list('id', 'username')) if actor_ids else {}
+
+    def name(actor_id):
+        return names.get(actor_id, ANONYMOUS) if actor_id is not None else ANONYMOUS
+
+    created = []
+    groups = {}  # (user id, group key) -> (latest event, distinct actor ids, oldest first)
+    for i, event in enumerate(events):
+        for user_id in recipients[i]:
+            if not event['group_key']:
+                created.append(Notification(
+                    user_id=user_id,
+                    type=KINDS[event['kind']][0],
+                    message=render(event, name(event['actor_id'])),
+                    related_id=event['related_id'],
+                    last_actor_id=event['actor_id'],
+                ))
+                continue
+            _, actors = groups.get((user_id, event['group_key']), (None, []))
+            actors = [actor for actor in actors if actor != event['actor_id']] + [event['actor_id']]
+            groups[(user_id, event['group_key'])] = (event, actors)
+
+    updated = []
+    if groups:
+        existing = {}
+        unread = Notification.objects.filter(
+            is_read=False,
+            user_id__in={user_id for user_id, _ in groups},
+            group_key__in={group_key for _, group_key in groups},
+        ).order_by('created_at', 'id')
+        for notification in unread:
+            # With duplicates (from racing workers), the newest one is extended
+            existing[(notification.user_id, notification.group_key)] = notification
+
+        now = timezone.now()
+        for (user_id, group_key), (event, actors) in groups.items():
+            notification = existing.get((user_id, group_key))
+            if notification is None:
+                created.append(Notification(
+                    user_id=user_id,
+                    type=KINDS[event['kind']][0],
+                    message=render(event, name(actors[-1]), len(actors)),
+                    related_id=event['related_id'],
+                    group_key=group_key,
+                    actor_count=len(actors),
+                    last_actor_id=actors[-1],
+                    actor_ids=actors,
+                ))
+                continue
+            # Rows coalesced before actor_ids existed keep their old count
+            untracked = max(notification.actor_count - len(notification.actor_ids), 0)
+            notification.actor_ids = [actor for actor in notification.actor_ids if actor not in actors] + actors
+            notification.actor_count = untracked + len(notification.actor_ids)
+            notification.last_actor_id = actors[-1]
+            notification.message = render(event, name(actors[-1]), notification.actor_count)
+            notification.created_at = now  # back to the top of the list
+            updated.append(notification)
+
+    with transaction.atomic():
+        Notification.objects.bulk_create(created, batch_size=settings.NOTIFICATION_BATCH_SIZE)
+        Notification.objects.bulk_update(
+            updated, ['actor_count', 'actor_ids', 'last_actor', 'message', 'created_at'],
+            batch_size=settings.NOTIFICATION_BATCH_SIZE,
+        )
+
+    for event_type, notifications in (('notification.created', created), ('notification.updated', updated)):
+        for notification in notifications:
+            push_to_group(notification_group(notification.user_id), {
+                'type': event_type,
+                'notification': NotificationSerializer(notification).data,
+            })
+
+
+def deliver_each(events):
+    """
+    Delivers a batch like deliver(), but if it fails, delivers the events one
+    at a time so the others still go through. Returns {event index: error}
+    for the events that failed.
+    """
+    try:
+        with transaction.atomic():
+            deliver(events)
+        return {}
+    except Exception:
+        if len(events) == 1:
+            logger.exception("Failed to deliver notification event %r", events[0])
+            return {0: traceback.format_exc()}
+        logger.warning("Failed to deliver %d notification events; retrying one at a time", len(events), exc_info=True)
+
+    failures = {}
+    for i, event in enumerate(events):
+        try:
+            with transaction.atomic():
+                deliver([event])
+        except Exception:
+            logger.exception("Failed to deliver notification event %r", event)
+            failures[i] = traceback.format_exc()
+    return failures
+
+
+class BaseNotificationQueue:
+    def enqueue(self, event):
+        """Queues one event for deliver(); called inside the producer's transaction."""
+        raise NotImplementedError
+
+
+class SynchronousQueue(BaseNotificationQueue):
+    def enqueue(self, event):
+        transaction.on_commit(lambda: deliver([event]))
+
+
+class ThreadQueue(BaseNotificationQueue):
+    """
+    Delivers on a daemon thread in this process. The worker takes whatever
+    arrives within NOTIFICATION_BATCH_WAIT_MS of the first event (up to
+    NOTIFICATION_BATCH_SIZE events) as one batch, so bursts are coalesced
+    and written together.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enqueue(self, event):
+        transaction.on_commit(lambda: self._put(event))
+
+    def _put(self, event):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='notification-worker', daemon=True)
+                self._thread.start()
+        self._queue.put(event)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + settings.NOTIFICATION_BATCH_WAIT_MS / 1000
+            while len(batch) < settings.NOTIFICATION_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                # Failed events are logged and dropped; there is nowhere to keep them
+                deliver_each(batch)
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def join(self):
+        """Blocks until every queued event has been delivered."""
+        self._queue.join()
+
+
+class DatabaseQueue(BaseNotificationQueue):
+    """
+    Durable queue: events are rows in QueuedNotification, committed or rolled
+    back with the change that caused them, and delivered by
+    `manage.py process_notifications`.
+    """
+
+    def enqueue(self, event):
+        QueuedNotification.objects.create(payload=event)
+
+
+def process_queued(batch_size):
+    """
+    Delivers up to `batch_size` of the oldest QueuedNotification events and
+    returns how many there were. Workers running side by side skip each
+    other's locked rows. Events that fail stay queued with their attempt
+    count raised; dead-lettered ones are skipped.
+    """
+    with transaction.atomic():
+        rows = list(
+            QueuedNotification.objects.select_for_update(skip_locked=True)
+            .filter(attempts__lt=settings.NOTIFICATION_MAX_ATTEMPTS)
+            .order_by('id').values_list('id', 'payload', 'attempts')[:batch_size]
+        )
+        if not rows:
+            return 0
+        failures = deliver_each([payload for _, payload, _ in rows])
+        QueuedNotification.objects.filter(
+            id__in=[row_id for i, (row_id, _, _) in enumerate(rows) if i not in failures]
+        ).delete()
+        for i, error in failures.items():
+            row_id, _, attempts = rows[i]
+            QueuedNotification.objects.filter(id=row_id).update(attempts=F('attempts') + 1, last_error=error)
+            if attempts + 1 >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                logger.error("Giving up on queued notification #%d after %d attempts", row_id, attempts + 1)
+    return len(rows)
+
+
+@lru_cache(maxsize=None)
+def get_queue():
+    return import_string(settings.NOTIFICATION_QUEUE_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_queue(setting, **kwargs):
+    if setting == 'NOTIFICATION_QUEUE_BACKEND':
+        get_queue.cache_clear()
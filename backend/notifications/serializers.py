@@ -4,4 +4,4 @@ from .models import Notification
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = ['id', 'type', 'message', 'related_id', 'is_read', 'created_at']
\ No newline at end of file
+        fields = ['id', 'type', 'message', 'related_id', 'actor_count', 'is_read', 'created_at']
\ No newline at end of file
@@ -1,34 +1,55 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from friends.models import FriendRequest
-from .models import Notification
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 from clubs.models import ClubInvite
+from direct_messages.models import Message
+from events.models import Event
+from posts.models import Like, Post
+from .pipeline import notify
+
+# Notifications are written, and pushed to websockets, by the pipeline (see
+# notifications/pipeline.py); these receivers only queue events.
+
 
 @receiver(post_save, sender=FriendRequest)
 def friend_request_created(sender, instance, created, **kwargs):
     if created and instance.status == 'pending':
-        # Create a notification for the recipient
-        Notification.objects.create(
-            user=instance.to_user,
-            type='friend_request',
-            message=f"{instance.from_user.username} sent you a friend request!"
-        )
+        # Notify the recipient
+        notify('friend_request', users=[instance.to_user_id], actor_id=instance.from_user_id)
 
     elif not created and instance.status == 'accepted':
         # If a friend request was accepted later
-        Notification.objects.create(
-            user=instance.from_user,
-            type='message',
-            message=f"{instance.to_user.username} accepted your friend request!"
-        )
+        notify('friend_accepted', users=[instance.from_user_id], actor_id=instance.to_user_id)
 
 @receiver(post_save, sender=ClubInvite)
 def create_club_invite_notification(sender, instance, created, **kwargs):
     if created:
-        Notification.objects.create(
-            user=instance.invitee,
-            type='club_invite',
-            message=f"You've been invited to join {instance.club.name}!"
-        )
\ No newline at end of file
+        notify('club_invite', users=[instance.invitee_id], related_id=instance.club_id, club_name=instance.club.name)
+
+@receiver(post_save, sender=Like)
+def like_created(sender, instance, created, **kwargs):
+    if created and instance.post.author_id:
+        notify('like', users=[instance.post.author_id], actor_id=instance.user_id, related_id=instance.post_id)
+
+@receiver(post_save, sender=Post)
+def reply_created(sender, instance, created, **kwargs):
+    if not created or not instance.parent_id:
+        return
+    author_id = instance.parent.author_id
+    if author_id and author_id != instance.author_id:
+        notify(
+            'reply', users=[author_id], related_id=instance.parent_id,
+            actor_id=None if instance.is_anonymous else instance.author_id,
+        )
+
+@receiver(post_save, sender=Message)
+def message_created(sender, instance, created, **kwargs):
+    if created:
+        notify('message', thread=instance.thread_id, actor_id=instance.sender_id, related_id=instance.thread_id)
+
+@receiver(post_save, sender=Event)
+def event_created(sender, instance, created, **kwargs):
+    # One queued event however large the club; members are resolved by the worker
+    if created and instance.club_id:
+        notify('event', club=instance.club_id, related_id=instance.id,
+               club_name=instance.club.name, title=instance.title)
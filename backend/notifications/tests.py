@@ -1,3 +1,114 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.test import TestCase, TransactionTestCase, override_settings
+from posts.models import Post
+from backend.realtime import push_to_group
+from backend.testing import client_for, make_user, websocket_communicator
+from .consumers import notification_group
+from .models import Notification, QueuedNotification
+from .pipeline import DatabaseQueue, notify, process_queued
 
-# Create your tests here.
+
+class CoalescingTests(TestCase):
+    def setUp(self):
+        self.author = make_user('alice')
+        self.post = Post.objects.create(author=self.author, content='hello')
+
+    def like(self, user, action='like'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(user).post(f'/api/posts/{self.post.id}/{action}/')
+        self.assertIn(response.status_code, (200, 201))
+
+    def test_likes_coalesce_into_one_notification(self):
+        for username in ('bob', 'carol', 'dave'):
+            self.like(make_user(username))
+        notification = Notification.objects.get(user=self.author)
+        self.assertEqual(notification.actor_count, 3)
+        self.assertEqual(notification.message, 'dave and 2 others liked your post')
+
+    def test_repeated_likes_by_one_actor_count_once(self):
+        bob, carol = make_user('bob'), make_user('carol')
+        self.like(bob)
+        self.like(carol)
+        self.like(bob, 'unlike')
+        self.like(bob)
+        notification = Notification.objects.get(user=self.author)
+        self.assertEqual(notification.actor_count, 2)
+        self.assertEqual(notification.message, 'bob and 1 other liked your post')
+
+    def test_read_notifications_are_not_extended(self):
+        self.like(make_user('bob'))
+        Notification.objects.update(is_read=True)
+        self.like(make_user('carol'))
+        self.assertEqual(
+            list(Notification.objects.order_by('id').values_list('is_read', 'message')),
+            [(True, 'bob liked your post'), (False, 'carol liked your post')],
+        )
+
+
+@override_settings(NOTIFICATION_MAX_ATTEMPTS=2)
+class DatabaseQueueTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+
+    def queue(self, kind='friend_request', **kwargs):
+        with override_settings(NOTIFICATION_QUEUE_BACKEND='notifications.pipeline.DatabaseQueue'):
+            notify(kind, users=[self.alice.id], actor_id=self.bob.id, **kwargs)
+
+    def test_queued_events_are_delivered_and_removed(self):
+        self.queue()
+        self.assertEqual(process_queued(10), 1)
+        self.assertFalse(QueuedNotification.objects.exists())
+        self.assertEqual(Notification.objects.get(user=self.alice).message, 'bob sent you a friend request!')
+
+    def test_bad_event_does_not_hold_up_the_batch(self):
+        self.queue()
+        # Missing the {club_name} its text needs
+        DatabaseQueue().enqueue({
+            'kind': 'club_invite', 'audience': [['users', [self.alice.id]]],
+            'actor_id': None, 'related_id': None, 'group_key': '', 'context': {},
+        })
+        self.queue('event', club_name='Chess', title='Finals')
+
+        with self.assertLogs('notifications.pipeline', 'ERROR'):
+            self.assertEqual(process_queued(10), 3)
+        self.assertEqual(Notification.objects.filter(user=self.alice).count(), 2)
+        failed = QueuedNotification.objects.get()
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn('KeyError', failed.last_error)
+
+        # Dead-lettered after NOTIFICATION_MAX_ATTEMPTS, then left alone
+        with self.assertLogs('notifications.pipeline', 'ERROR'):
+            self.assertEqual(process_queued(10), 1)
+        self.assertEqual(process_queued(10), 0)
+        self.assertEqual(QueuedNotification.objects.get().attempts, 2)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class NotificationConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.post = Post.objects.create(author=self.alice, content='hello')
+
+    async def test_streams_own_notifications_only(self):
+        communicator = websocket_communicator('/ws/notifications/', user=self.alice)
+        self.assertTrue((await communicator.connect())[0])
+
+        await sync_to_async(push_to_group)(notification_group(self.bob.id), {
+            'type': 'notification.created', 'notification': {'message': 'for bob'},
+        })
+        self.assertTrue(await communicator.receive_nothing())
+
+        response = await sync_to_async(client_for(self.bob).post)(f'/api/posts/{self.post.id}/like/')
+        self.assertEqual(response.status_code, 201)
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['type'], 'notification')
+        self.assertEqual(event['notification']['message'], 'bob liked your post')
+
+        carol = await sync_to_async(make_user)('carol')
+        await sync_to_async(client_for(carol).post)(f'/api/posts/{self.post.id}/like/')
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['type'], 'notification_updated')
+        self.assertEqual(event['notification']['message'], 'carol and 1 other liked your post')
+        await communicator.disconnect()
@@ -4,13 +4,16 @@ from .models import Notification
 from .serializers import NotificationSerializer
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from backend.pagination import KeysetPagination
 
 class NotificationListAPIView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        return Notification.objects.filter(user=self.request.user)
 
 class MarkNotificationsReadAPIView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -0,0 +1,61 @@
+"""
+Read-through cache for the viewer-independent part of serialized posts
+(author summary, display name, initials, content). Entries are keyed by post
+id and tagged with a version made of the post's updated_at and the author
+fields the fragment shows, both read from the row being serialized, so a stale
+entry is never served even when the cache is per process and an edit or a
+profile change was invalidated in another worker only. Entries are also
+dropped when the post is saved or deleted (posts.signals).
+
+Configured with the POST_FRAGMENT_CACHE setting; see backend.caching.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from backend.caching import build_cache
+
+
+@lru_cache(maxsize=None)
+def get_post_cache():
+    return build_cache(settings.POST_FRAGMENT_CACHE)
+
+
+@receiver(setting_changed)
+def reset_post_cache(setting, **kwargs):
+    if setting == 'POST_FRAGMENT_CACHE':
+        get_post_cache.cache_clear()
+
+
+# User fields that appear in cached post fragments
+AUTHOR_FIELDS = ('username', 'full_name', 'profile_picture_url')
+
+
+def _version(post):
+    author = post.author
+    return (
+        post.updated_at.isoformat() if post.updated_at else None,
+        tuple(getattr(author, field) for field in AUTHOR_FIELDS) if author else None,
+    )
+
+
+def get_post_fragment(post, render):
+    """
+    Returns the cached fragment for `post`, calling `render()` and storing the
+    result on a miss or when the cached copy is for an older version.
+    """
+    cache = get_post_cache()
+    version = _version(post)
+    cached = cache.get(post.id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    fragment = render()
+    cache.set(post.id, (version, fragment))
+    return fragment
+
+
+def invalidate_posts(post_ids):
+    get_post_cache().delete_many(post_ids)
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from posts.models import Post
+from posts.timeline import publish_post
+
+
+class Command(BaseCommand):
+    help = "Fans recent top-level posts out into their readers' home feed timelines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=14, help="Only rebuild posts from the last N days.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        posts = (
+            Post.objects.filter(parent__isnull=True, created_at__gte=since)
+            .order_by('created_at')
+        )
+
+        pushed = pulled = 0
+        for post in posts.iterator(chunk_size=options['batch_size']):
+            if publish_post(post):
+                pushed += 1
+            else:
+                pulled += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Fanned out {pushed} posts; {pulled} left to fan-out-on-read."
+        ))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from posts.models import Post, Like, Repost
+
+
+def actual_count(queryset, key):
+    """
+    Correlated COUNT(*) of `queryset` rows whose `key` is the outer post.
+    """
+    counts = queryset.filter(**{key: OuterRef('pk')}).order_by().values(key).annotate(n=Count('id')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = "Recomputes Post.comment_count, like_count and repost_count from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        checked = fixed = 0
+
+        actual = {
+            'comment_count': actual_count(Post.objects.all(), 'parent_id'),
+            'like_count': actual_count(Like.objects.all(), 'post_id'),
+            'repost_count': actual_count(Repost.objects.all(), 'post_id'),
+        }
+        drifted = Q()
+        for field, count in actual.items():
+            drifted |= ~Q(**{field: count})
+
+        while True:
+            ids = list(Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            with transaction.atomic():
+                batch = Post.objects.filter(id__in=ids)
+                if options['dry_run']:
+                    fixed += batch.filter(drifted).count()
+                else:
+                    # Locking the rows first makes concurrent adjust_counter() calls wait;
+                    # the counts are then computed and written in a single UPDATE, so
+                    # no increment can land between the read and the write.
+                    list(batch.select_for_update().values_list('id', flat=True))
+                    fixed += batch.filter(drifted).update(**actual)
+            checked += len(ids)
+
+        verb = "would fix" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} posts, {verb} {fixed}."))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 13:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+from backend.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # Indexes are built CONCURRENTLY on PostgreSQL, which can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('clubs', '0009_club_thread'),
+        ('posts', '0004_post_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['parent', 'created_at', 'id'], name='post_parent_cursor_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='post_author_cursor_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
@@ -13,6 +15,15 @@ class Post(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # True once the post has been written into its readers' timelines (see posts.timeline).
+    # Posts left False are merged into feeds at read time instead.
+    fanned_out = models.BooleanField(default=False)
+
+    # Denormalized engagement counters, updated atomically via Post.adjust_counter()
+    # and repaired by `manage.py reconcile_post_counters`
+    comment_count = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    repost_count = models.PositiveIntegerField(default=0)
 
     # For replies (optional, recursive relation)
     parent = models.ForeignKey(
@@ -25,6 +36,29 @@ class Post(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(fanned_out=False, parent__isnull=True),
+                name='post_fanout_on_read_idx',
+            ),
+            # Keyset pagination: replies by (parent, created_at, id), profiles by (author, created_at, id)
+            models.Index(fields=['parent', 'created_at', 'id'], name='post_parent_cursor_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_cursor_idx'),
+            # Top-level posts only (global feed, profiles); replies are read through post_parent_cursor_idx
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(parent__isnull=True),
+                name='post_top_level_idx',
+            ),
+        ]
+
+    @classmethod
+    def adjust_counter(cls, post_id, field, delta):
+        """
+        Atomically adds `delta` to one of the counter columns without loading the row.
+        """
+        cls.objects.filter(pk=post_id).update(**{field: Greatest(F(field) + delta, 0)})
 
     def can_post_in_club(self, user):
         if not self.club:
@@ -76,4 +110,23 @@ class Repost(models.Model):
         unique_together = ('user', 'post')  # one repost per user per post
 
     def __str__(self):
-        return f"{self.user.username} reposted Post {self.post.id}"
\ No newline at end of file
+        return f"{self.user.username} reposted Post {self.post.id}"
+
+class TimelineEntry(models.Model):
+    """
+    A post in a user's precomputed home feed. Rows are written when the post is
+    created (fan-out-on-write), so reading a feed page is one range scan on
+    (user, created_at) regardless of how many posts exist overall.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField()  # Copied from the post so reads never join Post
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='timeline_user_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} in {self.user_id}'s timeline"
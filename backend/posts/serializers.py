@@ -1,7 +1,8 @@
 from rest_framework import serializers, viewsets
 from django.utils.timesince import timesince
-from django.db.models import Count, Exists, OuterRef, Subquery
-from .models import Post, Like, Repost
+from .models import Post
+from .hydration import get_viewer_state
+from .cache import get_post_fragment
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -11,27 +12,33 @@ class UserSummarySerializer(serializers.ModelSerializer):
         model = User
         fields = ['username', 'full_name', 'profile_picture_url']
 
-class PostSerializer(serializers.ModelSerializer):
+class PostListSerializer(serializers.ListSerializer):
+    """
+    Resolves the viewer overlay for the whole page up front (see posts.hydration).
+    """
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        self.context['viewer_state'] = get_viewer_state(posts, request.user if request else None)
+        return super().to_representation(posts)
+
+
+class PostBodySerializer(serializers.ModelSerializer):
+    """
+    The viewer-independent part of a post. Its output is shared across all
+    viewers through posts.cache.
+    """
     authorName = serializers.SerializerMethodField()
     username = serializers.SerializerMethodField()
     authorInitials = serializers.SerializerMethodField()
-    timeAgo = serializers.SerializerMethodField()
-    commentCount = serializers.IntegerField(source='comment_count', read_only=True)
-    likeCount = serializers.IntegerField(source='like_count', read_only=True)
-    repostCount = serializers.IntegerField(source='repost_count', read_only=True)
-    hasLiked = serializers.BooleanField(source='has_liked', read_only=True)
-    hasReposted = serializers.BooleanField(source='has_reposted', read_only=True)
-    reposted_by = serializers.CharField(source='reposted_by_username', read_only=True)
     parent = serializers.PrimaryKeyRelatedField(read_only=True)
     user = UserSummarySerializer(source='author', read_only=True)
-    author_username = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
         fields = [
-            'id', 'authorName', 'username', 'authorInitials', 'content', 'timeAgo',
-            'commentCount', 'likeCount', 'repostCount', 'hasLiked', 'hasReposted',
-            'is_anonymous', 'reposted_by', 'parent', 'user', 'author_username',
+            'id', 'authorName', 'username', 'authorInitials', 'content',
+            'is_anonymous', 'parent', 'user',
         ]
 
     def get_authorName(self, obj):
@@ -53,31 +60,50 @@ class PostSerializer(serializers.ModelSerializer):
         initials = "".join([p[0].upper() for p in parts[:2]])
         return initials or "U"
 
+
+class PostSerializer(PostBodySerializer):
+    """
+    Full post representation: the cached body (PostBodySerializer), fields that
+    change between requests (timeAgo and the counters, read from the row), and
+    the viewer-specific overlay (hasLiked, hasReposted, reposted_by, author_username).
+    """
+    timeAgo = serializers.SerializerMethodField()
+    commentCount = serializers.IntegerField(source='comment_count', read_only=True)
+    likeCount = serializers.IntegerField(source='like_count', read_only=True)
+    repostCount = serializers.IntegerField(source='repost_count', read_only=True)
+
+    class Meta(PostBodySerializer.Meta):
+        fields = PostBodySerializer.Meta.fields + [
+            'timeAgo', 'commentCount', 'likeCount', 'repostCount',
+        ]
+        list_serializer_class = PostListSerializer
+
+    def to_representation(self, instance):
+        rep = dict(get_post_fragment(
+            instance,
+            lambda: PostBodySerializer(context=self.context).to_representation(instance),
+        ))
+        rep.update({
+            'timeAgo': self.get_timeAgo(instance),
+            'commentCount': instance.comment_count,
+            'likeCount': instance.like_count,
+            'repostCount': instance.repost_count,
+        })
+        rep.update(self.get_viewer_overlay(instance))
+        return rep
+
+    def get_viewer_overlay(self, obj):
+        state = self.context.get('viewer_state') or {}
+        if obj.id not in state:
+            request = self.context.get('request')
+            state = get_viewer_state([obj], request.user if request else None)
+        return state[obj.id]
+
     def get_timeAgo(self, obj):
         return timesince(obj.created_at).split(',')[0] + " ago"
 
-    def get_author_username(self, obj):
-        request = self.context.get('request')
-        if obj.author and request and request.user == obj.author:
-            return obj.author.username
-        return None
-
 class PostViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = PostSerializer
 
     def get_queryset(self):
-        user = self.request.user
-
-        likes_subquery = Like.objects.filter(post=OuterRef('pk'), user=user)
-        reposts_subquery = Repost.objects.filter(post=OuterRef('pk'), user=user)
-
-        return Post.objects.filter(parent__isnull=True, club__isnull=True).annotate(
-            comment_count=Count('replies', distinct=True),
-            like_count=Count('likes', distinct=True),
-            repost_count=Count('reposts', distinct=True),
-            has_liked=Exists(likes_subquery),
-            has_reposted=Exists(reposts_subquery),
-            reposted_by_username=Subquery(
-                Repost.objects.filter(post=OuterRef('pk'), user=user).values('user__username')[:1]
-            ),
-        ).select_related('author').order_by('-created_at')
+        return Post.objects.filter(parent__isnull=True, club__isnull=True).select_related('author').order_by('-created_at')
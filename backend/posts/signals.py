@@ -0,0 +1,47 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from clubs.models import ClubMembership
+from friends.models import FriendRequest
+from .cache import invalidate_posts
+from .models import Post
+from .timeline import run_after_commit, sync_membership, sync_pair
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_posts([instance.id])
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    invalidate_posts([instance.id])
+
+
+# Profile changes need no invalidation: the author's fields are part of each
+# fragment's version (see posts/cache.py).
+
+
+# Timelines follow friendship and membership changes (see posts/timeline.py)
+
+@receiver(post_save, sender=FriendRequest)
+def sync_friend_timelines(sender, instance, created, **kwargs):
+    if instance.status == 'accepted' or not created:
+        run_after_commit(sync_pair, instance.from_user_id, instance.to_user_id)
+
+
+@receiver(post_delete, sender=FriendRequest)
+def clear_friend_timelines(sender, instance, **kwargs):
+    if instance.status == 'accepted':
+        run_after_commit(sync_pair, instance.from_user_id, instance.to_user_id)
+
+
+@receiver(post_save, sender=ClubMembership)
+def backfill_member_timeline(sender, instance, created, **kwargs):
+    if created:
+        run_after_commit(sync_membership, instance.user_id, instance.club_id)
+
+
+@receiver(post_delete, sender=ClubMembership)
+def clear_member_timeline(sender, instance, **kwargs):
+    run_after_commit(sync_membership, instance.user_id, instance.club_id)
@@ -1,3 +1,230 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from clubs.models import Club, ClubMembership
+from friends.models import FriendRequest
+from backend.testing import client_for, make_user
+from .cache import get_post_cache
+from .models import Like, Post, Repost, TimelineEntry
+from .timeline import publish_post
+
+User = get_user_model()
+
+
+@override_settings(
+    POST_TIMELINE_BACKEND='posts.timeline.DatabaseTimelineBackend',
+)
+class TimelineTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.carol = make_user('carol')
+
+    def befriend(self, user, other):
+        with self.captureOnCommitCallbacks(execute=True):
+            FriendRequest.objects.create(from_user=user, to_user=other, status='accepted')
+
+    def post_as(self, user, content='hello', **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(user).post('/api/posts/create/', {'content': content, **data}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return Post.objects.get(id=response.data['id'])
+
+    def feed_ids(self, user):
+        return [post['id'] for post in client_for(user).get('/api/posts/').data]
+
+    def test_post_is_fanned_out_after_commit(self):
+        self.befriend(self.alice, self.bob)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = client_for(self.alice).post('/api/posts/create/', {'content': 'hi'}, format='json')
+        post = Post.objects.get(id=response.data['id'])
+        self.assertFalse(post.fanned_out)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        # Still visible through fan-out-on-read until the job runs
+        self.assertIn(post.id, self.feed_ids(self.bob))
+
+        for callback in callbacks:
+            callback()
+        post.refresh_from_db()
+        self.assertTrue(post.fanned_out)
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(post=post).values_list('user_id', flat=True)),
+            {self.alice.id, self.bob.id},
+        )
+        self.assertIn(post.id, self.feed_ids(self.bob))
+        self.assertNotIn(post.id, self.feed_ids(self.carol))
+
+    @override_settings(POST_FANOUT_LIMIT=1)
+    def test_large_audience_is_merged_on_read(self):
+        self.befriend(self.alice, self.bob)
+        post = self.post_as(self.alice)
+        self.assertFalse(post.fanned_out)
+        self.assertIn(post.id, self.feed_ids(self.bob))
+
+    @override_settings(POST_TIMELINE_BACKEND='posts.timeline.InMemoryTimelineBackend')
+    def test_in_memory_backend_never_marks_posts_fanned_out(self):
+        self.befriend(self.alice, self.bob)
+        post = Post.objects.create(author=self.alice, content='hi')
+        self.assertTrue(publish_post(post))
+        post.refresh_from_db()
+        self.assertFalse(post.fanned_out)
+        self.assertIn(post.id, self.feed_ids(self.bob))
+
+    def test_new_friend_is_backfilled_and_unfriend_clears(self):
+        post = self.post_as(self.alice)
+        self.assertNotIn(post.id, self.feed_ids(self.bob))
+
+        self.befriend(self.alice, self.bob)
+        self.assertTrue(TimelineEntry.objects.filter(user=self.bob, post=post).exists())
+        self.assertIn(post.id, self.feed_ids(self.bob))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(self.bob).post('/api/friends/remove/', {'username': 'alice'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TimelineEntry.objects.filter(user=self.bob, post=post).exists())
+        self.assertNotIn(post.id, self.feed_ids(self.bob))
+
+    def test_unfriending_keeps_posts_of_club_mates(self):
+        club = Club.objects.create(name='Chess', owner=self.alice)
+        ClubMembership.objects.create(user=self.alice, club=club, role='admin')
+        ClubMembership.objects.create(user=self.bob, club=club, role='member')
+        self.befriend(self.alice, self.bob)
+        post = self.post_as(self.alice)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FriendRequest.objects.filter(from_user=self.alice, to_user=self.bob).delete()
+        self.assertIn(post.id, self.feed_ids(self.bob))
+
+    def test_joining_and_leaving_a_club_updates_timelines(self):
+        club = Club.objects.create(name='Chess', owner=self.alice)
+        ClubMembership.objects.create(user=self.alice, club=club, role='admin')
+        club_post = self.post_as(self.alice, 'club news', club=club.id)
+        own_post = self.post_as(self.alice, 'my day')
+        carol_post = self.post_as(self.carol, 'carol here')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(self.carol).post('/api/clubs/Chess/join/')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue({club_post.id, own_post.id} <= set(self.feed_ids(self.carol)))
+        self.assertIn(carol_post.id, self.feed_ids(self.alice))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(self.carol).post('/api/clubs/Chess/leave/')
+        self.assertEqual(response.status_code, 200)
+        feed = self.feed_ids(self.carol)
+        self.assertNotIn(club_post.id, feed)
+        self.assertNotIn(own_post.id, feed)
+        self.assertNotIn(carol_post.id, self.feed_ids(self.alice))
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.post = Post.objects.create(author=self.alice, content='hi')
+
+    def test_like_and_unlike_adjust_counter(self):
+        client = client_for(self.bob)
+        self.assertEqual(client.post(f'/api/posts/{self.post.id}/like/').status_code, 201)
+        self.assertEqual(client.post(f'/api/posts/{self.post.id}/like/').status_code, 400)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        self.assertEqual(client.post(f'/api/posts/{self.post.id}/unlike/').status_code, 200)
+        self.assertEqual(client.post(f'/api/posts/{self.post.id}/unlike/').status_code, 400)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_counter_never_goes_negative(self):
+        Post.adjust_counter(self.post.id, 'like_count', -1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+
+    def test_reconcile_repairs_drift(self):
+        Like.objects.create(user=self.bob, post=self.post)
+        Post.objects.create(author=self.bob, content='reply', parent=self.post)
+        Post.objects.filter(pk=self.post.pk).update(like_count=7, comment_count=0, repost_count=3)
+
+        out = StringIO()
+        call_command('reconcile_post_counters', dry_run=True, stdout=out)
+        self.assertIn('would fix 1', out.getvalue())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 7)
+
+        out = StringIO()
+        call_command('reconcile_post_counters', batch_size=1, stdout=out)
+        self.assertIn('fixed 1', out.getvalue())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count, self.post.repost_count), (1, 1, 0))
+
+        out = StringIO()
+        call_command('reconcile_post_counters', stdout=out)
+        self.assertIn('fixed 0', out.getvalue())
+
+
+class ViewerStateTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.posts = [Post.objects.create(author=self.alice, content=f'post {i}') for i in range(2)]
+        Like.objects.create(user=self.bob, post=self.posts[0])
+        Repost.objects.create(user=self.bob, post=self.posts[1])
+
+    def page(self, user):
+        response = client_for(user).get('/api/posts/user/alice/')
+        self.assertEqual(response.status_code, 200)
+        return {post['id']: post for post in response.data}
+
+    def test_overlay_reflects_the_viewer(self):
+        liked, reposted = (self.page(self.bob)[post.id] for post in self.posts)
+        self.assertEqual((liked['hasLiked'], liked['hasReposted']), (True, False))
+        self.assertEqual((reposted['hasLiked'], reposted['hasReposted']), (False, True))
+        self.assertEqual(reposted['reposted_by'], 'bob')
+        self.assertIsNone(liked['author_username'])
+
+        own = self.page(self.alice)[self.posts[0].id]
+        self.assertEqual((own['hasLiked'], own['hasReposted'], own['author_username']), (False, False, 'alice'))
+
+    def test_overlay_costs_the_same_for_any_page_size(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as captured:
+                self.page(self.bob)
+            return len(captured)
+
+        small = count_queries()
+        for i in range(5):
+            post = Post.objects.create(author=self.alice, content=f'more {i}')
+            Like.objects.create(user=self.bob, post=post)
+        self.assertEqual(count_queries(), small)
+
+
+@override_settings(POST_FRAGMENT_CACHE={'BACKEND': 'backend.caching.LocalMemoryCache'})
+class PostFragmentCacheTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice', full_name='Alice Smith')
+        self.post = Post.objects.create(author=self.alice, content='hi')
+        self.url = '/api/posts/user/alice/'
+
+    def first(self):
+        return client_for(self.alice).get(self.url).data[0]
+
+    def test_fragment_is_reused(self):
+        self.first()
+        self.first()
+        self.assertEqual(get_post_cache().get_stats()['hits'], 1)
+
+    def test_profile_change_is_seen_without_invalidation(self):
+        self.assertEqual(self.first()['authorName'], 'Alice Smith')
+        # A queryset update sends no signals, like a change made in another worker
+        User.objects.filter(pk=self.alice.pk).update(full_name='Alice Jones')
+        self.assertEqual(self.first()['authorName'], 'Alice Jones')
+        self.assertEqual(self.first()['authorInitials'], 'AJ')
+
+    def test_profile_save_does_not_load_posts(self):
+        with CaptureQueriesContext(connection) as captured:
+            self.alice.save()
+        self.assertFalse([query for query in captured if 'posts_post' in query['sql']])
@@ -0,0 +1,358 @@
+"""
+Precomputed home feed timelines.
+
+When a top-level post is created it is pushed into the timeline of everyone who
+should see it (the author, the author's friends and the members of the author's
+clubs, or the members of the club it was posted in). Reading a feed is then a
+range read on the reader's timeline instead of an aggregate over every post.
+
+Authors whose audience is larger than POST_FANOUT_LIMIT are not pushed; their
+posts keep `fanned_out=False` and are merged into feeds at read time. So are
+posts whose fan-out hasn't run (or failed): fan-out happens after the post's
+transaction commits, on a background thread (POST_FANOUT_ASYNC), and the flag
+is only set once the entries are stored durably.
+
+When a friendship or club membership changes, the affected timelines are
+backfilled with (or cleared of) the posts the change makes visible (or
+hidden), up to POST_TIMELINE_BACKFILL recent posts at a time.
+
+The storage is pluggable through the POST_TIMELINE_BACKEND setting.
+"""
+import logging
+import threading
+from bisect import insort
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from clubs.models import ClubMembership
+from friends.models import Friendship
+from .models import Post, TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+
+class BaseTimelineBackend:
+    # Whether entries survive restarts and are shared by every worker. Posts
+    # pushed to a non-durable backend are still merged into feeds at read time.
+    durable = True
+
+    def add(self, post, user_ids):
+        """Adds the post to the timelines of all user_ids."""
+        raise NotImplementedError
+
+    def add_many(self, posts, user_ids):
+        """Adds every post to the timelines of all user_ids."""
+        for post in posts:
+            self.add(post, user_ids)
+
+    def remove_from(self, user_ids, post_ids):
+        """Removes the given posts from the timelines of user_ids."""
+        raise NotImplementedError
+
+    def remove(self, post_id):
+        """Removes the post from every timeline."""
+        raise NotImplementedError
+
+    def read(self, user_id, limit, before=None):
+        """
+        Returns up to `limit` (created_at, post_id) pairs from the user's timeline,
+        newest first. `before` is an optional (created_at, post_id) position to
+        continue from.
+        """
+        raise NotImplementedError
+
+
+class DatabaseTimelineBackend(BaseTimelineBackend):
+    batch_size = 1000
+
+    def add(self, post, user_ids):
+        entries = [
+            TimelineEntry(user_id=user_id, post_id=post.id, created_at=post.created_at)
+            for user_id in user_ids
+        ]
+        TimelineEntry.objects.bulk_create(entries, batch_size=self.batch_size, ignore_conflicts=True)
+
+    def add_many(self, posts, user_ids):
+        entries = [
+            TimelineEntry(user_id=user_id, post_id=post.id, created_at=post.created_at)
+            for post in posts for user_id in user_ids
+        ]
+        TimelineEntry.objects.bulk_create(entries, batch_size=self.batch_size, ignore_conflicts=True)
+
+    def remove(self, post_id):
+        TimelineEntry.objects.filter(post_id=post_id).delete()
+
+    def remove_from(self, user_ids, post_ids):
+        TimelineEntry.objects.filter(user_id__in=user_ids, post_id__in=post_ids).delete()
+
+    def read(self, user_id, limit, before=None):
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        if before is not None:
+            created_at, post_id = before
+            entries = entries.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, post_id__lt=post_id)
+            )
+        return list(
+            entries.order_by('-created_at', '-post_id').values_list('created_at', 'post_id')[:limit]
+        )
+
+
+class InMemoryTimelineBackend(BaseTimelineBackend):
+    """
+    Process-local timelines for tests and local development.
+    """
+    durable = False
+    max_entries = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timelines = {}
+
+    def add(self, post, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                timeline = self._timelines.setdefault(user_id, [])
+                # Stored oldest first; read() walks from the end
+                insort(timeline, (post.created_at, post.id))
+                if len(timeline) > self.max_entries:
+                    del timeline[0]
+
+    def remove(self, post_id):
+        with self._lock:
+            for user_id, timeline in self._timelines.items():
+                self._timelines[user_id] = [entry for entry in timeline if entry[1] != post_id]
+
+    def remove_from(self, user_ids, post_ids):
+        post_ids = set(post_ids)
+        with self._lock:
+            for user_id in user_ids:
+                if user_id in self._timelines:
+                    self._timelines[user_id] = [
+                        entry for entry in self._timelines[user_id] if entry[1] not in post_ids
+                    ]
+
+    def read(self, user_id, limit, before=None):
+        with self._lock:
+            timeline = list(self._timelines.get(user_id, []))
+        entries = reversed(timeline)
+        if before is not None:
+            entries = (entry for entry in entries if entry < tuple(before))
+        result = []
+        for entry in entries:
+            result.append(entry)
+            if len(result) >= limit:
+                break
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._timelines.clear()
+
+
+@lru_cache(maxsize=None)
+def get_timeline_backend():
+    return import_string(settings.POST_TIMELINE_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_timeline_backend(setting, **kwargs):
+    if setting == 'POST_TIMELINE_BACKEND':
+        get_timeline_backend.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _fanout_executor():
+    # One thread: fan-out jobs run in commit order
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='timeline-fanout')
+
+
+def _run_job(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        # Posts stay fanned_out=False and are merged on read
+        logger.exception("Timeline job %s%r failed", func.__name__, args)
+    finally:
+        close_old_connections()
+
+
+def run_after_commit(func, *args):
+    """
+    Runs func(*args) once the current transaction commits: on the fan-out
+    thread, or inline when POST_FANOUT_ASYNC is off (tests).
+    """
+    def submit():
+        if settings.POST_FANOUT_ASYNC:
+            _fanout_executor().submit(_run_job, func, *args)
+        else:
+            func(*args)
+
+    transaction.on_commit(submit)
+
+
+def fanout_user_ids(post):
+    """
+    Returns everyone whose home feed should receive this post.
+    """
+    if post.club_id:
+        return set(
+            ClubMembership.objects.filter(club_id=post.club_id).values_list('user_id', flat=True)
+        )
+
+    user_ids = {post.author_id}
+    user_ids.update(
+        Friendship.objects.filter(user_id=post.author_id).values_list('friend_id', flat=True)
+    )
+    author_club_ids = ClubMembership.objects.filter(user_id=post.author_id).values('club_id')
+    user_ids.update(
+        ClubMembership.objects.filter(club_id__in=author_club_ids).values_list('user_id', flat=True)
+    )
+    return user_ids
+
+
+def publish_post(post):
+    """
+    Pushes a newly created top-level post into its readers' timelines. Returns
+    False (leaving the post to be merged on read) if the audience is too large.
+    """
+    if post.parent_id or post.author_id is None:
+        return False
+
+    user_ids = fanout_user_ids(post)
+    if len(user_ids) > settings.POST_FANOUT_LIMIT:
+        return False
+
+    backend = get_timeline_backend()
+    with transaction.atomic():
+        backend.add(post, user_ids)
+        if backend.durable:
+            Post.objects.filter(pk=post.pk).update(fanned_out=True)
+            post.fanned_out = True
+    return True
+
+
+def _publish_post_id(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        publish_post(post)
+
+
+def schedule_publish(post):
+    """
+    Publishes the post after the current transaction commits, off the request.
+    """
+    run_after_commit(_publish_post_id, post.id)
+
+
+def retract_post(post):
+    get_timeline_backend().remove(post.id)
+
+
+def _recent(posts):
+    return list(
+        posts.filter(fanned_out=True, parent__isnull=True)
+        .order_by('-created_at', '-id')[:settings.POST_TIMELINE_BACKFILL]
+    )
+
+
+def _shares_club(user_id, other_id):
+    return ClubMembership.objects.filter(
+        user_id=user_id, club_id__in=ClubMembership.objects.filter(user_id=other_id).values('club_id')
+    ).exists()
+
+
+def _entitled_authors(user_id):
+    """
+    Ids of the users whose own (non-club) posts user_id should see.
+    """
+    my_club_ids = ClubMembership.objects.filter(user_id=user_id).values('club_id')
+    author_ids = {user_id}
+    author_ids.update(Friendship.objects.filter(user_id=user_id).values_list('friend_id', flat=True))
+    author_ids.update(ClubMembership.objects.filter(club_id__in=my_club_ids).values_list('user_id', flat=True))
+    return author_ids
+
+
+def sync_pair(user_id, other_id):
+    """
+    After a friendship between the two users was added or removed, backfills
+    each one's timeline with the other's recent posts, or removes them if
+    they no longer share a club either.
+    """
+    backend = get_timeline_backend()
+    visible = (
+        Friendship.objects.filter(user_id=user_id, friend_id=other_id).exists() or
+        _shares_club(user_id, other_id)
+    )
+    for reader_id, author_id in ((user_id, other_id), (other_id, user_id)):
+        own_posts = Post.objects.filter(author_id=author_id, club__isnull=True)
+        if visible:
+            backend.add_many(_recent(own_posts), [reader_id])
+        else:
+            backend.remove_from([reader_id], own_posts.values_list('id', flat=True))
+
+
+def sync_membership(user_id, club_id):
+    """
+    After user_id joined or left club_id, backfills or clears the club's
+    posts in their timeline, and the co-members' own posts in both directions.
+    """
+    backend = get_timeline_backend()
+    member_ids = set(
+        ClubMembership.objects.filter(club_id=club_id).exclude(user_id=user_id).values_list('user_id', flat=True)
+    )
+    club_posts = Post.objects.filter(club_id=club_id)
+    own_posts = Post.objects.filter(author_id=user_id, club__isnull=True)
+
+    if ClubMembership.objects.filter(user_id=user_id, club_id=club_id).exists():
+        backend.add_many(
+            _recent(club_posts | Post.objects.filter(author_id__in=member_ids, club__isnull=True)), [user_id]
+        )
+        backend.add_many(_recent(own_posts), member_ids)
+        return
+
+    backend.remove_from([user_id], club_posts.values_list('id', flat=True))
+    # Co-members stay visible through friendship or another shared club
+    hidden_ids = member_ids - _entitled_authors(user_id)
+    if hidden_ids:
+        backend.remove_from(
+            [user_id], Post.objects.filter(author_id__in=hidden_ids, club__isnull=True).values_list('id', flat=True)
+        )
+        backend.remove_from(hidden_ids, own_posts.values_list('id', flat=True))
+
+
+def _fanout_on_read(user, limit, before=None):
+    """
+    Posts that were too widely followed to be pushed, restricted to the ones
+    this user would have received.
+    """
+    friend_ids = Friendship.objects.filter(user=user).values('friend_id')
+    my_club_ids = ClubMembership.objects.filter(user=user).values('club_id')
+    co_member_ids = ClubMembership.objects.filter(club_id__in=my_club_ids).values('user_id')
+
+    posts = Post.objects.filter(fanned_out=False, parent__isnull=True).filter(
+        Q(author=user) |
+        Q(club_id__in=my_club_ids) |
+        Q(club__isnull=True, author_id__in=friend_ids) |
+        Q(club__isnull=True, author_id__in=co_member_ids)
+    )
+    if before is not None:
+        created_at, post_id = before
+        posts = posts.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+    return list(posts.order_by('-created_at', '-id').values_list('created_at', 'id')[:limit])
+
+
+def read_feed(user, limit, before=None):
+    """
+    Returns up to `limit` (created_at, post_id) pairs for the user's home feed,
+    newest first, merging pushed timeline entries with fan-out-on-read posts.
+    """
+    entries = set(get_timeline_backend().read(user.id, limit, before))
+    entries.update(_fanout_on_read(user, limit, before))
+    return sorted(entries, reverse=True)[:limit]
@@ -12,6 +12,7 @@ urlpatterns = [
     path('<int:post_id>/undo_repost/', views.undo_repost, name='undo_repost'),
     path('user/<str:username>/', views.list_user_posts, name='list_user_posts'),
     path('<int:post_id>/', views.get_post_detail, name='get_post_detail'),
+    path('cache-stats/', views.post_cache_stats, name='post_cache_stats'),
 
     # Replies endpoint (GET replies for a post)
     path('<int:post_id>/replies/', views.list_post_replies, name='list_post_replies'),
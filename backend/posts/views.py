@@ -1,16 +1,21 @@
 # posts/views.py
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from .models import Post, Like, Repost
-from clubs.models import ClubMembership
+from clubs.models import Club, ClubMembership
 from django.contrib.auth import get_user_model
 from posts.serializers import PostSerializer
+from .timeline import schedule_publish, retract_post, read_feed
+from .cache import get_post_cache
+from backend.pagination import KeysetPagination
 from better_profanity import profanity
 from rest_framework.throttling import UserRateThrottle
-from django.db.models import Q, Count, Exists, OuterRef, Subquery
-from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+from django.db.models import Q
 from django.utils.timesince import timesince
 from django.utils.timezone import now
 
@@ -56,7 +61,7 @@ def create_post(request):
 
     club = None
     if club_id:
-        club = get_object_or_404(ClubMembership.model.club.field.related_model, id=club_id)
+        club = get_object_or_404(Club, id=club_id)
         membership = ClubMembership.objects.filter(user=user, club=club).first()
         if not membership or membership.role not in ['moderator', 'admin']:
             return Response({"detail": "No permission to post in this club."}, status=status.HTTP_403_FORBIDDEN)
@@ -73,7 +78,11 @@ def create_post(request):
         parent=parent,
     )
     try:
-        post.save()
+        with transaction.atomic():
+            post.save()
+            if parent:
+                Post.adjust_counter(parent.id, 'comment_count', 1)
+            schedule_publish(post)
     except PermissionError:
         return Response({"detail": "Permission denied for posting."}, status=status.HTTP_403_FORBIDDEN)
 
@@ -95,7 +104,11 @@ def delete_post(request, post_id):
         if post.author != user:
             return Response({"detail": "Cannot delete others' posts."}, status=status.HTTP_403_FORBIDDEN)
 
-    post.delete()
+    retract_post(post)
+    with transaction.atomic():
+        if post.parent_id:
+            Post.adjust_counter(post.parent_id, 'comment_count', -1)
+        post.delete()
     return Response({"message": "Post deleted"}, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
@@ -105,7 +118,10 @@ def like_post(request, post_id):
     user = request.user
     post = get_object_or_404(Post, id=post_id)
 
-    like, created = Like.objects.get_or_create(user=user, post=post)
+    with transaction.atomic():
+        like, created = Like.objects.get_or_create(user=user, post=post)
+        if created:
+            Post.adjust_counter(post.id, 'like_count', 1)
     if not created:
         return Response({"detail": "Already liked"}, status=status.HTTP_400_BAD_REQUEST)
     return Response({"message": "Post liked"}, status=status.HTTP_201_CREATED)
@@ -117,10 +133,12 @@ def unlike_post(request, post_id):
     user = request.user
     post = get_object_or_404(Post, id=post_id)
 
-    like = Like.objects.filter(user=user, post=post).first()
-    if not like:
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post=post).delete()
+        if deleted:
+            Post.adjust_counter(post.id, 'like_count', -1)
+    if not deleted:
         return Response({"detail": "Like does not exist"}, status=status.HTTP_400_BAD_REQUEST)
-    like.delete()
     return Response({"message": "Post unliked"}, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
@@ -130,7 +148,10 @@ def repost_post(request, post_id):
     user = request.user
     post = get_object_or_404(Post, id=post_id)
 
-    repost, created = Repost.objects.get_or_create(user=user, post=post)
+    with transaction.atomic():
+        repost, created = Repost.objects.get_or_create(user=user, post=post)
+        if created:
+            Post.adjust_counter(post.id, 'repost_count', 1)
     if not created:
         return Response({"detail": "Already reposted"}, status=status.HTTP_400_BAD_REQUEST)
     return Response({"message": "Post reposted"}, status=status.HTTP_201_CREATED)
@@ -142,10 +163,12 @@ def undo_repost(request, post_id):
     user = request.user
     post = get_object_or_404(Post, id=post_id)
 
-    repost = Repost.objects.filter(user=user, post=post).first()
-    if not repost:
+    with transaction.atomic():
+        deleted, _ = Repost.objects.filter(user=user, post=post).delete()
+        if deleted:
+            Post.adjust_counter(post.id, 'repost_count', -1)
+    if not deleted:
         return Response({"detail": "Repost does not exist"}, status=status.HTTP_400_BAD_REQUEST)
-    repost.delete()
     return Response({"message": "Repost removed"}, status=status.HTTP_200_OK)
 
 @api_view(['GET'])
@@ -153,23 +176,21 @@ def undo_repost(request, post_id):
 #@throttle_classes([ListPostsThrottle])
 def list_posts(request):
     user = request.user
+    paginator = KeysetPagination(ordering=('-created_at', '-id'))
     try:
-        likes_subquery = Like.objects.filter(post=OuterRef('pk'), user=user)
-        reposts_subquery = Repost.objects.filter(post=OuterRef('pk'), user=user)
-
-        posts = Post.objects.filter(parent__isnull=True).annotate(
-            comment_count=Count('replies', distinct=True),
-            like_count=Count('likes', distinct=True),
-            repost_count=Count('reposts', distinct=True),
-            has_liked=Exists(likes_subquery),
-            has_reposted=Exists(reposts_subquery),
-            reposted_by_username=Subquery(
-                Repost.objects.filter(post=OuterRef('pk'), user=user).values('user__username')[:1]
-            ),
-        ).select_related('author').order_by('-created_at')[:50]
+        entries = paginator.paginate_keys(
+            lambda limit, before: read_feed(user, limit=limit, before=before),
+            request,
+            Post._meta.get_field('created_at'),
+        )
+        post_ids = [post_id for _, post_id in entries]
+
+        posts = Post.objects.filter(id__in=post_ids).select_related('author').order_by('-created_at', '-id')
 
         serializer = PostSerializer(posts, many=True, context={'request': request})
-        return Response(serializer.data, status=200)
+        return paginator.get_paginated_response(serializer.data)
+    except APIException:
+        raise
     except Exception as e:
         return Response({"detail": str(e)}, status=500)
 
@@ -177,47 +198,21 @@ def list_posts(request):
 @permission_classes([permissions.IsAuthenticated])
 #@throttle_classes([ListUserPostsThrottle])
 def list_user_posts(request, username):
-    user = request.user
-
-    likes_subquery = Like.objects.filter(post=OuterRef('pk'), user=user)
-    reposts_subquery = Repost.objects.filter(post=OuterRef('pk'), user=user)
-
     posts = Post.objects.filter(
         Q(author__username=username) | Q(reposts__user__username=username),
         parent__isnull=True,
         is_anonymous=False,
-    ).distinct().annotate(
-        comment_count=Count('replies', distinct=True),
-        like_count=Count('likes', distinct=True),
-        repost_count=Count('reposts', distinct=True),
-        has_liked=Exists(likes_subquery),
-        has_reposted=Exists(reposts_subquery),
-        reposted_by_username=Subquery(
-            Repost.objects.filter(post=OuterRef('pk'), user=user).values('user__username')[:1]
-        ),
-    ).select_related('author').order_by('-created_at')
-
-    serializer = PostSerializer(posts, many=True, context={'request': request})
-    return Response(serializer.data)
+    ).distinct().select_related('author')
+
+    paginator = KeysetPagination(ordering=('-created_at', '-id'))
+    page = paginator.paginate_queryset(posts, request)
+    serializer = PostSerializer(page, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_post_detail(request, post_id):
-    user = request.user
-
-    likes_subquery = Like.objects.filter(post=OuterRef('pk'), user=user)
-    reposts_subquery = Repost.objects.filter(post=OuterRef('pk'), user=user)
-
-    post = get_object_or_404(Post.objects.annotate(
-        comment_count=Count('replies', distinct=True),
-        like_count=Count('likes', distinct=True),
-        repost_count=Count('reposts', distinct=True),
-        has_liked=Exists(likes_subquery),
-        has_reposted=Exists(reposts_subquery),
-        reposted_by_username=Subquery(
-            Repost.objects.filter(post=OuterRef('pk'), user=user).values('user__username')[:1]
-        ),
-    ).select_related('author'), id=post_id)
+    post = get_object_or_404(Post.objects.select_related('author'), id=post_id)
 
     serializer = PostSerializer(post, context={'request': request})
     return Response(serializer.data)
@@ -226,7 +221,8 @@ def get_post_detail(request, post_id):
 @permission_classes([permissions.IsAuthenticated])
 def list_post_replies(request, post_id):
     post = get_object_or_404(Post, id=post_id)
-    replies = post.replies.select_related('author').order_by('created_at')
+    paginator = KeysetPagination(ordering=('created_at', 'id'))
+    replies = paginator.paginate_queryset(post.replies.select_related('author'), request)
     current_time = now()
 
     data = [
@@ -238,8 +234,13 @@ def list_post_replies(request, post_id):
             'content': reply.content,
             'timeAgo': timesince(reply.created_at, current_time) + ' ago',
             'is_anonymous': reply.is_anonymous,
-            'parent_id': reply.parent.id if reply.parent else None,
+            'parent_id': reply.parent_id,
         }
         for reply in replies
     ]
-    return JsonResponse(data, safe=False)
\ No newline at end of file
+    return paginator.get_paginated_response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def post_cache_stats(request):
+    return Response(get_post_cache().get_stats())
@@ -0,0 +1,263 @@
+"""
+In-memory typeahead over usernames, full names, club names and classes.
+
+Every name is stored under a few normalized keys (the whole name plus each
+later word, so "Alice Chessington" completes from "al" and "ches") in one
+sorted list of (key, kind, id) tuples. A lookup is a bisect to the first key
+with the prefix and a short scan, so completions never touch the database.
+
+Server processes build the index at startup (warm_index(), called from
+wsgi.py and asgi.py); other processes build it on first use. Saves and
+deletes in the same process update it immediately (search.signals). To pick
+up changes made by other workers, a background thread rebuilds it every
+AUTOCOMPLETE_REFRESH_SECONDS and swaps it in, so no request ever waits for a
+rebuild.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connections
+from clubs.models import Club
+from courses.catalog import get_catalog
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+DEFAULT_COMPLETIONS = 10
+MAX_COMPLETIONS = 25
+# Keys examined per lookup; enough to rank well without scanning long runs
+# of a very common prefix
+MAX_SCAN = 500
+
+# kind -> (model, label field, detail field); classes come from the course catalog
+SOURCES = {
+    'users': (User, 'username', 'full_name'),
+    'clubs': (Club, 'name', None),
+    'classes': (None, 'descr', 'full_name'),
+}
+
+
+def normalize(text):
+    return ' '.join((text or '').casefold().split())
+
+
+def index_keys(label, detail=''):
+    keys = []
+    for text in (label, detail):
+        words = normalize(text).split()
+        for i in range(len(words)):
+            # Interned: common words and surnames are shared across entries
+            key = sys.intern(' '.join(words[i:]))
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []     # sorted (key, kind, id)
+        self._entries = {}  # (kind, id) -> (label, detail, keys)
+        self.built_at = None
+        self.build_ms = None
+
+    def load(self, items):
+        """
+        Replaces the contents with (kind, id, label, detail) items.
+        """
+        start = time.perf_counter()
+        entries = {}
+        keys = []
+        for kind, object_id, label, detail in items:
+            entry_keys = index_keys(label, detail)
+            entries[(kind, object_id)] = (label, detail or '', entry_keys)
+            keys.extend((key, kind, object_id) for key in entry_keys)
+        keys.sort()
+        with self._lock:
+            self._keys = keys
+            self._entries = entries
+            self.built_at = time.monotonic()
+            self.build_ms = (time.perf_counter() - start) * 1000
+
+    def add(self, kind, object_id, label, detail=''):
+        entry_keys = index_keys(label, detail)
+        with self._lock:
+            self._remove(kind, object_id)
+            self._entries[(kind, object_id)] = (label, detail or '', entry_keys)
+            for key in entry_keys:
+                insort(self._keys, (key, kind, object_id))
+
+    def remove(self, kind, object_id):
+        with self._lock:
+            self._remove(kind, object_id)
+
+    def _remove(self, kind, object_id):
+        entry = self._entries.pop((kind, object_id), None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            i = bisect_left(self._keys, (key, kind, object_id))
+            if i < len(self._keys) and self._keys[i] == (key, kind, object_id):
+                del self._keys[i]
+
+    def complete(self, prefix, limit=DEFAULT_COMPLETIONS, kinds=None):
+        """
+        Returns up to `limit` {'type', 'id', 'label', 'detail'} dicts whose
+        name or a later word of it starts with `prefix`. Exact matches come
+        first, then label matches before detail matches, then shorter names.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            keys = self._keys
+            entries = self._entries
+            best = {}
+            i = bisect_left(keys, (prefix,))
+            end = min(len(keys), i + MAX_SCAN)
+            while i < end and keys[i][0].startswith(prefix):
+                key, kind, object_id = keys[i]
+                i += 1
+                if kinds is not None and kind not in kinds:
+                    continue
+                label, detail, _ = entries[(kind, object_id)]
+                rank = (key != prefix, not normalize(label).startswith(prefix), len(label), label)
+                if (kind, object_id) not in best or rank < best[(kind, object_id)]:
+                    best[(kind, object_id)] = rank
+
+            ranked = sorted(best.items(), key=lambda item: item[1])[:limit]
+            return [
+                {
+                    'type': kind,
+                    'id': object_id,
+                    'label': entries[(kind, object_id)][0],
+                    'detail': entries[(kind, object_id)][1],
+                }
+                for (kind, object_id), _ in ranked
+            ]
+
+    def get_stats(self):
+        with self._lock:
+            key_bytes = (
+                sys.getsizeof(self._keys) +
+                sum(sys.getsizeof(entry) for entry in self._keys) +
+                sum(sys.getsizeof(key) for key in {entry[0] for entry in self._keys})
+            )
+            entry_bytes = sys.getsizeof(self._entries) + sum(
+                sys.getsizeof(label) + sys.getsizeof(detail) + sys.getsizeof(keys)
+                for label, detail, keys in self._entries.values()
+            )
+            by_kind = {}
+            for kind, _ in self._entries:
+                by_kind[kind] = by_kind.get(kind, 0) + 1
+            return {
+                'entries': len(self._entries),
+                'keys': len(self._keys),
+                'by_type': by_kind,
+                'approx_bytes': key_bytes + entry_bytes,
+                'build_ms': round(self.build_ms, 2) if self.build_ms is not None else None,
+                'age_seconds': round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+            }
+
+
+_index = PrefixIndex()
+_build_lock = threading.Lock()
+_refresher = None  # (pid, thread); threads don't survive a fork
+_refresher_lock = threading.Lock()
+
+
+def _load_items():
+    for kind, (model, label_field, detail_field) in SOURCES.items():
+        if model is None:
+            continue
+        fields = [field for field in ('pk', label_field, detail_field) if field]
+        for row in model.objects.values_list(*fields).iterator(chunk_size=2000):
+            yield (kind, row[0], row[1], row[2] if detail_field else '')
+    for course in get_catalog().all():
+        yield ('classes', course.id, course.descr, course.full_name)
+
+
+def rebuild_index():
+    """
+    Reloads the index from the database. Lookups keep using the old contents
+    until the new ones are swapped in.
+    """
+    with _build_lock:
+        _index.load(_load_items())
+    return _index
+
+
+def _refresh_periodically():
+    while True:
+        time.sleep(settings.AUTOCOMPLETE_REFRESH_SECONDS)
+        try:
+            rebuild_index()
+        except Exception:
+            logger.exception("Could not refresh the autocomplete index")
+        finally:
+            # This thread's connections; the next rebuild is minutes away
+            connections.close_all()
+
+
+def _refresher_running():
+    return _refresher is not None and _refresher[0] == os.getpid() and _refresher[1].is_alive()
+
+
+def _start_refresher():
+    global _refresher
+    if settings.AUTOCOMPLETE_REFRESH_SECONDS <= 0 or _refresher_running():
+        return
+    with _refresher_lock:
+        if _refresher_running():
+            return
+        thread = threading.Thread(target=_refresh_periodically, name='autocomplete-refresh', daemon=True)
+        thread.start()
+        _refresher = (os.getpid(), thread)
+
+
+def warm_index():
+    """
+    Builds the index ahead of the first request. Startup must not fail
+    because the database is unreachable; the first request retries then.
+    """
+    try:
+        rebuild_index()
+    except DatabaseError:
+        logger.exception("Could not preload the autocomplete index")
+    finally:
+        # Don't hand an open connection to forked worker processes
+        connections.close_all()
+
+
+def get_index():
+    """
+    The process's index, built now only if it wasn't at startup. Also makes
+    sure this process has a refresher thread (e.g. in workers forked after
+    warm_index() ran).
+    """
+    if _index.built_at is None:
+        with _build_lock:
+            if _index.built_at is None:
+                _index.load(_load_items())
+    _start_refresher()
+    return _index
+
+
+def index_object(kind, obj):
+    # Before the first build there's nothing to update; the build reads the table
+    if _index.built_at is None:
+        return
+    _, label_field, detail_field = SOURCES[kind]
+    _index.add(kind, obj.pk, getattr(obj, label_field), getattr(obj, detail_field) if detail_field else '')
+
+
+def remove_object(kind, pk):
+    _index.remove(kind, pk)
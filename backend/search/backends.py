@@ -0,0 +1,77 @@
+"""
+Ranked lookups against the search index (search.models.SearchDocument).
+
+PostgreSQL: a generated tsvector column (title weighted above body) with a GIN
+index, plus a pg_trgm GIN index on title so misspelled usernames and club
+names still match. SQLite (local and test runs): an FTS5 table over
+title/body kept in sync by triggers, ranked with bm25. Both are created in
+migration 0002. Other databases fall back to an unindexed substring match.
+
+Every term is matched as a prefix, so results show up while a word is still
+being typed.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from .models import SearchDocument
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TERMS = 8
+
+
+def terms(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def search_ids(kind, query, limit, offset=0):
+    """
+    Returns up to `limit` object ids of `kind` matching `query`, best first.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    search = _BACKENDS.get(connection.vendor, _search_substring)
+    return search(kind, words, limit, offset)
+
+
+def _search_postgresql(kind, words, limit, offset):
+    tsquery = ' & '.join(f'{word}:*' for word in words)
+    phrase = ' '.join(words)
+    sql = """
+        SELECT object_id FROM search_searchdocument
+        WHERE kind = %s
+          AND (vector @@ to_tsquery('simple', %s) OR title %% %s)
+        ORDER BY ts_rank(vector, to_tsquery('simple', %s)) + similarity(title, %s) DESC, object_id
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [kind, tsquery, phrase, tsquery, phrase, limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_sqlite(kind, words, limit, offset):
+    match = ' AND '.join(f'"{word}"*' for word in words)
+    sql = """
+        SELECT d.object_id FROM search_searchdocument_fts f
+        JOIN search_searchdocument d ON d.id = f.rowid
+        WHERE search_searchdocument_fts MATCH %s AND d.kind = %s
+        ORDER BY bm25(search_searchdocument_fts, 10.0, 1.0), d.object_id
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, kind, limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_substring(kind, words, limit, offset):
+    documents = SearchDocument.objects.filter(kind=kind)
+    for word in words:
+        documents = documents.filter(Q(title__icontains=word) | Q(body__icontains=word))
+    return list(documents.order_by('title', 'object_id').values_list('object_id', flat=True)[offset:offset + limit])
+
+
+_BACKENDS = {
+    'postgresql': _search_postgresql,
+    'sqlite': _search_sqlite,
+}
@@ -0,0 +1,161 @@
+"""
+Cache of the viewer-independent part of global search results.
+
+Entries are keyed by result type, normalized query and page, and hold the
+ranked, serialized results as any viewer would see them before their own
+relationship to each result is known. overlay() fills in those fields
+(is_friend, is_member, is_going, ...) per request, using the request's
+ViewerRelationships.
+
+Each result type has a generation number that is bumped whenever a model it
+is built from changes (search.signals), which orphans that type's entries.
+Generations are kept in Django's default cache, so with a shared cache
+backend an invalidation in one worker orphans the entries of every worker.
+
+Profile privacy is never decided from cached data: cached results hold only
+the public part of private profiles, and overlay() re-reads which of the
+results are private before applying the viewer's view.
+
+Configured with the SEARCH_RESULT_CACHE setting; see backend.caching.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache as shared_cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from backend.caching import CacheStats, build_cache
+from users.relationships import get_viewer_relationships
+from users.serializers import private_profile
+from .backends import terms
+from .serializers import UserResultSerializer
+
+User = get_user_model()
+
+_type_stats = {}
+
+
+@lru_cache(maxsize=None)
+def get_search_cache():
+    return build_cache(settings.SEARCH_RESULT_CACHE)
+
+
+@receiver(setting_changed)
+def reset_search_cache(setting, **kwargs):
+    if setting == 'SEARCH_RESULT_CACHE':
+        get_search_cache.cache_clear()
+
+
+def _generation_key(kind):
+    return f'search-generation:{kind}'
+
+
+def invalidate(*kinds):
+    for kind in kinds:
+        key = _generation_key(kind)
+        shared_cache.add(key, 0, None)
+        try:
+            shared_cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr(); any new value orphans the old entries
+            shared_cache.set(key, 1, None)
+        _stats_for(kind).incr('invalidations')
+
+
+def _stats_for(kind):
+    stats = _type_stats.get(kind)
+    if stats is None:
+        stats = _type_stats.setdefault(kind, CacheStats())
+    return stats
+
+
+def get_results(kind, query, limit, offset, compute):
+    """
+    Returns the cached (items, has_more) for this page of results, calling
+    `compute()` to build and store them on a miss.
+    """
+    generation = shared_cache.get(_generation_key(kind), 0)
+    key = f"{kind}:{generation}:{limit}:{offset}:{' '.join(terms(query))}"
+    cache = get_search_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        _stats_for(kind).incr('hits')
+        return cached
+    _stats_for(kind).incr('misses')
+    result = compute()
+    cache.set(key, result)
+    return result
+
+
+def _fresh_users(items, relationships, request):
+    """
+    Cached user results with is_private re-read from the database, and full
+    profiles reloaded where the cache only holds the public part but the
+    viewer may see more (their own profile, a friend's, or a profile that has
+    since been made public).
+    """
+    ids = [rep['id'] for rep in items]
+    private_ids = set(User.objects.filter(id__in=ids, is_private=True).values_list('id', flat=True))
+    allowed = relationships.friend_ids | {request.user.id}
+    reload = [
+        rep['id'] for rep in items
+        if rep['is_private'] and (rep['id'] in allowed or rep['id'] not in private_ids)
+    ]
+    fresh = {}
+    if reload:
+        users = User.objects.filter(id__in=reload).prefetch_related('clubs')
+        for user in users:
+            user.is_private = False  # Serialize the full profile; privacy is applied below
+            fresh[user.id] = UserResultSerializer(user, context={'request': request}).data
+    return [
+        dict(fresh.get(rep['id'], rep), is_private=rep['id'] in private_ids)
+        for rep in items
+    ]
+
+
+def _overlay_user(rep, relationships, viewer):
+    rep['is_friend'] = rep['id'] != viewer.id and rep['id'] in relationships.friend_ids
+    rep['friend_request_sent'] = rep['id'] != viewer.id and rep['id'] in relationships.pending_sent_ids
+    if rep['is_private'] and rep['id'] != viewer.id and not rep['is_friend']:
+        return private_profile(rep)
+    return rep
+
+
+def _overlay_club(rep, relationships, viewer):
+    rep['is_member'] = rep['id'] in relationships.club_ids
+    members = rep['members']
+    rep['only_member_is_me'] = len(members) == 1 and members[0]['username'] == viewer.username
+    return rep
+
+
+def _overlay_event(rep, relationships, viewer):
+    rep['is_going'] = rep['id'] in relationships.attending_event_ids
+    return rep
+
+
+OVERLAYS = {
+    'users': _overlay_user,
+    'clubs': _overlay_club,
+    'events': _overlay_event,
+}
+
+
+def overlay(kind, items, request):
+    """
+    Copies of cached results with the requesting user's view applied.
+    """
+    apply = OVERLAYS.get(kind)
+    if apply is None or not items:
+        return items
+    relationships = get_viewer_relationships(request)
+    if kind == 'users':
+        items = _fresh_users(items, relationships, request)
+    return [apply(dict(rep), relationships, request.user) for rep in items]
+
+
+def get_stats():
+    stats = get_search_cache().get_stats()
+    stats['types'] = {kind: type_stats.as_dict() for kind, type_stats in sorted(_type_stats.items())}
+    return stats
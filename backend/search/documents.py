@@ -0,0 +1,64 @@
+"""
+What each searchable model contributes to the search index.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from clubs.models import Club
+from events.models import Event
+from .models import SearchDocument
+
+User = get_user_model()
+
+
+def user_document(user):
+    return user.username, user.full_name or ''
+
+
+def club_document(club):
+    return club.name, club.description or ''
+
+
+def event_document(event):
+    return event.title, ' '.join(filter(None, [event.location, event.description]))
+
+
+# kind -> (model, document builder, fields the builder reads)
+SOURCES = {
+    'users': (User, user_document, ('username', 'full_name')),
+    'clubs': (Club, club_document, ('name', 'description')),
+    'events': (Event, event_document, ('title', 'location', 'description')),
+}
+
+
+def index_object(kind, obj):
+    _, build, _ = SOURCES[kind]
+    title, body = build(obj)
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=obj.pk, defaults={'title': title, 'body': body}
+    )
+
+
+def remove_object(kind, pk):
+    SearchDocument.objects.filter(kind=kind, object_id=pk).delete()
+
+
+def rebuild_kind(kind, batch_size=1000):
+    """
+    Replaces every document of `kind` from its source table. Returns the
+    number of documents written.
+    """
+    model, build, fields = SOURCES[kind]
+    queryset = model.objects.only('pk', *fields).order_by('pk')
+    written = 0
+    with transaction.atomic():
+        SearchDocument.objects.filter(kind=kind).delete()
+        batch = []
+        for obj in queryset.iterator(chunk_size=batch_size):
+            title, body = build(obj)
+            batch.append(SearchDocument(kind=kind, object_id=obj.pk, title=title, body=body))
+            if len(batch) >= batch_size:
+                written += len(SearchDocument.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            written += len(SearchDocument.objects.bulk_create(batch))
+    return written
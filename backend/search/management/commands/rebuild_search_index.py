@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from search.documents import SOURCES, rebuild_kind
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the global search index for users, clubs and events."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--only', choices=list(SOURCES), help="Only rebuild one kind of object.")
+
+    def handle(self, *args, **options):
+        for kind in SOURCES:
+            if options['only'] and options['only'] != kind:
+                continue
+            written = rebuild_kind(kind, options['batch_size'])
+            self.stdout.write(f"Indexed {kind}: {written} documents.")
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
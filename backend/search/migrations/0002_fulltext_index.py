@@ -0,0 +1,81 @@
+# Generated by Django 5.2 on 2026-10-18 14:02
+
+from django.db import migrations
+
+# The full-text index is database specific (see search/backends.py), so it's
+# created here rather than declared on the model.
+FORWARDS = {
+    'postgresql': [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        """
+        ALTER TABLE search_searchdocument ADD COLUMN vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX search_document_vector_idx ON search_searchdocument USING GIN (vector)",
+        "CREATE INDEX search_document_title_trgm_idx ON search_searchdocument USING GIN (title gin_trgm_ops)",
+    ],
+    'sqlite': [
+        """
+        CREATE VIRTUAL TABLE search_searchdocument_fts USING fts5(
+            title, body,
+            content='search_searchdocument', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER search_searchdocument_fts_insert AFTER INSERT ON search_searchdocument BEGIN
+            INSERT INTO search_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+        END
+        """,
+        """
+        CREATE TRIGGER search_searchdocument_fts_delete AFTER DELETE ON search_searchdocument BEGIN
+            INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, body)
+            VALUES ('delete', old.id, old.title, old.body);
+        END
+        """,
+        """
+        CREATE TRIGGER search_searchdocument_fts_update AFTER UPDATE ON search_searchdocument BEGIN
+            INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, body)
+            VALUES ('delete', old.id, old.title, old.body);
+            INSERT INTO search_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+        END
+        """,
+        "INSERT INTO search_searchdocument_fts(search_searchdocument_fts) VALUES ('rebuild')",
+    ],
+}
+
+BACKWARDS = {
+    'postgresql': [
+        "DROP INDEX IF EXISTS search_document_title_trgm_idx",
+        "DROP INDEX IF EXISTS search_document_vector_idx",
+        "ALTER TABLE search_searchdocument DROP COLUMN IF EXISTS vector",
+    ],
+    'sqlite': [
+        "DROP TRIGGER IF EXISTS search_searchdocument_fts_update",
+        "DROP TRIGGER IF EXISTS search_searchdocument_fts_delete",
+        "DROP TRIGGER IF EXISTS search_searchdocument_fts_insert",
+        "DROP TABLE IF EXISTS search_searchdocument_fts",
+    ],
+}
+
+
+def create_index(apps, schema_editor):
+    for sql in FORWARDS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    for sql in BACKWARDS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
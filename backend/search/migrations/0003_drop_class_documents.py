@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 14:08
+
+from django.db import migrations, models
+
+
+def delete_class_documents(apps, schema_editor):
+    # Classes are searched in the in-memory course catalog now
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    SearchDocument.objects.filter(kind='classes').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_class_documents, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='searchdocument',
+            name='kind',
+            field=models.CharField(choices=[('users', 'User'), ('clubs', 'Club'), ('events', 'Event')], max_length=10),
+        ),
+    ]
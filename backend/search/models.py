@@ -1,3 +1,27 @@
 from django.db import models
 
-# Create your models here.
+
+class SearchDocument(models.Model):
+    """
+    One row per searchable user, club or event, kept up to date by
+    search.signals (and rebuild_search_index). Classes are searched in the
+    course catalog (courses.catalog) instead. The full-text index over title/body is database
+    specific and created in migration 0002; queries go through search.backends.
+    """
+    KIND_CHOICES = [
+        ('users', 'User'),
+        ('clubs', 'Club'),
+        ('events', 'Event'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.TextField()  # Ranked above body matches
+    body = models.TextField(blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.title}"
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+from users.serializers import UserPublicSerializer
+
+
+class UserResultSerializer(UserPublicSerializer):
+    """
+    UserPublicSerializer without anything that depends on who is searching,
+    so results can be cached and shared; search.cache.overlay() adds the
+    viewer's relationship fields and applies profile privacy afterwards.
+
+    Private profiles are reduced to what anyone may see, so their other
+    fields never reach the shared cache; overlay() reloads them for the owner
+    and their friends.
+    """
+
+    def to_representation(self, instance):
+        if instance.is_private:
+            return {'id': instance.id, 'username': instance.username, 'is_private': True}
+        return serializers.ModelSerializer.to_representation(self, instance)
+
+    def get_is_friend(self, obj):
+        return False
+
+    def get_friend_request_sent(self, obj):
+        return False
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from clubs.models import Club, ClubMembership
+from events.models import Event
+from . import autocomplete, cache
+from .documents import SOURCES, index_object, remove_object
+
+User = get_user_model()
+
+
+def _touches_document(kind, update_fields):
+    # Saves such as last_login updates don't touch indexed fields
+    return update_fields is None or bool(set(SOURCES[kind][2]) & set(update_fields))
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    # Any profile field shows up in cached results (and in clubs' member lists)
+    if update_fields is None or set(update_fields) - {'last_login'}:
+        cache.invalidate('users', 'clubs')
+    if _touches_document('users', update_fields):
+        index_object('users', instance)
+        autocomplete.index_object('users', instance)
+
+
+@receiver(post_save, sender=Club)
+def index_club(sender, instance, update_fields=None, **kwargs):
+    cache.invalidate('clubs', 'users', 'events')
+    if _touches_document('clubs', update_fields):
+        index_object('clubs', instance)
+        autocomplete.index_object('clubs', instance)
+
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, update_fields=None, **kwargs):
+    cache.invalidate('events')
+    if _touches_document('events', update_fields):
+        index_object('events', instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_user(sender, instance, **kwargs):
+    cache.invalidate('users', 'clubs')
+    remove_object('users', instance.pk)
+    autocomplete.remove_object('users', instance.pk)
+
+
+@receiver(post_delete, sender=Club)
+def remove_club(sender, instance, **kwargs):
+    cache.invalidate('clubs', 'users', 'events')
+    remove_object('clubs', instance.pk)
+    autocomplete.remove_object('clubs', instance.pk)
+
+
+@receiver(post_delete, sender=Event)
+def remove_event(sender, instance, **kwargs):
+    cache.invalidate('events')
+    remove_object('events', instance.pk)
+
+
+@receiver(post_save, sender=ClubMembership)
+@receiver(post_delete, sender=ClubMembership)
+def invalidate_memberships(sender, **kwargs):
+    # Member lists and users' club lists are part of cached results
+    cache.invalidate('clubs', 'users')
+
+
+@receiver(m2m_changed, sender=Event.attendees.through)
+def invalidate_attendance(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache.invalidate('events')
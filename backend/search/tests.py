@@ -1,3 +1,191 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from clubs.models import Club
+from friends.models import FriendRequest
+from backend.caching import CacheStats
+from backend.testing import client_for, make_user
+from .autocomplete import PrefixIndex, get_index, rebuild_index
+from .backends import search_ids
+from .cache import get_search_cache, invalidate
+from .models import SearchDocument
+
+User = get_user_model()
+
+
+@override_settings(
+    SEARCH_RESULT_CACHE={'BACKEND': 'backend.caching.PopularityCache', 'OPTIONS': {'timeout': 60}},
+)
+class SearchResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user('marsha', full_name='Marsha Private', bio='secret bio', is_private=True)
+        self.friend = make_user('fred')
+        self.stranger = make_user('sam')
+        FriendRequest.objects.create(from_user=self.owner, to_user=self.friend, status='accepted')
+        get_search_cache().clear()
+        get_search_cache().stats = CacheStats()
+
+    def search(self, user, q='marsha'):
+        response = client_for(user).get('/api/search/', {'q': q, 'type': 'users'})
+        self.assertEqual(response.status_code, 200)
+        return {rep['username']: rep for rep in response.data['users']}
+
+    def cached_values(self):
+        return [entry[0] for entry in get_search_cache()._data.values()]
+
+    def test_private_profile_fields_are_never_cached(self):
+        self.assertEqual(self.search(self.stranger)['marsha']['message'], 'This profile is private.')
+        self.assertEqual(get_search_cache().get_stats()['entries'], 1)
+        self.assertNotIn('secret bio', repr(self.cached_values()))
+
+    def test_friend_and_owner_see_full_profile_from_cached_results(self):
+        self.search(self.stranger)
+        for viewer in (self.friend, self.owner):
+            rep = self.search(viewer)['marsha']
+            self.assertEqual(rep['bio'], 'secret bio')
+            self.assertTrue(rep['is_private'])
+        self.assertEqual(get_search_cache().get_stats()['misses'], 1)
+
+    def test_privacy_is_rechecked_for_cached_results(self):
+        public = make_user('marshall', bio='public bio')
+        self.assertEqual(self.search(self.stranger, 'marshall')['marshall']['bio'], 'public bio')
+
+        # A queryset update sends no signal, so the cached entry is not invalidated
+        User.objects.filter(pk=public.pk).update(is_private=True)
+        rep = self.search(self.stranger, 'marshall')['marshall']
+        self.assertEqual(rep['message'], 'This profile is private.')
+        self.assertNotIn('bio', rep)
+
+        User.objects.filter(pk=self.owner.pk).update(is_private=False)
+        self.assertEqual(self.search(self.stranger)['marsha']['bio'], 'secret bio')
+
+    def test_invalidation_uses_shared_generation(self):
+        self.search(self.stranger)
+        generation = cache.get('search-generation:users', 0)
+        invalidate('users')
+        self.assertEqual(cache.get('search-generation:users'), generation + 1)
+        self.search(self.stranger)
+        self.assertEqual(get_search_cache().get_stats()['misses'], 2)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_search_cache().clear()
+        self.owner = make_user('olivia')
+        self.chess = Club.objects.create(name='Chess Club', description='Weekly games', owner=self.owner)
+        self.games = Club.objects.create(name='Board Games', description='Chess, go and more', owner=self.owner)
+        self.hiking = Club.objects.create(name='Hiking', description='Trails every weekend', owner=self.owner)
+
+    def search(self, **params):
+        response = client_for(self.owner).get('/api/search/', {'type': 'clubs', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_title_matches_rank_above_body_matches(self):
+        self.assertEqual(search_ids('clubs', 'chess', 10), [self.chess.id, self.games.id])
+        self.assertEqual([club['name'] for club in self.search(q='chess')['clubs']], ['Chess Club', 'Board Games'])
+
+    def test_terms_match_as_prefixes_and_all_must_match(self):
+        self.assertEqual(search_ids('clubs', 'ches', 10), [self.chess.id, self.games.id])
+        self.assertEqual(search_ids('clubs', 'chess week', 10), [self.chess.id])
+        self.assertEqual(search_ids('clubs', '  ', 10), [])
+
+    def test_paging_reports_has_more(self):
+        first = self.search(q='chess', limit=1)
+        self.assertEqual([club['name'] for club in first['clubs']], ['Chess Club'])
+        self.assertEqual(first['has_more'], {'clubs': True})
+        second = self.search(q='chess', limit=1, offset=1)
+        self.assertEqual([club['name'] for club in second['clubs']], ['Board Games'])
+        self.assertEqual(second['has_more'], {'clubs': False})
+
+    def test_index_follows_saves_and_deletes(self):
+        self.hiking.name = 'Chess Hikers'
+        self.hiking.save()
+        self.assertIn(self.hiking.id, search_ids('clubs', 'chess', 10))
+        self.chess.delete()
+        self.assertNotIn(self.chess.id, search_ids('clubs', 'chess', 10))
+
+    def test_rebuild_restores_the_index(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(search_ids('clubs', 'chess', 10), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(search_ids('clubs', 'chess', 10), [self.chess.id, self.games.id])
+
+
+class PrefixIndexTests(TestCase):
+    def setUp(self):
+        self.index = PrefixIndex()
+        self.index.load([
+            ('users', 1, 'alice', 'Alice Chessington'),
+            ('users', 2, 'alfred', ''),
+            ('clubs', 3, 'Chess Club', ''),
+            ('clubs', 4, 'Al', ''),
+        ])
+
+    def labels(self, prefix, **kwargs):
+        return [result['label'] for result in self.index.complete(prefix, **kwargs)]
+
+    def test_completes_names_and_later_words(self):
+        self.assertEqual(self.labels('ches'), ['Chess Club', 'alice'])
+        self.assertEqual(self.labels('  CHESS   c'), ['Chess Club'])
+        self.assertEqual(self.labels(''), [])
+
+    def test_exact_matches_then_labels_then_shorter_names(self):
+        self.assertEqual(self.labels('al'), ['Al', 'alice', 'alfred'])
+        self.assertEqual(self.labels('al', limit=1), ['Al'])
+        self.assertEqual(self.labels('al', kinds={'users'}), ['alice', 'alfred'])
+
+    def test_add_and_remove(self):
+        self.index.add('clubs', 3, 'Go Club')
+        self.assertEqual(self.labels('ches'), ['alice'])
+        self.assertEqual(self.labels('go'), ['Go Club'])
+        self.index.remove('users', 1)
+        self.assertEqual(self.labels('ches'), [])
+
+    def test_stats(self):
+        stats = self.index.get_stats()
+        self.assertEqual((stats['entries'], stats['by_type']), (4, {'users': 2, 'clubs': 2}))
+        self.assertEqual(stats['keys'], 7)
+        self.assertGreater(stats['approx_bytes'], 0)
+        self.assertIsNotNone(stats['build_ms'])
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice', full_name='Alice Chessington')
+        self.club = Club.objects.create(name='Chess Club', owner=self.alice)
+        rebuild_index()
+
+    def complete(self, **params):
+        response = client_for(self.alice).get('/api/search/autocomplete/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(result['type'], result['label']) for result in response.data['results']]
+
+    def test_served_from_memory(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.complete(q='ches'), [('clubs', 'Chess Club'), ('users', 'alice')])
+            self.assertEqual(self.complete(q='ches', types='users'), [('users', 'alice')])
+
+    def test_stale_index_is_not_rebuilt_on_the_request_path(self):
+        get_index().built_at -= 3600
+        with self.assertNumQueries(0):
+            get_index()
+
+    def test_signals_update_the_index(self):
+        Club.objects.create(name='Chess Masters', owner=self.alice)
+        self.club.delete()
+        self.assertEqual(self.complete(q='chess m'), [('clubs', 'Chess Masters')])
+        self.assertNotIn(('clubs', 'Chess Club'), self.complete(q='ches'))
+
+    def test_stats_endpoint_is_for_admins(self):
+        self.assertEqual(client_for(self.alice).get('/api/search/autocomplete/stats/').status_code, 403)
+        admin = make_user('root', is_staff=True)
+        response = client_for(admin).get('/api/search/autocomplete/stats/')
+        self.assertEqual(response.status_code, 200)
+        # The admin was indexed when it was saved
+        self.assertEqual(response.data['by_type'], {'users': 2, 'clubs': 1})
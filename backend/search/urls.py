@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import GlobalSearchAPIView
+from .views import AutocompleteAPIView, GlobalSearchAPIView, autocomplete_stats, search_cache_stats
 
 urlpatterns = [
     path('', GlobalSearchAPIView.as_view(), name='global-search'),
+    path('autocomplete/', AutocompleteAPIView.as_view(), name='search-autocomplete'),
+    path('cache/stats/', search_cache_stats, name='search-cache-stats'),
+    path('autocomplete/stats/', autocomplete_stats, name='search-autocomplete-stats'),
 ]
\ No newline at end of file
@@ -1,17 +1,57 @@
+import time
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from django.db.models import Count, Prefetch
 from users.models import User
-from clubs.models import Club
+from clubs.models import Club, ClubMembership
 from events.models import Event
-from users.serializers import UserPublicSerializer
 from clubs.serializers import ClubSerializer
 from events.serializers import EventSerializer
-from courses.models import ClassInfo
-from courses.serializers import ClassInfoSerializer
+from courses.catalog import get_catalog
+from courses.views import course_data
+from backend.middleware import add_server_timing
+from backend.params import bounded_int
+from .autocomplete import DEFAULT_COMPLETIONS, MAX_COMPLETIONS, SOURCES as AUTOCOMPLETE_TYPES, get_index
+from .backends import search_ids
+from .cache import get_results, get_stats as get_result_cache_stats, overlay
+from .serializers import UserResultSerializer
+
+DEFAULT_RESULTS = 5
+MAX_RESULTS = 50
+
+SEARCH_TYPES = ['users', 'clubs', 'events', 'classes']
+
+# Response key -> (queryset the ranked ids are loaded from, serializer) for the
+# types in the search index. Classes come from the course catalog instead. The
+# serialized results are cached and shared between viewers (see search/cache.py).
+RESULT_TYPES = {
+    'users': (lambda: User.objects.prefetch_related('clubs'), UserResultSerializer),
+    'clubs': (
+        lambda: Club.objects.prefetch_related(
+            Prefetch('clubmembership_set', queryset=ClubMembership.objects.select_related('user'))
+        ),
+        ClubSerializer,
+    ),
+    'events': (
+        lambda: Event.objects.select_related('club').annotate(num_attendees=Count('attendees')),
+        EventSerializer,
+    ),
+}
+
 
 class GlobalSearchAPIView(APIView):
+    """
+    GET /api/search/?q=chess
+
+    Relevance-ranked users, clubs and events from the search index (see
+    search/backends.py) and classes from the course catalog (see
+    courses/catalog.py), `limit` (default 5) of each. Pass `type`
+    (e.g. type=clubs) to search one type only and page through it with
+    `offset`; `has_more` says which types have further results.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -19,29 +59,77 @@ class GlobalSearchAPIView(APIView):
         if not query:
             return Response({'error': 'Query is required'}, status=400)
 
-        users = User.objects.filter(
-            Q(username__icontains=query) |
-            Q(full_name__icontains=query)
-        )[:5]
-
-        clubs = Club.objects.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query)
-        )[:5]
-
-        events = Event.objects.filter(
-            Q(title__icontains=query) |
-            Q(location__icontains=query)
-        )[:5]
-
-        classes = ClassInfo.objects.filter(
-            Q(descr__icontains=query) |
-            Q(full_name__icontains=query)
-        )[:5]
-
-        return Response({
-            'users': UserPublicSerializer(users, many=True, context={'request': request}).data,
-            'clubs': ClubSerializer(clubs, many=True).data,
-            'events': EventSerializer(events, many=True).data,
-            'classes': ClassInfoSerializer(classes, many=True).data,
-        })
\ No newline at end of file
+        types = SEARCH_TYPES
+        requested = request.query_params.get('type')
+        if requested:
+            if requested not in SEARCH_TYPES:
+                return Response({'error': f"type must be one of: {', '.join(SEARCH_TYPES)}"}, status=400)
+            types = [requested]
+
+        limit = bounded_int(request.query_params.get('limit'), DEFAULT_RESULTS, 1, MAX_RESULTS)
+        offset = bounded_int(request.query_params.get('offset'), 0, 0, 10000)
+
+        results = {name: [] for name in SEARCH_TYPES}
+        has_more = {}
+        for name in types:
+            items, has_more[name] = get_results(
+                name, query, limit, offset, lambda: self.search(name, query, limit, offset, request)
+            )
+            results[name] = overlay(name, items, request)
+
+        results['has_more'] = has_more
+        return Response(results)
+
+    def search(self, name, query, limit, offset, request):
+        if name == 'classes':
+            courses, has_more = get_catalog().search(query, limit=limit, offset=offset)
+            return [course_data(course) for course in courses], has_more
+        ids = search_ids(name, query, limit + 1, offset)
+        return self.serialize(name, ids[:limit], request), len(ids) > limit
+
+    def serialize(self, name, ids, request):
+        if not ids:
+            return []
+        queryset, serializer_class = RESULT_TYPES[name]
+        objects = queryset().in_bulk(ids)
+        # The index can briefly hold ids whose rows are gone; skip them
+        ranked = [objects[pk] for pk in ids if pk in objects]
+        return serializer_class(ranked, many=True, context={'request': request}).data
+
+
+class AutocompleteAPIView(APIView):
+    """
+    GET /api/search/autocomplete/?q=ali&types=users,clubs&limit=10
+
+    Typeahead completions from the in-memory prefix index (see
+    search/autocomplete.py); never queries the database once the index is
+    built. Each result is {"type", "id", "label", "detail"}.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        limit = bounded_int(request.query_params.get('limit'), DEFAULT_COMPLETIONS, 1, MAX_COMPLETIONS)
+        kinds = None
+        if request.query_params.get('types'):
+            kinds = set(request.query_params['types'].split(','))
+            if not kinds <= set(AUTOCOMPLETE_TYPES):
+                return Response({'error': f"types must be from: {', '.join(AUTOCOMPLETE_TYPES)}"}, status=400)
+
+        index = get_index()
+        start = time.perf_counter()
+        results = index.complete(query, limit, kinds)
+        add_server_timing(request, 'autocomplete', (time.perf_counter() - start) * 1000)
+        return Response({'results': results})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def autocomplete_stats(request):
+    return Response(get_index().get_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def search_cache_stats(request):
+    return Response(get_result_cache_stats())
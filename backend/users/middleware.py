@@ -0,0 +1,21 @@
+from django.conf import settings
+
+
+class RelationshipLookupHeaderMiddleware:
+    """
+    In DEBUG mode, reports how many viewer relationship lookups were served from
+    the request-scoped cache vs. the database (see users.relationships).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        relationships = getattr(request, 'viewer_relationships', None)
+        if settings.DEBUG and relationships is not None:
+            response['X-Relationship-Lookups'] = (
+                f"cache={relationships.cache_hits}; db={relationships.db_queries}"
+            )
+        return response
@@ -0,0 +1,88 @@
+from friends.models import FriendRequest, Friendship
+
+
+class ViewerRelationships:
+    """
+    Request-scoped view of how the requesting user relates to other objects.
+    Each set is loaded with a single query the first time it is needed and then
+    served from memory for the rest of the request, so serializing N users
+    doesn't cost N friendship queries.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.cache_hits = 0
+        self.db_queries = 0
+        self._sets = {}
+
+    def _load(self, name, queryset):
+        if name in self._sets:
+            self.cache_hits += 1
+        else:
+            self.db_queries += 1
+            self._sets[name] = set(queryset)
+        return self._sets[name]
+
+    @property
+    def friend_ids(self):
+        return self._load(
+            'friend_ids',
+            Friendship.objects.filter(user=self.user).values_list('friend_id', flat=True)
+        )
+
+    @property
+    def pending_sent_ids(self):
+        return self._load(
+            'pending_sent_ids',
+            FriendRequest.objects.filter(from_user=self.user, status='pending').values_list('to_user_id', flat=True)
+        )
+
+    @property
+    def pending_received_ids(self):
+        return self._load(
+            'pending_received_ids',
+            FriendRequest.objects.filter(to_user=self.user, status='pending').values_list('from_user_id', flat=True)
+        )
+
+    @property
+    def club_ids(self):
+        return self._load(
+            'club_ids',
+            self.user.clubmembership_set.values_list('club_id', flat=True)
+        )
+
+    @property
+    def attending_event_ids(self):
+        return self._load(
+            'attending_event_ids',
+            self.user.attending_events.values_list('id', flat=True)
+        )
+
+    def is_friend(self, user):
+        return user.pk in self.friend_ids
+
+    def request_sent(self, user):
+        return user.pk in self.pending_sent_ids
+
+    def is_member(self, club):
+        return club.pk in self.club_ids
+
+    def is_going(self, event):
+        return event.pk in self.attending_event_ids
+
+
+def get_viewer_relationships(request):
+    """
+    Returns the ViewerRelationships for this request, creating it on first use.
+    Returns None for anonymous requests.
+    """
+    if request is None or not request.user.is_authenticated:
+        return None
+
+    # Store on the underlying HttpRequest so middleware can see it as well
+    http_request = getattr(request, '_request', request)
+    relationships = getattr(http_request, 'viewer_relationships', None)
+    if relationships is None or relationships.user.pk != request.user.pk:
+        relationships = ViewerRelationships(request.user)
+        http_request.viewer_relationships = relationships
+    return relationships
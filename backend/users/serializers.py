@@ -1,10 +1,24 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from friends.models import FriendRequest
-from django.db.models import Q
+from .relationships import get_viewer_relationships
 
 User = get_user_model()
 
+
+def private_profile(rep):
+    """
+    What a private profile shows to someone who isn't the owner or a friend.
+    """
+    return {
+        'id': rep['id'],
+        'username': rep['username'],
+        'is_private': True,
+        'is_friend': rep['is_friend'],
+        'friend_request_sent': rep['friend_request_sent'],
+        'message': 'This profile is private.'
+    }
+
+
 class UserPublicSerializer(serializers.ModelSerializer):
     profile_picture_url = serializers.SerializerMethodField()  
     clubs = serializers.SerializerMethodField()
@@ -37,14 +51,7 @@ class UserPublicSerializer(serializers.ModelSerializer):
         if instance.is_private:
             if request.user != instance and not rep['is_friend']:
                 # Hide most fields if not self or friend
-                return {
-                    'id': rep['id'],
-                    'username': rep['username'],
-                    'is_private': True,
-                    'is_friend': rep['is_friend'],
-                    'friend_request_sent': rep['friend_request_sent'],
-                    'message': 'This profile is private.'
-                }
+                return private_profile(rep)
 
         return rep
 
@@ -67,10 +74,7 @@ class UserPublicSerializer(serializers.ModelSerializer):
         if obj == request.user:
             return False
 
-        return FriendRequest.objects.filter(
-            (Q(from_user=request.user, to_user=obj) | Q(from_user=obj, to_user=request.user)),
-            status='accepted'
-        ).exists()
+        return get_viewer_relationships(request).is_friend(obj)
 
     def get_friend_request_sent(self, obj):
         request = self.context.get('request')
@@ -80,7 +84,4 @@ class UserPublicSerializer(serializers.ModelSerializer):
         if obj == request.user:
             return False
 
-        return FriendRequest.objects.filter(
-            from_user=request.user, to_user=obj,
-            status='pending'
-        ).exists()
\ No newline at end of file
+        return get_viewer_relationships(request).request_sent(obj)
\ No newline at end of file
@@ -1,3 +1,42 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from friends.models import FriendRequest
+from backend.testing import client_for, make_user
 
-# Create your tests here.
+
+class ViewerRelationshipTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.others = [make_user(f'sam{i}') for i in range(6)]
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.others[0], status='accepted')
+        FriendRequest.objects.create(from_user=self.alice, to_user=self.others[1], status='pending')
+
+    def search(self):
+        response = client_for(self.alice).get('/api/users/search/', {'q': 'sam'})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_relationships_are_loaded_once_per_request(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.search()
+        users = {user['username']: user for user in response.data}
+        self.assertEqual(len(users), 6)
+        self.assertEqual(
+            [name for name, user in sorted(users.items()) if user['is_friend']], ['sam0']
+        )
+        self.assertEqual(
+            [name for name, user in sorted(users.items()) if user['friend_request_sent']], ['sam1']
+        )
+
+        friendships = [query for query in captured if 'friends_friendship' in query['sql']]
+        requests = [query for query in captured if 'friends_friendrequest' in query['sql']]
+        self.assertEqual((len(friendships), len(requests)), (1, 1))
+
+    @override_settings(DEBUG=True)
+    def test_debug_header_counts_cache_hits(self):
+        # Two lookups per user, two of them from the database
+        self.assertEqual(self.search().headers['X-Relationship-Lookups'], 'cache=10; db=2')
+
+    def test_no_header_outside_debug(self):
+        self.assertNotIn('X-Relationship-Lookups', self.search().headers)
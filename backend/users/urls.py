@@ -4,14 +4,14 @@ from . import views
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
-    path('signup/', signup),
-    path('login/', MyTokenObtainPairView.as_view()),
-    path('me/', me),
-    path('me/update/', update_me),
+    path('signup/', signup, name='signup'),
+    path('login/', MyTokenObtainPairView.as_view(), name='login'),
+    path('me/', me, name='me'),
+    path('me/update/', update_me, name='update-me'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('search/', search_users),
-    path('profile/<str:username>/', get_user_by_username),
-    path('change-password/', views.change_password),
-    path('delete-account/', views.delete_account),
-    path('supabase-login/', SupabaseLoginView.as_view()),
+    path('search/', search_users, name='user-search'),
+    path('profile/<str:username>/', get_user_by_username, name='user-profile'),
+    path('change-password/', views.change_password, name='change-password'),
+    path('delete-account/', views.delete_account, name='delete-account'),
+    path('supabase-login/', SupabaseLoginView.as_view(), name='supabase-login'),
 ]
\ No newline at end of file
@@ -10,8 +10,7 @@ from django.utils.decorators import method_decorator
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from .serializers import UserPublicSerializer
-from friends.models import FriendRequest
-from django.db.models import Q
+from .relationships import get_viewer_relationships
 import json
 from rest_framework.decorators import parser_classes
 from storage3.exceptions import StorageApiError
@@ -138,6 +137,9 @@ def update_me(request):
                 user.interests = json.loads(interests)
             except Exception:
                 return Response({"error": "Invalid interests format."}, status=status.HTTP_400_BAD_REQUEST)
+        # Indexed into interests.UserInterest on save (see interests/signals.py)
+        if not isinstance(user.interests, list) or not all(isinstance(i, str) for i in user.interests):
+            return Response({"error": "Invalid interests format."}, status=status.HTTP_400_BAD_REQUEST)
 
     user.save()
     return Response({"message": "Profile updated successfully!"})
@@ -149,7 +151,7 @@ def update_me(request):
 def search_users(request):
     query = request.GET.get('q', '')
     if query:
-        users = User.objects.filter(username__icontains=query).exclude(id=request.user.id)[:10]
+        users = User.objects.filter(username__icontains=query).exclude(id=request.user.id).prefetch_related('clubs')[:10]
         serializer = UserPublicSerializer(users, many=True, context={'request': request})
         return Response(serializer.data)
     return Response([])
@@ -167,13 +169,7 @@ def get_user_by_username(request, username):
 
         # If profile is private, check if viewer is a friend
         if user.is_private:
-            is_friend = FriendRequest.objects.filter(
-                Q(from_user=request.user, to_user=user) |
-                Q(from_user=user, to_user=request.user),
-                status='accepted'
-            ).exists()
-
-            if not is_friend:
+            if not get_viewer_relationships(request).is_friend(user):
                 return Response({"error": "This profile is private."}, status=status.HTTP_403_FORBIDDEN)
 
         # Otherwise, allow viewing
@@ -1,5 +1,5 @@
 import { defineStore } from 'pinia'
-import { authAxios } from '@/utils/axios'
+import { authAxios, getAllPages } from '@/utils/axios'
 
 export const useClubStore = defineStore('club', {
   state: () => ({
@@ -17,8 +17,7 @@ export const useClubStore = defineStore('club', {
     async fetchClubs(force = false) {
       const oneMinute = 60 * 1000
       if (!force && this.lastFetched && Date.now() - this.lastFetched < oneMinute) return
-      const res = await authAxios.get('/clubs/')
-      this.clubs = res.data
+      this.clubs = await getAllPages('/clubs/')
       this.lastFetched = Date.now()
     },
 
@@ -35,8 +34,7 @@ export const useClubStore = defineStore('club', {
         if (existingClub) {
           this.currentClub = existingClub
         } else {
-          const res = await authAxios.get('/clubs/')
-          this.clubs = res.data
+          this.clubs = await getAllPages('/clubs/')
           this.currentClub = this.clubs.find(c => c.name === clubName) || null
         }
 
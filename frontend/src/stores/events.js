@@ -1,5 +1,5 @@
 import { defineStore } from 'pinia'
-import { authAxios } from '@/utils/axios'
+import { authAxios, getAllPages } from '@/utils/axios'
 
 export const useEventStore = defineStore('event', {
   state: () => ({
@@ -36,13 +36,7 @@ export const useEventStore = defineStore('event', {
     
       this.loading = true;
       try {
-        const res = await authAxios.get('/events/', { params: { upcoming: true } });
-        if (Array.isArray(res.data)) {
-          this.events = res.data; // 
-        } else {
-          console.error('Unexpected events response format:', res.data);
-          this.events = [];
-        }
+        this.events = await getAllPages('/events/', { params: { upcoming: true } });
         this.lastFetched = now;
       } catch (error) {
         console.error('Failed to fetch events:', error);
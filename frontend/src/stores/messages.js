@@ -1,5 +1,5 @@
 import { defineStore } from 'pinia'
-import { authAxios } from '@/utils/axios'
+import { authAxios, getAllPages } from '@/utils/axios'
 
 export const useMessageStore = defineStore('messages', {
   state: () => ({
@@ -18,8 +18,7 @@ export const useMessageStore = defineStore('messages', {
       if (!force && this.lastFetched && now - this.lastFetched < fiveMinutes) return
 
       try {
-        const res = await authAxios.get('/messages/threads/')
-        this.threads = res.data
+        this.threads = await getAllPages('/messages/threads/')
         this.lastFetched = now
       } catch (error) {
         console.error('Failed to fetch threads:', error)
@@ -36,8 +35,9 @@ export const useMessageStore = defineStore('messages', {
         this.loadingByThread[threadId] = true
       
         try {
-          const res = await authAxios.get(`/messages/threads/${threadId}/messages/`)
-          this.messagesByThread[threadId] = res.data
+          const messages = await getAllPages(`/messages/threads/${threadId}/messages/`, { prepend: true })
+          this.messagesByThread[threadId] = messages
+          if (messages.length) await this.markThreadRead(threadId, messages[messages.length - 1].id)
         } catch (error) {
           console.error(`Failed to fetch messages for thread ${threadId}:`, error)
           throw error
@@ -46,6 +46,17 @@ export const useMessageStore = defineStore('messages', {
         }
       },
 
+      // Reading is an explicit write; fetching messages doesn't mark them read
+      async markThreadRead(threadId, messageId) {
+        try {
+          await authAxios.post(`/messages/threads/${threadId}/read/`, { message_id: messageId })
+          const thread = this.threads.find(t => t.id === threadId)
+          if (thread) thread.unread_count = 0
+        } catch (error) {
+          console.error(`Failed to mark thread ${threadId} read:`, error)
+        }
+      },
+
       async sendMessage(threadId, message) {
         try {
           await authAxios.post(`/messages/threads/${threadId}/send/`, { message })
@@ -70,8 +81,8 @@ export const useMessageStore = defineStore('messages', {
           this.pinnedMessages[threadId] = all.filter(msg => msg.pinned)
         } else {
           // Otherwise fetch and filter
-          const res = await authAxios.get(`/messages/threads/${threadId}/messages/`)
-          this.pinnedMessages[threadId] = res.data.filter(msg => msg.pinned)
+          const all = await getAllPages(`/messages/threads/${threadId}/messages/`, { prepend: true })
+          this.pinnedMessages[threadId] = all.filter(msg => msg.pinned)
         }
       } catch (error) {
         console.error(`Failed to fetch pinned messages for thread ${threadId}:`, error)
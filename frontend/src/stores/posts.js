@@ -1,5 +1,5 @@
 import { defineStore } from 'pinia'
-import { authAxios } from '@/utils/axios'
+import { authAxios, getAllPages } from '@/utils/axios'
 
 export const usePostStore = defineStore('posts', {
   state: () => ({
@@ -37,12 +37,12 @@ export const usePostStore = defineStore('posts', {
           return
         }
 
-        const response = await authAxios.get(`/posts/user/${encodeURIComponent(username)}/`)
+        const posts = await getAllPages(`/posts/user/${encodeURIComponent(username)}/`)
         this.userPostsCache[username] = {
-          posts: response.data,
+          posts,
           lastFetched: now,
         }
-        this.userPosts = response.data
+        this.userPosts = posts
       } catch (error) {
         console.error('Failed to fetch user posts:', error)
       } finally {
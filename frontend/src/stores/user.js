@@ -1,5 +1,5 @@
 import { defineStore } from 'pinia'
-import { authAxios } from '@/utils/axios'
+import { authAxios, getAllPages } from '@/utils/axios'
 
 export const useUserStore = defineStore('user', {
   state: () => ({
@@ -35,9 +35,8 @@ export const useUserStore = defineStore('user', {
       const oneMinute = 60 * 1000
       if (!force && this.lastFetched && Date.now() - this.lastFetched < oneMinute) return
 
-      const res = await authAxios.get('/notifications/')
-      this.notifications = res.data
-      this.unreadCount = res.data.filter(n => !n.is_read).length
+      this.notifications = await getAllPages('/notifications/')
+      this.unreadCount = this.notifications.filter(n => !n.is_read).length
       this.lastFetched = Date.now()
     },
     async markAllRead() {
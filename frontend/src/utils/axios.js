@@ -58,4 +58,19 @@ authAxios.interceptors.response.use(
   }
 )
 
-export { base, authAxios }
+// List endpoints return one page at a time and send the cursor for the next
+// page in the X-Next-Cursor header. getAllPages follows it and concatenates
+// the pages. Message history comes newest page first (each page oldest ->
+// newest), so pass { prepend: true } to put earlier pages in front.
+async function getAllPages(url, { params = {}, prepend = false } = {}) {
+  let items = []
+  let cursor = null
+  do {
+    const res = await authAxios.get(url, { params: cursor ? { ...params, cursor } : params })
+    items = prepend ? [...res.data, ...items] : [...items, ...res.data]
+    cursor = res.headers['x-next-cursor']
+  } while (cursor)
+  return items
+}
+
+export { base, authAxios, getAllPages }